@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+ASL Atlas - Pre-resized letter images packed into memory-mapped arrays
+Rendering slices frames out of the atlas instead of decoding and resizing JPEGs
+"""
+import os
+import json
+import numpy as np
+from PIL import Image
+
+CACHE_DIR = "asl_cache"
+ATLAS_MANIFEST = os.path.join(CACHE_DIR, "kaggle_atlas.json")
+ATLAS_VERSION = 1
+
+# Standard tile sizes (400 matches the GIF output)
+ATLAS_SIZES = (128, 256, 400)
+
+# Shared GIF palette: 255 colors plus one transparent slot for delta frames
+PALETTE_PATH = os.path.join(CACHE_DIR, "kaggle_palette.npz")
+PALETTE_COLORS = 255
+TRANSPARENT_INDEX = 255
+
+# Loaded atlases by size
+_atlases = {}
+_palette = None
+
+
+def atlas_path(size):
+    """Raw (images, size, size, 3) uint8 array for one tile size"""
+    return os.path.join(CACHE_DIR, f"kaggle_atlas_{size}.npy")
+
+
+def pad_square(img):
+    """Center an image on a white square (same padding as the image strips)"""
+    img = img.convert('RGB')
+    side = max(img.width, img.height)
+    if img.width == img.height:
+        return img
+    square = Image.new('RGB', (side, side), 'white')
+    square.paste(img, ((side - img.width) // 2, (side - img.height) // 2))
+    return square
+
+
+def build_atlas(index, signature=None, sizes=ATLAS_SIZES):
+    """
+    Decode, pad and resize every letter image once and pack the results
+    
+    Args:
+        index: dict mapping character to a list of image paths
+        signature: Dataset signature the atlas is valid for
+        sizes: Tile sizes to build
+    
+    Returns:
+        The manifest dict (also written to ATLAS_MANIFEST)
+    """
+    chars = {}
+    paths = []
+    for char in sorted(index):
+        chars[char] = [len(paths), len(index[char])]
+        paths.extend(index[char])
+    
+    if not paths:
+        raise ValueError("No letter images to pack")
+    
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    temp_paths = {size: atlas_path(size) + ".part" for size in sizes}
+    arrays = {
+        size: np.lib.format.open_memmap(temp_paths[size], mode='w+', dtype=np.uint8,
+                                        shape=(len(paths), size, size, 3))
+        for size in sizes
+    }
+    
+    print(f"🧩 Packing {len(paths)} images at sizes {', '.join(map(str, sizes))}...")
+    failed = 0
+    for slot, path in enumerate(paths):
+        try:
+            with Image.open(path) as img:
+                square = pad_square(img)
+        except Exception as e:
+            print(f"⚠️  Error loading {path}: {e}")
+            square = Image.new('RGB', (max(sizes),) * 2, 'white')
+            failed += 1
+        for size, array in arrays.items():
+            array[slot] = np.asarray(square.resize((size, size), Image.Resampling.LANCZOS))
+    
+    for array in arrays.values():
+        array.flush()
+    # Release the maps before renaming (required on Windows)
+    arrays.clear()
+    for size in sizes:
+        os.replace(temp_paths[size], atlas_path(size))
+    
+    manifest = {
+        "version": ATLAS_VERSION,
+        "signature": signature,
+        "sizes": list(sizes),
+        "chars": chars,
+        "paths": paths,
+    }
+    with open(ATLAS_MANIFEST, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    
+    _atlases.clear()
+    total = sum(os.path.getsize(atlas_path(size)) for size in sizes)
+    print(f"✅ Atlas ready: {len(paths)} images, {total / 1024 / 1024:.1f} MB"
+          + (f" ({failed} unreadable)" if failed else ""))
+    return manifest
+
+
+class LetterAtlas:
+    """Read-only view of one atlas size"""
+    
+    def __init__(self, manifest, size):
+        """
+        Args:
+            manifest: Parsed atlas manifest
+            size: Tile size to map
+        """
+        self.size = size
+        self.signature = manifest.get("signature")
+        self.chars = manifest["chars"]
+        self.frames = np.load(atlas_path(size), mmap_mode='r')
+        self._slots = {path: slot for slot, path in enumerate(manifest["paths"])}
+    
+    def frame(self, image_path):
+        """
+        Pre-resized tile for an image from the index
+        
+        Returns:
+            (size, size, 3) uint8 array view, or None if the image is not packed
+        """
+        slot = self._slots.get(image_path)
+        if slot is None:
+            return None
+        return self.frames[slot]
+    
+    def frames_for(self, char):
+        """All tiles for a character, in index order"""
+        start, count = self.chars.get(char, (0, 0))
+        return self.frames[start:start + count]
+
+
+def load_atlas(size=400, signature=None):
+    """
+    Open the atlas for a tile size
+    
+    Args:
+        size: Tile size
+        signature: Current dataset signature; a mismatch means the atlas is stale
+    
+    Returns:
+        LetterAtlas, or None if not built (or stale)
+    """
+    atlas = _atlases.get(size)
+    if atlas is not None and atlas.signature == signature:
+        return atlas
+    
+    try:
+        with open(ATLAS_MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if (manifest.get("version") != ATLAS_VERSION or size not in manifest.get("sizes", [])
+            or manifest.get("signature") != signature):
+        return None
+    
+    try:
+        atlas = LetterAtlas(manifest, size)
+    except (OSError, ValueError):
+        return None
+    
+    _atlases[size] = atlas
+    return atlas
+
+
+def build_palette(tiles, colors=PALETTE_COLORS, max_pixels=1 << 20):
+    """
+    Compute one palette for the whole letter set and its 32x32x32 lookup table
+    
+    Args:
+        tiles: Iterable of uint8 RGB arrays sampled from the letter images
+        colors: Palette entries to fit (the last GIF slot is kept transparent)
+        max_pixels: Pixels fed to the median cut
+    
+    Returns:
+        (palette, lut): (256, 3) uint8 palette and (32768,) uint8 index table
+        addressed by (r >> 3) << 10 | (g >> 3) << 5 | (b >> 3)
+    """
+    pixels = np.concatenate([np.asarray(tile).reshape(-1, 3) for tile in tiles])
+    if len(pixels) > max_pixels:
+        pixels = pixels[::len(pixels) // max_pixels + 1]
+    
+    sample = Image.fromarray(np.ascontiguousarray(pixels).reshape(1, -1, 3))
+    quantized = sample.quantize(colors, method=Image.Quantize.MEDIANCUT)
+    fitted = np.array(quantized.getpalette()[:colors * 3], dtype=np.uint8).reshape(-1, 3)
+    
+    palette = np.zeros((256, 3), dtype=np.uint8)
+    palette[:len(fitted)] = fitted
+    
+    # Nearest palette entry for the center of every 5-bit RGB bin
+    centers = (np.arange(32, dtype=np.float32) * 8 + 4)
+    grid = np.stack(np.meshgrid(centers, centers, centers, indexing='ij'), axis=-1).reshape(-1, 3)
+    entries = fitted.astype(np.float32)
+    distances = (
+        (grid ** 2).sum(axis=1, keepdims=True)
+        - 2 * grid @ entries.T
+        + (entries ** 2).sum(axis=1)
+    )
+    lut = distances.argmin(axis=1).astype(np.uint8)
+    
+    return palette, lut
+
+
+def save_palette(palette, lut, signature=None):
+    """Persist the palette next to the atlas"""
+    global _palette
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    temp_path = PALETTE_PATH + ".part.npz"
+    np.savez(temp_path, palette=palette, lut=lut, signature=json.dumps(signature, sort_keys=True))
+    os.replace(temp_path, PALETTE_PATH)
+    _palette = (signature, palette, lut)
+
+
+def load_palette(signature=None):
+    """
+    Shared palette for the current dataset
+    
+    Returns:
+        (palette, lut), or None if not built (or stale)
+    """
+    global _palette
+    if _palette is not None and _palette[0] == signature:
+        return _palette[1], _palette[2]
+    
+    try:
+        with np.load(PALETTE_PATH) as data:
+            stored = json.loads(str(data["signature"]))
+            palette, lut = data["palette"], data["lut"]
+    except (OSError, ValueError, KeyError):
+        return None
+    
+    if stored != signature:
+        return None
+    
+    _palette = (signature, palette, lut)
+    return palette, lut
@@ -5,20 +5,306 @@ Generates image sequences or GIFs for ASL translation
 """
 import os
 import re
-from pathlib import Path
+import json
+import time
+import itertools
 from PIL import Image
+import numpy as np
 import random
+import zlib
+from output_cache import OutputCache
+from asl_atlas import (build_atlas, load_atlas, build_palette, save_palette, load_palette,
+                       pad_square, ATLAS_SIZES)
+from gif_encoder import GifWriter, save_animation
 
 # Dataset paths
 KAGGLE_ASL_DIR = "kaggle_asl_dataset/asl_dataset"
 OUTPUT_DIR = "asl_outputs"
+CACHE_DIR = "asl_cache"
+IMAGE_INDEX_PATH = os.path.join(CACHE_DIR, "kaggle_image_index.json")
+SHARPNESS_PATH = os.path.join(CACHE_DIR, "kaggle_sharpness.json")
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
 
-def get_asl_image(character):
+# Strips/grids larger than this (pixels) are split into pages
+MAX_PAGE_SIZE = 16000
+
+# How a character's image is picked among its variants:
+#   random      - different on every call
+#   seeded      - pseudo-random, but the same text always gives the same images
+#   first       - always the first image of the character
+#   round_robin - cycle through the variants as the character repeats in the text
+#   best        - sharpest image (precomputed Laplacian variance)
+VARIANT_POLICIES = ('random', 'seeded', 'first', 'round_robin', 'best')
+DEFAULT_POLICY = 'seeded'
+
+# Character -> list of image paths (built once per process, see load_image_index)
+_image_index = None
+_image_signature = None
+_sharpness = None
+
+# Shared cache of rendered outputs (created on first use)
+_output_cache = None
+
+
+def get_output_cache():
+    """Process-wide output cache for generated letter images/GIFs"""
+    global _output_cache
+    if _output_cache is None:
+        _output_cache = OutputCache(OUTPUT_DIR)
+    return _output_cache
+
+
+def _dataset_signature():
+    """Directory mtimes that change whenever images are added or removed"""
+    signature = {}
+    try:
+        signature["."] = os.stat(KAGGLE_ASL_DIR).st_mtime_ns
+        with os.scandir(KAGGLE_ASL_DIR) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    signature[entry.name] = entry.stat().st_mtime_ns
+    except OSError:
+        return None
+    return signature
+
+
+def _scan_images():
+    """List every character directory once"""
+    index = {}
+    try:
+        with os.scandir(KAGGLE_ASL_DIR) as entries:
+            char_dirs = sorted(entry.name for entry in entries if entry.is_dir())
+    except OSError:
+        return index
+    
+    for name in char_dirs:
+        with os.scandir(os.path.join(KAGGLE_ASL_DIR, name)) as entries:
+            images = sorted(
+                entry.name for entry in entries
+                if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+        if images:
+            index[name.lower()] = images
+    return index
+
+
+def load_image_index(refresh=False):
+    """
+    Character -> image paths index, built once per process
+    
+    Loaded from the persisted manifest when the dataset is unchanged,
+    otherwise rebuilt with a single directory scan and saved.
+    
+    Args:
+        refresh: Ignore the in-memory and persisted index and rescan
+    
+    Returns:
+        dict mapping character to a list of image paths
+    """
+    global _image_index, _image_signature
+    if _image_index is not None and not refresh:
+        return _image_index
+    
+    signature = _dataset_signature()
+    manifest = None
+    if not refresh and signature is not None:
+        try:
+            with open(IMAGE_INDEX_PATH, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = None
+        if manifest and (manifest.get("dataset") != os.path.abspath(KAGGLE_ASL_DIR)
+                         or manifest.get("signature") != signature):
+            manifest = None
+    
+    if manifest is None:
+        manifest = {
+            "dataset": os.path.abspath(KAGGLE_ASL_DIR),
+            "signature": signature,
+            "images": _scan_images(),
+        }
+        if signature is not None:
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                with open(IMAGE_INDEX_PATH, 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f)
+            except OSError as e:
+                print(f"⚠️  Could not write image index: {e}")
+    
+    _image_index = {
+        char: [os.path.join(KAGGLE_ASL_DIR, char, name) for name in names]
+        for char, names in manifest["images"].items()
+    }
+    _image_signature = manifest["signature"]
+    return _image_index
+
+
+def refresh_image_index():
+    """Rescan the dataset (call after adding or removing letter images)"""
+    return load_image_index(refresh=True)
+
+
+def build_letter_atlas(sizes=ATLAS_SIZES):
+    """
+    Pack pre-resized letter images into the memory-mapped atlas
+    
+    Args:
+        sizes: Tile sizes to build
+    
+    Returns:
+        Atlas manifest dict
+    """
+    index = refresh_image_index()
+    manifest = build_atlas(index, signature=_image_signature, sizes=sizes)
+    get_palette()
+    return manifest
+
+
+def get_atlas(size=400):
+    """
+    Atlas for a tile size, if built for the current dataset
+    
+    Returns:
+        LetterAtlas, or None (callers fall back to decoding the images)
+    """
+    load_image_index()
+    return load_atlas(size, signature=_image_signature)
+
+
+def get_palette(max_samples=256):
+    """
+    Shared GIF palette for the letter set, built once and cached in asl_cache/
+    
+    Args:
+        max_samples: Letter images sampled when building the palette
+    
+    Returns:
+        (palette, lut), or None if no letter images are available
+    """
+    index = load_image_index()
+    cached = load_palette(_image_signature)
+    if cached is not None:
+        return cached
+    
+    paths = [path for char in sorted(index) for path in index[char]]
+    if not paths:
+        return None
+    
+    step = max(1, len(paths) // max_samples)
+    atlas = get_atlas(min(ATLAS_SIZES))
+    if atlas is not None:
+        samples = atlas.frames[::step]
+    else:
+        samples = []
+        for path in paths[::step]:
+            try:
+                with Image.open(path) as img:
+                    img.draft('RGB', (64, 64))
+                    img = img.convert('RGB')
+                    img.thumbnail((64, 64))
+                    samples.append(np.asarray(img))
+            except Exception:
+                continue
+        if not samples:
+            return None
+    
+    print(f"🎨 Building shared GIF palette from {len(samples)} letter images...")
+    palette, lut = build_palette(samples)
+    save_palette(palette, lut, _image_signature)
+    return palette, lut
+
+
+def sharpness_score(tile):
+    """Variance of the Laplacian of a grayscale tile (higher = sharper)"""
+    gray = np.asarray(tile, dtype=np.float32)
+    if gray.ndim == 3:
+        gray = gray @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    laplacian = (gray[:-2, 1:-1] + gray[2:, 1:-1] + gray[1:-1, :-2] + gray[1:-1, 2:]
+                 - 4 * gray[1:-1, 1:-1])
+    return float(laplacian.var())
+
+
+def load_sharpness():
+    """
+    Sharpness score of every letter image, computed once and cached in asl_cache/
+    
+    Returns:
+        dict mapping character to scores in index order
+    """
+    global _sharpness
+    index = load_image_index()
+    if _sharpness is not None and _sharpness[0] == _image_signature:
+        return _sharpness[1]
+    
+    try:
+        with open(SHARPNESS_PATH, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        if stored.get("signature") == _image_signature and stored.get("signature") is not None:
+            _sharpness = (_image_signature, stored["scores"])
+            return stored["scores"]
+    except (OSError, ValueError):
+        pass
+    
+    print("🔍 Scoring letter image sharpness...")
+    atlas = get_atlas(min(ATLAS_SIZES))
+    scores = {}
+    for char, paths in index.items():
+        char_scores = []
+        for path in paths:
+            tile = atlas.frame(path) if atlas else None
+            if tile is None:
+                try:
+                    with Image.open(path) as img:
+                        img.draft('L', (128, 128))
+                        img = img.convert('L')
+                        img.thumbnail((128, 128))
+                        tile = np.asarray(img)
+                except Exception:
+                    char_scores.append(0.0)
+                    continue
+            char_scores.append(sharpness_score(tile))
+        scores[char] = char_scores
+    
+    if _image_signature is not None:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(SHARPNESS_PATH, 'w', encoding='utf-8') as f:
+                json.dump({"signature": _image_signature, "scores": scores}, f)
+        except OSError as e:
+            print(f"⚠️  Could not write sharpness scores: {e}")
+    
+    _sharpness = (_image_signature, scores)
+    return scores
+
+
+def _pick_variant(char, images, policy, position, seed):
+    """Choose one of a character's images according to a variant policy"""
+    if policy == 'random':
+        return random.choice(images)
+    if policy == 'first':
+        return images[0]
+    if policy == 'round_robin':
+        return images[position % len(images)]
+    if policy == 'seeded':
+        return images[zlib.crc32(f"{seed}\0{position}".encode('utf-8')) % len(images)]
+    if policy == 'best':
+        scores = load_sharpness().get(char)
+        if not scores or len(scores) != len(images):
+            return images[0]
+        return images[max(range(len(images)), key=scores.__getitem__)]
+    raise ValueError(f"Unknown variant policy '{policy}' (choose from {', '.join(VARIANT_POLICIES)})")
+
+
+def get_asl_image(character, policy='random', position=0, seed=""):
     """
-    Get a random ASL image for a given character (letter or number)
+    Get an ASL image for a given character (letter or number)
     
     Args:
         character: Single letter (a-z) or digit (0-9)
+        policy: Variant policy (see VARIANT_POLICIES)
+        position: Position of the character in the text ('seeded'), or how
+            often it already occurred ('round_robin')
+        seed: Seed for the 'seeded' policy (usually the text itself)
     
     Returns:
         Path to image file, or None if not found
@@ -29,198 +315,356 @@ def get_asl_image(character):
     if len(char) > 1:
         return None
     
-    char_dir = Path(KAGGLE_ASL_DIR) / char
-    
-    if not char_dir.exists():
-        return None
-    
-    # Get all images for this character
-    images = list(char_dir.glob("*.jpg")) + list(char_dir.glob("*.jpeg")) + list(char_dir.glob("*.png"))
+    images = load_image_index().get(char)
     
     if not images:
         return None
     
-    # Return random image for variety
-    return str(random.choice(images))
+    return _pick_variant(char, images, policy, position, seed)
+
 
+def signed_text(text):
+    """The letters actually signed for a text (lowercase, single spaces)"""
+    return " ".join(re.sub(r'[^a-z0-9\s]', '', text.lower()).split())
 
-def text_to_asl_images(text):
+
+def text_to_asl_images(text, policy=DEFAULT_POLICY):
     """
     Convert text to list of ASL image paths
     
     Args:
         text: Input text to convert
+        policy: Variant policy (see VARIANT_POLICIES); all but 'random'
+            return the same images for the same text
     
     Returns:
         List of (character, image_path) tuples
     """
     # Clean text - only keep letters, numbers, and spaces
+    seed = signed_text(text)
     text = re.sub(r'[^a-z0-9\s]', '', text.lower())
     
     result = []
+    occurrences = {}
+    position = 0
     for char in text:
         if char == ' ':
             result.append(('space', None))  # Pause between words
         else:
-            img_path = get_asl_image(char)
+            count = occurrences.get(char, 0)
+            occurrences[char] = count + 1
+            img_path = get_asl_image(char, policy,
+                                     position=count if policy == 'round_robin' else position,
+                                     seed=seed)
+            position += 1
             if img_path:
                 result.append((char, img_path))
     
     return result
 
 
-def create_asl_image_sequence(text, output_path, grid=False):
+def composite_tiles(tiles, cols, labels=None):
+    """
+    Write tiles into one preallocated canvas, row-major
+    
+    Tiles smaller than the largest one are centered on white, like the
+    padded squares of the original strips.
+    
+    Args:
+        tiles: List of (height, width, 3) uint8 arrays
+        cols: Tiles per row
+        labels: Optional text drawn in the corner of each cell
+    
+    Returns:
+        PIL RGB image
+    """
+    size = max(max(tile.shape[0], tile.shape[1]) for tile in tiles)
+    rows = (len(tiles) + cols - 1) // cols
+    
+    canvas = np.full((rows * size, cols * size, 3), 255, dtype=np.uint8)
+    for idx, tile in enumerate(tiles):
+        height, width = tile.shape[:2]
+        top = (idx // cols) * size + (size - height) // 2
+        left = (idx % cols) * size + (size - width) // 2
+        canvas[top:top + height, left:left + width] = tile
+    
+    result = Image.fromarray(canvas)
+    
+    if labels:
+        from PIL import ImageDraw
+        draw = ImageDraw.Draw(result)
+        pad = max(2, size // 40)
+        for idx, label in enumerate(labels):
+            x = (idx % cols) * size + pad
+            y = (idx // cols) * size + pad
+            draw.text((x, y), label, fill='black', stroke_width=1, stroke_fill='white')
+    
+    return result
+
+
+def load_tile(img_path, size):
+    """Decode a letter image padded to a white square of size x size (the atlas fallback)"""
+    with Image.open(img_path) as img:
+        square = pad_square(img)
+    if square.size != (size, size):
+        square = square.resize((size, size), Image.Resampling.LANCZOS)
+    return np.asarray(square)
+
+
+def iter_tiles(images_data, size, use_atlas=True):
+    """
+    Yield letter tiles one at a time (spaces skipped)
+    
+    Args:
+        images_data: (character, image_path) tuples from text_to_asl_images
+        size: Tile size in pixels
+        use_atlas: Slice tiles from the atlas when it is built
+    
+    Yields:
+        (character, (size, size, 3) uint8 array)
+    """
+    atlas = get_atlas(size) if use_atlas else None
+    for char, img_path in images_data:
+        if img_path is None:
+            continue
+        tile = atlas.frame(img_path) if atlas else None
+        if tile is None:
+            try:
+                tile = load_tile(img_path, size)
+            except Exception as e:
+                print(f"⚠️  Error loading image for '{char}': {e}")
+                continue
+        yield char, tile
+
+
+def page_layout(count, size, grid=False, max_size=MAX_PAGE_SIZE):
+    """
+    Tiles per row and per page for a strip or grid
+    
+    Args:
+        count: Number of tiles
+        size: Tile size in pixels
+        grid: Grid (max 10 per row) or horizontal strip
+        max_size: Largest page width/height in pixels
+    
+    Returns:
+        (cols, tiles_per_page)
+    """
+    fit = max(1, max_size // size)
+    if grid:
+        cols = max(1, min(10, count, fit))
+        return cols, cols * fit
+    cols = max(1, min(count, fit))
+    return cols, cols
+
+
+def page_path(output_path, page):
+    """Path of page N (page 1 is output_path itself)"""
+    if page == 1:
+        return output_path
+    root, ext = os.path.splitext(output_path)
+    return f"{root}_page{page}{ext}"
+
+
+def create_asl_image_sequence(text, output_path, grid=False, use_atlas=True, labels=False,
+                              tile_size=400, policy=DEFAULT_POLICY, max_size=MAX_PAGE_SIZE):
     """
     Create a single image showing ASL signs for the text
     
+    Tiles are decoded and composed one page at a time. Output wider (or, for
+    grids, taller) than max_size is split into pages: page 1 is written to
+    output_path, the rest next to it as <name>_page2.png, <name>_page3.png, ...
+    
     Args:
         text: Text to convert
         output_path: Where to save the output image
         grid: If True, arrange in grid. If False, horizontal strip
+        use_atlas: Slice pre-padded tiles from the atlas when it is built
+        labels: Draw the letter in the corner of each tile
+        tile_size: Tile size in pixels (atlas sizes: 128, 256, 400)
+        policy: Variant policy (see VARIANT_POLICIES)
+        max_size: Largest page width/height in pixels
     
     Returns:
-        Path to generated image
+        Path to generated image (the first page)
     """
-    images_data = text_to_asl_images(text)
+    images_data = text_to_asl_images(text, policy)
     
     if not images_data:
         raise ValueError(f"No ASL images found for: {text}")
     
     # Filter out spaces for the visual output
-    images_to_show = [(char, path) for char, path in images_data if path is not None]
+    count = sum(1 for _, path in images_data if path is not None)
     
-    if not images_to_show:
+    if not count:
         raise ValueError(f"No valid images to display for: {text}")
     
-    # Load all images
-    loaded_images = []
-    labels = []
-    for char, img_path in images_to_show:
-        try:
-            img = Image.open(img_path)
-            loaded_images.append(img)
-            labels.append(char.upper())
-        except Exception as e:
-            print(f"⚠️  Error loading image for '{char}': {e}")
-    
-    if not loaded_images:
-        raise ValueError(f"Failed to load any images for: {text}")
-    
-    # Get max dimensions
-    max_width = max(img.width for img in loaded_images)
-    max_height = max(img.height for img in loaded_images)
-    
-    # Resize all to same size (square)
-    size = max(max_width, max_height)
-    resized = []
-    for img in loaded_images:
-        # Create white background
-        new_img = Image.new('RGB', (size, size), 'white')
-        # Paste original centered
-        offset = ((size - img.width) // 2, (size - img.height) // 2)
-        new_img.paste(img, offset)
-        resized.append(new_img)
-    
-    if grid:
-        # Arrange in grid (max 10 per row)
-        cols = min(10, len(resized))
-        rows = (len(resized) + cols - 1) // cols
-        
-        result = Image.new('RGB', (size * cols, size * rows), 'white')
-        
-        for idx, img in enumerate(resized):
-            row = idx // cols
-            col = idx % cols
-            result.paste(img, (col * size, row * size))
-    else:
-        # Horizontal strip
-        result = Image.new('RGB', (size * len(resized), size), 'white')
-        
-        for idx, img in enumerate(resized):
-            result.paste(img, (idx * size, 0))
+    cols, per_page = page_layout(count, tile_size, grid, max_size)
+    tiles = iter_tiles(images_data, tile_size, use_atlas)
     
-    # Save
     os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
-    result.save(output_path)
+    pages = 0
+    while True:
+        # Only one page of tiles is held at a time
+        page = list(itertools.islice(tiles, per_page))
+        if not page:
+            break
+        pages += 1
+        result = composite_tiles(
+            [tile for _, tile in page],
+            cols if grid else len(page),
+            labels=[char.upper() for char, _ in page] if labels else None
+        )
+        result.save(page_path(output_path, pages))
+        del page, result
+    
+    if not pages:
+        raise ValueError(f"Failed to load any images for: {text}")
+    if pages > 1:
+        print(f"📄 {count} letters split into {pages} pages of up to {per_page}")
     
     return output_path
 
 
-def create_asl_gif(text, output_path, duration=800):
+def create_asl_gif(text, output_path, duration=800, use_atlas=True, shared_palette=True,
+                   size=400, policy=DEFAULT_POLICY):
     """
     Create an animated GIF showing ASL signs one by one
     
+    With the shared palette, frames are decoded, quantized and written one at
+    a time, so memory does not grow with the text. A .webp or .png
+    output_path writes an animated WebP / APNG instead.
+    
     Args:
         text: Text to convert
         output_path: Where to save the GIF
         duration: Milliseconds per frame
+        use_atlas: Slice pre-resized frames from the atlas when it is built
+        shared_palette: Encode against the cached letter-set palette with delta
+            frames instead of quantizing every frame separately
+        size: Frame size in pixels (atlas sizes: 128, 256, 400)
+        policy: Variant policy (see VARIANT_POLICIES)
     
     Returns:
         Path to generated GIF
     """
-    images_data = text_to_asl_images(text)
+    images_data = text_to_asl_images(text, policy)
     
     if not images_data:
         raise ValueError(f"No ASL images found for: {text}")
     
-    # Load images
-    frames = []
-    for char, img_path in images_data:
-        if img_path:  # Skip spaces
-            try:
-                img = Image.open(img_path)
-                # Resize to consistent size
-                img = img.resize((400, 400), Image.Resampling.LANCZOS)
-                frames.append(img)
-            except Exception as e:
-                print(f"⚠️  Error loading '{char}': {e}")
+    frames = (tile for _, tile in iter_tiles(images_data, size, use_atlas))
+    first = next(frames, None)
     
-    if not frames:
+    if first is None:
         raise ValueError(f"No valid frames for: {text}")
     
-    # Save as GIF
     os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
-    frames[0].save(
-        output_path,
-        save_all=True,
-        append_images=frames[1:],
-        duration=duration,
-        loop=0
-    )
+    start = time.perf_counter()
+    count = 1
+    
+    palette = get_palette() if shared_palette else None
+    if not output_path.lower().endswith(('.webp', '.png')) and palette is not None:
+        with GifWriter(output_path, palette[0], palette[1]) as writer:
+            writer.write(first, duration)
+            for frame in frames:
+                writer.write(frame, duration)
+                count += 1
+        encoder = "shared palette"
+    else:
+        # These encoders need every frame up front
+        frames = [first] + list(frames)
+        count = len(frames)
+        if output_path.lower().endswith(('.webp', '.png')):
+            save_animation(frames, output_path, duration=duration)
+            encoder = "full color"
+        else:
+            # Save as GIF (PIL quantizes every frame on its own)
+            images = [Image.fromarray(frame) for frame in frames]
+            images[0].save(
+                output_path,
+                save_all=True,
+                append_images=images[1:],
+                duration=duration,
+                loop=0
+            )
+            encoder = "per-frame palette"
+    
+    elapsed = time.perf_counter() - start
+    size_kb = os.path.getsize(output_path) / 1024
+    print(f"🎞️  {count} frames, {size_kb:.0f} KB in {elapsed:.2f}s ({encoder})")
     
     return output_path
 
 
-def generate_asl_output(text, output_type='gif'):
+def generate_asl_output(text, output_type='gif', use_cache=True, policy=DEFAULT_POLICY, size=400):
     """
     Main function to generate ASL output from text
     
     Args:
         text: Text to convert to ASL
-        output_type: 'gif', 'image', or 'grid'
+        output_type: 'gif', 'webp', 'apng', 'image', or 'grid'
+        use_cache: Return a previously rendered file for the same
+            (text, policy, output_type, size); never used with 'random'
+        policy: Variant policy (see VARIANT_POLICIES)
+        size: Frame / tile size in pixels
     
     Returns:
         Path to generated file
     """
-    # Clean filename
-    safe_text = re.sub(r'[^a-z0-9]', '_', text.lower())[:30]
-    timestamp = int(__import__('time').time())
+    if policy not in VARIANT_POLICIES:
+        raise ValueError(f"Unknown variant policy '{policy}' (choose from {', '.join(VARIANT_POLICIES)})")
+    
+    ext = output_type if output_type in ('gif', 'webp') else 'png'
+    
+    # Multi-page strips/grids are not cached (the cache holds single files)
+    if output_type in ('image', 'grid'):
+        count = len(signed_text(text).replace(" ", ""))
+        _, per_page = page_layout(count, size, output_type == 'grid')
+        use_cache = use_cache and count <= per_page
+    
+    # Key on the letter sequence actually signed, not the raw text
+    cache = get_output_cache() if use_cache and policy != 'random' else None
+    if cache:
+        load_image_index()
+        key = cache.make_key("kaggle", signed_text(text), policy, output_type, size, 800,
+                             _image_signature)
+        cached_path = cache.get(key, ext)
+        if cached_path:
+            return cached_path
+        output_path = cache.temp_path(key, ext)
+    else:
+        # Clean filename
+        safe_text = re.sub(r'[^a-z0-9]', '_', text.lower())[:30]
+        timestamp = int(time.time())
+        output_path = os.path.join(OUTPUT_DIR, f"asl_{safe_text}_{timestamp}.{ext}")
     
-    if output_type == 'gif':
-        output_path = os.path.join(OUTPUT_DIR, f"asl_{safe_text}_{timestamp}.gif")
-        return create_asl_gif(text, output_path)
+    if output_type in ('gif', 'webp', 'apng'):
+        create_asl_gif(text, output_path, size=size, policy=policy)
     elif output_type == 'grid':
-        output_path = os.path.join(OUTPUT_DIR, f"asl_{safe_text}_{timestamp}.png")
-        return create_asl_image_sequence(text, output_path, grid=True)
+        create_asl_image_sequence(text, output_path, grid=True, tile_size=size, policy=policy)
     else:  # image strip
-        output_path = os.path.join(OUTPUT_DIR, f"asl_{safe_text}_{timestamp}.png")
-        return create_asl_image_sequence(text, output_path, grid=False)
+        create_asl_image_sequence(text, output_path, grid=False, tile_size=size, policy=policy)
+    
+    if cache:
+        return cache.commit(key, ext)
+    return output_path
 
 
 # Test function
 if __name__ == "__main__":
     import sys
     
+    if len(sys.argv) > 1 and sys.argv[1] == "--refresh-index":
+        index = refresh_image_index()
+        print(f"✅ Indexed {sum(len(v) for v in index.values())} images for {len(index)} characters")
+        sys.exit(0)
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "--build-atlas":
+        sizes = [int(arg) for arg in sys.argv[2:]] or ATLAS_SIZES
+        build_letter_atlas(sizes)
+        sys.exit(0)
+    
     test_text = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else "hello world"
     
     print(f"Converting to ASL: '{test_text}'")
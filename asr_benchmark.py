@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+ASR Benchmark - Measure faster-whisper settings on reference clips and pick a profile
+Every combination runs in its own process, so load time and peak memory are its own
+Usage: python asr_benchmark.py [--clips DIR] [--models tiny,base] [--compute int8,float32]
+                               [--beams 1,5] [--threads 2,4] [--workers 1] [--vad none,balanced]
+                               [--max-rtf 0.5] [--max-rss MB] [--name default]
+"""
+import os
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+import re
+import sys
+import json
+import time
+import itertools
+import subprocess
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from batch_transcribe import find_audio_files, iter_audio_windows, SAMPLE_RATE
+
+# Reference clips: audio files with a same-named .txt transcript next to them
+REFERENCE_DIR = "asr_reference"
+PROFILE_DIR = "asr_profiles"
+
+# VAD settings to compare (None = no VAD filter)
+VAD_PRESETS = {
+    'none': None,
+    'balanced': {'min_silence_duration_ms': 500},
+    'tight': {'min_silence_duration_ms': 250, 'speech_pad_ms': 200},
+}
+
+DEFAULT_GRID = {
+    'model_size': ["tiny", "base", "small"],
+    'compute_type': ["int8", "float32"],
+    'beam_size': [1, 5],
+    'cpu_threads': [2, 4],
+    'num_workers': [1],
+    'vad': ["none", "balanced"],
+}
+
+# Profiles within this much WER of the most accurate candidate count as equally good
+WER_TOLERANCE = 0.02
+
+# Settings used when no profile is loaded (what the converter always used)
+DEFAULT_PROFILE = {
+    'model_size': "base",
+    'compute_type': "int8",
+    'cpu_threads': 0,
+    'num_workers': 1,
+    'beam_size': 5,
+    'vad_filter': True,
+    'vad_parameters': {'min_silence_duration_ms': 500},
+}
+
+
+def normalize_words(text):
+    """Lowercase words without punctuation, for scoring"""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_errors(reference, hypothesis):
+    """
+    Word-level edit distance
+    
+    Returns:
+        (substitutions + deletions + insertions, reference word count)
+    """
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1,
+                                           previous + (ref_word != hyp_word))
+    return row[-1], len(ref)
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (None if unavailable)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # bytes on macOS, kilobytes elsewhere
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    except (ImportError, AttributeError):
+        return None
+
+
+def load_clips(clip_dir=REFERENCE_DIR):
+    """
+    Reference clips and their transcripts
+    
+    Returns:
+        List of (audio_path, reference_text or None)
+    """
+    clips = []
+    for path in find_audio_files([clip_dir]):
+        txt_path = os.path.splitext(path)[0] + ".txt"
+        reference = None
+        if os.path.exists(txt_path):
+            with open(txt_path, 'r', encoding='utf-8-sig') as f:
+                reference = f.read().strip()
+        clips.append((path, reference))
+    return clips
+
+
+def iter_configs(grid):
+    """Every combination of the grid as a config dict"""
+    keys = list(grid)
+    for values in itertools.product(*(grid[key] for key in keys)):
+        yield dict(zip(keys, values))
+
+
+def run_config(config, clip_paths):
+    """
+    Load one configuration and transcribe the clips (runs in a child process)
+    
+    Clips are transcribed num_workers at a time against one model, the way
+    concurrent callers would share it.
+    
+    Returns:
+        dict with load_seconds, seconds, audio_seconds, rtf, peak_rss_mb and
+        hypotheses (one transcript per clip)
+    """
+    from faster_whisper import WhisperModel
+    
+    audio = [np.concatenate([samples for _, samples in iter_audio_windows(path)]) for path in clip_paths]
+    vad_parameters = VAD_PRESETS[config['vad']]
+    
+    start = time.perf_counter()
+    model = WhisperModel(config['model_size'], device="cpu", compute_type=config['compute_type'],
+                         cpu_threads=config['cpu_threads'], num_workers=config['num_workers'])
+    load_seconds = time.perf_counter() - start
+    
+    def transcribe(samples):
+        segments, _ = model.transcribe(
+            samples,
+            language="en",
+            beam_size=config['beam_size'],
+            vad_filter=vad_parameters is not None,
+            vad_parameters=vad_parameters
+        )
+        return " ".join(segment.text.strip() for segment in segments)
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=config['num_workers']) as executor:
+        hypotheses = list(executor.map(transcribe, audio))
+    seconds = time.perf_counter() - start
+    
+    audio_seconds = sum(len(samples) for samples in audio) / SAMPLE_RATE
+    return {
+        'load_seconds': load_seconds,
+        'seconds': seconds,
+        'audio_seconds': audio_seconds,
+        'rtf': seconds / audio_seconds if audio_seconds else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'hypotheses': hypotheses,
+    }
+
+
+def measure(config, clips, timeout=None):
+    """
+    Benchmark one configuration in a fresh process
+    
+    Args:
+        config: Grid entry (model_size, compute_type, beam_size, cpu_threads,
+                num_workers, vad)
+        clips: List of (audio_path, reference_text)
+        timeout: Give up after this many seconds
+    
+    Returns:
+        Result dict (run_config output plus config, wer and error)
+    """
+    result = dict(config, wer=None, error=None)
+    try:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-config", json.dumps(config)]
+            + [path for path, _ in clips],
+            capture_output=True, text=True, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        result['error'] = "timeout"
+        return result
+    
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        result['error'] = (proc.stderr.strip().splitlines() or ["failed"])[-1][:200]
+        return result
+    
+    result.update(json.loads(lines[-1]))
+    scored = [word_errors(reference, hypothesis)
+              for (_, reference), hypothesis in zip(clips, result['hypotheses']) if reference]
+    words = sum(count for _, count in scored)
+    if words:
+        result['wer'] = sum(errors for errors, _ in scored) / words
+    return result
+
+
+def recommend(results, max_rtf=0.5, max_rss_mb=None):
+    """
+    Pick the best configuration
+    
+    Among runs fast enough (RTF <= max_rtf) and small enough, the most
+    accurate ones (within WER_TOLERANCE of the best WER) are kept and the
+    fastest of those wins. Without any reference transcripts the fastest
+    run wins.
+    
+    Returns:
+        Result dict, or None if nothing qualifies
+    """
+    candidates = [r for r in results if not r['error'] and r['rtf'] is not None
+                  and r['rtf'] <= max_rtf
+                  and (max_rss_mb is None or r['peak_rss_mb'] is None or r['peak_rss_mb'] <= max_rss_mb)]
+    if not candidates:
+        return None
+    
+    scored = [r for r in candidates if r['wer'] is not None]
+    if scored:
+        best_wer = min(r['wer'] for r in scored)
+        candidates = [r for r in scored if r['wer'] <= best_wer + WER_TOLERANCE]
+    return min(candidates, key=lambda r: r['rtf'])
+
+
+def profile_from_result(result):
+    """Converter settings for a benchmark result"""
+    vad_parameters = VAD_PRESETS[result['vad']]
+    return {
+        'model_size': result['model_size'],
+        'compute_type': result['compute_type'],
+        'cpu_threads': result['cpu_threads'],
+        'num_workers': result['num_workers'],
+        'beam_size': result['beam_size'],
+        'vad_filter': vad_parameters is not None,
+        'vad_parameters': vad_parameters,
+        'measured': {
+            'rtf': result['rtf'],
+            'wer': result['wer'],
+            'peak_rss_mb': result['peak_rss_mb'],
+            'load_seconds': result['load_seconds'],
+            'cpu_count': os.cpu_count(),
+            'date': time.strftime("%Y-%m-%d"),
+        },
+    }
+
+
+def save_profile(name, profile):
+    """Write a profile to PROFILE_DIR/<name>.json"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{name}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2)
+    return path
+
+
+def load_profile(name):
+    """
+    Settings saved by the benchmark
+    
+    Args:
+        name: Profile name (PROFILE_DIR/<name>.json) or a path to a profile file
+    
+    Returns:
+        Profile dict (missing keys filled from DEFAULT_PROFILE)
+    """
+    path = name if name.endswith(".json") else os.path.join(PROFILE_DIR, f"{name}.json")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"ASR profile not found: {path}\n"
+                                f"Run: python asr_benchmark.py --name {name}")
+    with open(path, 'r', encoding='utf-8') as f:
+        return dict(DEFAULT_PROFILE, **json.load(f))
+
+
+def run_benchmark(clip_dir=REFERENCE_DIR, grid=None, max_rtf=0.5, max_rss_mb=None, name="default",
+                  timeout=None):
+    """
+    Benchmark every grid combination and save the recommended profile
+    
+    Args:
+        clip_dir: Reference clips (audio + same-named .txt transcripts)
+        grid: dict of setting -> values to try (DEFAULT_GRID if None)
+        max_rtf: Slowest acceptable real-time factor (processing / audio time)
+        max_rss_mb: Largest acceptable peak memory (None = no limit)
+        name: Profile name to write
+        timeout: Per-combination time limit in seconds
+    
+    Returns:
+        (results, profile_path or None)
+    """
+    grid = dict(DEFAULT_GRID, **(grid or {}))
+    clips = load_clips(clip_dir)
+    if not clips:
+        raise ValueError(f"No reference clips in {clip_dir} (audio files with same-named .txt transcripts)")
+    
+    configs = list(iter_configs(grid))
+    scored = sum(1 for _, reference in clips if reference)
+    print(f"📊 Benchmarking {len(configs)} combinations on {len(clips)} clips "
+          f"({scored} with reference transcripts)")
+    print()
+    print(f"{'model':<7} {'compute':<8} {'beam':>4} {'thr':>4} {'wrk':>4} {'vad':<9} "
+          f"{'load':>6} {'RTF':>6} {'RSS MB':>7} {'WER':>6}")
+    
+    results = []
+    for config in configs:
+        result = measure(config, clips, timeout)
+        results.append(result)
+        prefix = (f"{config['model_size']:<7} {config['compute_type']:<8} {config['beam_size']:>4} "
+                  f"{config['cpu_threads']:>4} {config['num_workers']:>4} {config['vad']:<9}")
+        if result['error']:
+            print(f"{prefix} ❌ {result['error']}")
+            continue
+        rss = f"{result['peak_rss_mb']:>7.0f}" if result['peak_rss_mb'] is not None else f"{'-':>7}"
+        wer = f"{result['wer']:>6.1%}" if result['wer'] is not None else f"{'-':>6}"
+        print(f"{prefix} {result['load_seconds']:>5.1f}s {result['rtf']:>6.3f} {rss} {wer}")
+    
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(PROFILE_DIR, f"{name}_results.json"), 'w', encoding='utf-8') as f:
+        json.dump([{k: v for k, v in r.items() if k != 'hypotheses'} for r in results], f, indent=2)
+    
+    best = recommend(results, max_rtf, max_rss_mb)
+    if best is None:
+        print(f"\n⚠️  No combination met RTF <= {max_rtf}"
+              + (f" and {max_rss_mb} MB" if max_rss_mb else "") + " - no profile written")
+        return results, None
+    
+    path = save_profile(name, profile_from_result(best))
+    print(f"\n✅ Recommended: {best['model_size']} / {best['compute_type']} / beam {best['beam_size']} / "
+          f"{best['cpu_threads']} threads / {best['num_workers']} workers / VAD {best['vad']}")
+    print(f"💾 Profile saved: {path}")
+    print(f"💡 Use it: python faster_whisper_demo.py --profile {name}")
+    return results, path
+
+
+def _parse_list(value):
+    """'1,5' -> [1, 5]; 'tiny,base' -> ['tiny', 'base']"""
+    return [int(item) if item.isdigit() else item for item in value.split(",") if item]
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    
+    # Child process: one configuration, result as a JSON line
+    if args and args[0] == "--run-config":
+        print(json.dumps(run_config(json.loads(args[1]), args[2:])))
+        sys.exit(0)
+    
+    axes = {'--models': 'model_size', '--compute': 'compute_type', '--beams': 'beam_size',
+            '--threads': 'cpu_threads', '--workers': 'num_workers', '--vad': 'vad'}
+    options = {'--clips': REFERENCE_DIR, '--max-rtf': "0.5", '--max-rss': None, '--name': "default",
+               '--timeout': None}
+    grid = {}
+    while args:
+        arg = args.pop(0)
+        if arg in axes and args:
+            grid[axes[arg]] = _parse_list(args.pop(0))
+        elif arg in options and args:
+            options[arg] = args.pop(0)
+        else:
+            print(f"⚠️  Unknown argument: {arg}")
+            sys.exit(1)
+    
+    unknown = [vad for vad in grid.get('vad', []) if vad not in VAD_PRESETS]
+    if unknown:
+        print(f"⚠️  Unknown VAD preset: {', '.join(unknown)} (use {', '.join(VAD_PRESETS)})")
+        sys.exit(1)
+    
+    try:
+        _, profile_path = run_benchmark(
+            clip_dir=options['--clips'],
+            grid=grid,
+            max_rtf=float(options['--max-rtf']),
+            max_rss_mb=float(options['--max-rss']) if options['--max-rss'] else None,
+            name=options['--name'],
+            timeout=float(options['--timeout']) if options['--timeout'] else None
+        )
+        sys.exit(0 if profile_path else 1)
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
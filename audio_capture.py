@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Audio Capture - Microphone recording into a preallocated ring buffer
+Voice activity detection with a calibrated noise floor decides when an utterance ends
+"""
+import time
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# 32 ms blocks: small enough for responsive endpointing
+BLOCK_SIZE = 512
+
+
+class RingBuffer:
+    """Fixed-size float32 ring buffer written by the audio callback"""
+    
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity: Samples kept before the oldest are overwritten
+        """
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self.written = 0  # total samples ever written (absolute position)
+    
+    def write(self, samples):
+        """Copy samples in (no allocation)"""
+        count = len(samples)
+        if count > self.capacity:
+            samples = samples[-self.capacity:]
+            self.written += count - self.capacity
+            count = self.capacity
+        
+        start = self.written % self.capacity
+        first = min(count, self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        if first < count:
+            self._data[:count - first] = samples[first:]
+        # Publish only after the data is in place
+        self.written += count
+    
+    def oldest(self):
+        """Absolute position of the oldest sample still held"""
+        return max(0, self.written - self.capacity)
+    
+    def read(self, start, end=None):
+        """
+        Copy out samples by absolute position
+        
+        Args:
+            start: First sample (clamped to the oldest one still held)
+            end: One past the last sample (default: everything written so far)
+        
+        Returns:
+            float32 array
+        """
+        end = self.written if end is None else min(end, self.written)
+        start = max(start, self.oldest())
+        if end <= start:
+            return np.zeros(0, dtype=np.float32)
+        
+        first = start % self.capacity
+        count = end - start
+        if first + count <= self.capacity:
+            return self._data[first:first + count].copy()
+        return np.concatenate((self._data[first:], self._data[:count - (self.capacity - first)]))
+    
+    def reset(self):
+        """Forget everything written"""
+        self.written = 0
+
+
+class VoiceActivityDetector:
+    """
+    Energy + spectral-flatness VAD with an adaptive noise floor
+    
+    A frame is voiced when it is well above the noise floor and its spectrum
+    is peaky (speech) rather than flat (fans, hiss). Speech starts after
+    min_speech seconds of voiced frames and ends after `hangover` seconds
+    without any.
+    """
+    
+    def __init__(self, sample_rate=SAMPLE_RATE, threshold_db=10.0, min_speech=0.1,
+                 hangover=0.8, calibration=0.5, max_flatness=0.5, min_level_db=-65.0):
+        """
+        Args:
+            sample_rate: Audio sample rate
+            threshold_db: How far above the noise floor speech must be
+            min_speech: Seconds of voiced frames before speech starts
+            hangover: Seconds of silence after speech that end an utterance
+            calibration: Seconds of audio used to measure the noise floor
+            max_flatness: Spectral flatness (0 = tonal, 1 = white noise) above
+                which a loud frame still counts as noise
+            min_level_db: Absolute level below which nothing is speech
+        """
+        self.sample_rate = sample_rate
+        self.threshold_db = threshold_db
+        self.min_speech = min_speech
+        self.hangover = hangover
+        self.calibration = calibration
+        self.max_flatness = max_flatness
+        self.min_level_db = min_level_db
+        
+        self.noise_floor_db = None
+        self._calibration_levels = []
+        self._calibration_samples = 0
+        self.reset()
+    
+    def reset(self):
+        """Start a new utterance (the noise floor is kept)"""
+        self.in_speech = False
+        self._voiced = 0.0
+        self._silence = 0.0
+    
+    @property
+    def calibrated(self):
+        return self.noise_floor_db is not None
+    
+    def frame_features(self, frame):
+        """
+        Level and spectral flatness of one frame
+        
+        Returns:
+            (level_db, flatness)
+        """
+        level_db = 10 * np.log10(np.mean(frame * frame) + 1e-12)
+        spectrum = np.abs(np.fft.rfft(frame * np.hanning(len(frame))))[1:] + 1e-9
+        flatness = np.exp(np.mean(np.log(spectrum))) / np.mean(spectrum)
+        return float(level_db), float(flatness)
+    
+    def is_voiced(self, level_db, flatness):
+        """Decision for one frame against the current noise floor"""
+        return (level_db > self.min_level_db
+                and level_db > self.noise_floor_db + self.threshold_db
+                and flatness < self.max_flatness)
+    
+    def process(self, frame):
+        """
+        Feed one frame
+        
+        Returns:
+            'calibrating', 'silence', 'speech_start', 'speech', or 'speech_end'
+        """
+        seconds = len(frame) / self.sample_rate
+        level_db, flatness = self.frame_features(frame)
+        
+        if not self.calibrated:
+            self._calibration_levels.append(level_db)
+            self._calibration_samples += len(frame)
+            if self._calibration_samples >= self.calibration * self.sample_rate:
+                # Low percentile: robust to someone already talking
+                self.noise_floor_db = float(np.percentile(self._calibration_levels, 20))
+                self._calibration_levels = []
+            return 'calibrating'
+        
+        voiced = self.is_voiced(level_db, flatness)
+        
+        # Track the floor: fall quickly, rise slowly and only outside speech
+        if level_db < self.noise_floor_db:
+            self.noise_floor_db = 0.8 * self.noise_floor_db + 0.2 * level_db
+        elif not voiced and not self.in_speech:
+            self.noise_floor_db = 0.98 * self.noise_floor_db + 0.02 * level_db
+        
+        if not self.in_speech:
+            self._voiced = self._voiced + seconds if voiced else 0.0
+            if self._voiced >= self.min_speech:
+                self.in_speech = True
+                self._silence = 0.0
+                return 'speech_start'
+            return 'silence'
+        
+        self._silence = 0.0 if voiced else self._silence + seconds
+        if self._silence >= self.hangover:
+            self.in_speech = False
+            self._voiced = 0.0
+            return 'speech_end'
+        return 'speech'
+
+
+class AudioRecorder:
+    """Microphone capture into a ring buffer with VAD endpointing"""
+    
+    def __init__(self, sample_rate=SAMPLE_RATE, max_seconds=120, block_size=BLOCK_SIZE,
+                 vad=None, pre_roll=0.3):
+        """
+        Args:
+            sample_rate: Capture sample rate
+            max_seconds: Ring buffer length (longest utterance kept)
+            block_size: Samples per callback block (and per VAD frame)
+            vad: VoiceActivityDetector (default settings if None); its noise
+                floor is calibrated once and kept across utterances
+            pre_roll: Seconds kept before the detected speech start
+        """
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.ring = RingBuffer(int(max_seconds * sample_rate))
+        self.vad = vad or VoiceActivityDetector(sample_rate)
+        self.pre_roll = pre_roll
+        
+        self._stream = None
+        self._processed = 0  # absolute position the VAD has seen up to
+        self.start_time = None
+        self.speech_onset = None  # first voiced sample
+        self.speech_start = None  # onset minus pre-roll
+        self.speech_end = None
+        self.interrupted = False
+    
+    def _callback(self, indata, frames, time_info, status):
+        self.ring.write(indata[:, 0])
+    
+    def start(self):
+        """Open the microphone and start filling the ring buffer"""
+        if self._stream is not None:
+            return
+        import sounddevice as sd
+        
+        self.ring.reset()
+        self.vad.reset()
+        self._processed = 0
+        self.speech_onset = None
+        self.speech_start = None
+        self.speech_end = None
+        self._stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype='float32',
+            callback=self._callback,
+            blocksize=self.block_size
+        )
+        self._stream.start()
+        self.start_time = time.perf_counter()
+    
+    def stop(self):
+        """Close the microphone (the captured audio stays readable)"""
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+    
+    def wall_time(self, position):
+        """perf_counter() time at which a sample position was captured (approximate)"""
+        return self.start_time + position / self.sample_rate
+    
+    def poll(self):
+        """
+        Run the VAD over newly captured frames
+        
+        Returns:
+            List of (event, position) for 'speech_start' / 'speech_end'
+        """
+        events = []
+        while self.ring.written - self._processed >= self.block_size:
+            end = self._processed + self.block_size
+            event = self.vad.process(self.ring.read(self._processed, end))
+            if event == 'speech_start':
+                self.speech_onset = end - int(self.vad.min_speech * self.sample_rate)
+                self.speech_start = max(self.ring.oldest(),
+                                        self.speech_onset - int(self.pre_roll * self.sample_rate))
+                self.speech_end = None
+                events.append((event, self.speech_start))
+            elif event == 'speech_end':
+                self.speech_end = end
+                events.append((event, end))
+            self._processed = end
+        return events
+    
+    def wait_for_utterance(self, should_stop=None, timeout=None):
+        """
+        Block until an utterance has ended
+        
+        Args:
+            should_stop: Callable returning True to stop early (e.g. a GUI button)
+            timeout: Give up after this many seconds without speech
+        
+        Returns:
+            (start, end) sample positions, or None if nothing was said
+        """
+        started = time.perf_counter()
+        while True:
+            for event, _ in self.poll():
+                if event == 'speech_end':
+                    return self.speech_start, self.speech_end
+            
+            if should_stop and should_stop():
+                break
+            if timeout and self.speech_start is None and time.perf_counter() - started > timeout:
+                break
+            time.sleep(self.block_size / self.sample_rate)
+        
+        # Stopped early: keep whatever speech was in progress
+        if self.speech_start is not None:
+            self.speech_end = self.ring.written
+            return self.speech_start, self.speech_end
+        return None
+    
+    def record_utterance(self, should_stop=None, timeout=None):
+        """
+        Record one utterance from the microphone
+        
+        Args:
+            should_stop: Callable returning True to stop early
+            timeout: Give up after this many seconds without speech
+        
+        Returns:
+            float32 mono samples, or None if nothing was said
+            (self.interrupted is set if Ctrl+C cut the recording short)
+        """
+        self.interrupted = False
+        try:
+            with self:
+                span = self.wait_for_utterance(should_stop=should_stop, timeout=timeout)
+        except KeyboardInterrupt:
+            self.interrupted = True
+            span = (self.speech_start, self.ring.written) if self.speech_start is not None else None
+        
+        if span is None:
+            return None
+        return self.ring.read(*span)
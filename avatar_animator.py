@@ -4,7 +4,6 @@ Avatar Animator - Create a blue futuristic 3D avatar that mimics ASL poses
 Uses extracted pose data to animate a virtual character
 """
 import os
-import json
 import pygame
 import numpy as np
 from pygame.locals import *
@@ -12,6 +11,109 @@ from OpenGL.GL import *
 from OpenGL.GLU import *
 import time
 
+from video_tools import fit_to_slot
+from pose_format import find_pose_file, POSE_EXTENSION
+from pose_sequence import PoseSequence
+from pose_library import PoseLibrary, LIBRARY_DIR
+
+# Parts the avatar draws (the 478-point face is never loaded)
+DRAWN_PARTS = ('pose', 'left_hand', 'right_hand')
+
+# MediaPipe hand landmark indices
+HAND_CONNECTIONS = np.array([
+    # Thumb
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    # Index
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    # Middle
+    (0, 9), (9, 10), (10, 11), (11, 12),
+    # Ring
+    (0, 13), (13, 14), (14, 15), (15, 16),
+    # Pinky
+    (0, 17), (17, 18), (18, 19), (19, 20)
+])
+
+# Key body connections (MediaPipe pose landmark indices)
+POSE_CONNECTIONS = np.array([
+    # Torso
+    (11, 12),  # Shoulders
+    (11, 23), (12, 24),  # Shoulders to hips
+    (23, 24),  # Hips
+    # Arms
+    (11, 13), (13, 15),  # Left arm
+    (12, 14), (14, 16),  # Right arm
+    # Legs
+    (23, 25), (25, 27),  # Left leg
+    (24, 26), (26, 28),  # Right leg
+])
+
+# Shoulders and hips are drawn thicker
+TORSO_JOINTS = [11, 12, 23, 24]
+
+
+def load_pose_sequence(pose_path):
+    """
+    Read an extracted pose file (.npz or legacy .json) with the parts the avatar draws
+    
+    Returns:
+        PoseSequence
+    """
+    return PoseSequence.load(pose_path, parts=DRAWN_PARTS)
+
+
+def schedule_frames(schedule, pose_dir="pose_data", fps=30, mode='stretch', library_dir=LIBRARY_DIR):
+    """
+    Lay out pose frames on a sign schedule's timeline
+    
+    Each sign is resampled to fill its slot the same way the video generator
+    retimes clips (see video_tools.fit_to_slot); the avatar holds its last
+    pose through gaps and through signs without pose data.
+    
+    Args:
+        schedule: Entries from WLASLGenerator.schedule_signs()
+        pose_dir: Directory with <word>.npz / <word>.json pose files (pose_extractor.py)
+        fps: Output frame rate
+        mode: 'stretch' or 'pad'
+        library_dir: Precomputed pose library (pose_library.py) for signs
+                     not in pose_dir
+    
+    Returns:
+        PoseSequence at `fps`
+    """
+    library = PoseLibrary(library_dir)
+    poses = {}
+    for entry in schedule:
+        word = entry['word'].lower()
+        if word not in poses:
+            path = find_pose_file(pose_dir, word) or library.word_path(word)
+            if path is None and entry.get('clip'):
+                path = library.path(entry['clip'])
+            poses[word] = load_pose_sequence(path) if path else None
+    
+    pieces = []
+    last = PoseSequence.empty(0, fps, DRAWN_PARTS)  # pose currently shown (one frame)
+    for i, entry in enumerate(schedule):
+        clock = sum(len(piece) for piece in pieces) / fps
+        following = schedule[i + 1]['start'] if i + 1 < len(schedule) else None
+        pose = poses[entry['word'].lower()]
+        
+        if pose is None or not len(pose):
+            # No pose data: keep the current pose until the next sign
+            end = following if following is not None else entry['end']
+            pieces.append(last.resample(fps, count=max(0, round((end - clock) * fps))))
+            continue
+        
+        seconds = pose.duration
+        end = following if following is not None else max(entry['end'], max(clock, entry['start']) + seconds)
+        lead, speed, tail = fit_to_slot(seconds, entry['start'], end, clock, mode)
+        
+        pieces.append((last if len(last) else pose[:1]).resample(fps, count=round(lead * fps)))
+        pieces.append(pose.resample(fps, speed))
+        pieces.append(pose[-1:].resample(fps, count=round(tail * fps)))
+        last = pose[-1:]
+    
+    return PoseSequence.concatenate(pieces, fps)
+
 class FuturisticAvatar:
     """Blue futuristic 3D avatar for ASL animation"""
     
@@ -58,157 +160,111 @@ class FuturisticAvatar:
         self.camera_distance = 3.0
         self.camera_rotation = [0, 0]
         
+        # One quadric reused for every bone and joint
+        self.quadric = gluNewQuadric()
+        
         print("✅ Avatar renderer ready!")
     
-    def draw_sphere(self, position, radius, color):
-        """Draw a sphere at given position"""
-        glPushMatrix()
-        glTranslatef(*position)
-        glColor4f(*color)
+    def draw_bones(self, points, connections, radii, color):
+        """
+        Draw cylinders between pairs of points
         
-        # Create quadric for sphere
-        quad = gluNewQuadric()
-        gluSphere(quad, radius, 16, 16)
-        gluDeleteQuadric(quad)
+        Bone lengths and orientations are computed for all bones at once;
+        only the OpenGL calls remain per bone.
         
-        glPopMatrix()
-    
-    def draw_cylinder(self, start, end, radius, color):
-        """Draw a cylinder between two points (for limbs)"""
-        glPushMatrix()
+        Args:
+            points: (n, 3) array of 3D positions
+            connections: (bones, 2) array of point indices
+            radii: Radius per bone (or one for all)
+            color: RGBA color
+        """
+        radii = np.broadcast_to(radii, len(connections))
+        valid = (connections < len(points)).all(axis=1)
+        connections, radii = connections[valid], radii[valid]
         
-        # Calculate direction vector
-        dx = end[0] - start[0]
-        dy = end[1] - start[1]
-        dz = end[2] - start[2]
-        length = np.sqrt(dx**2 + dy**2 + dz**2)
+        starts = points[connections[:, 0]]
+        deltas = points[connections[:, 1]] - starts
+        lengths = np.linalg.norm(deltas, axis=1)
+        angles = np.degrees(np.arccos(np.clip(deltas[:, 1] / np.maximum(lengths, 1e-9), -1.0, 1.0)))
+        axes = np.stack([-deltas[:, 2], deltas[:, 0]], axis=1)
+        axis_lengths = np.linalg.norm(axes, axis=1)
         
-        if length < 0.001:
+        glColor4f(*color)
+        for start, dy, length, angle, (axis_x, axis_z), axis_length, radius in zip(
+                starts.tolist(), deltas[:, 1].tolist(), lengths.tolist(), angles.tolist(),
+                axes.tolist(), axis_lengths.tolist(), radii.tolist()):
+            if length < 0.001:
+                continue
+            glPushMatrix()
+            glTranslatef(*start)
+            # Orient the cylinder along the bone
+            if abs(dy) > 0.999:
+                glRotatef(90 if dy > 0 else -90, 1, 0, 0)
+            elif axis_length > 0.001:
+                glRotatef(angle, axis_x / axis_length, 0, axis_z / axis_length)
+            gluCylinder(self.quadric, radius, radius, length, 16, 4)
             glPopMatrix()
-            return
-        
-        # Move to start position
-        glTranslatef(*start)
+    
+    def draw_joints(self, points, radii, color):
+        """
+        Draw spheres at points
         
-        # Rotate to point towards end
-        if abs(dy) > 0.999:
-            glRotatef(90 if dy > 0 else -90, 1, 0, 0)
-        else:
-            angle = np.degrees(np.arccos(dy / length))
-            axis_x = -dz
-            axis_z = dx
-            axis_length = np.sqrt(axis_x**2 + axis_z**2)
-            if axis_length > 0.001:
-                glRotatef(angle, axis_x/axis_length, 0, axis_z/axis_length)
-        
-        # Draw cylinder
+        Args:
+            points: (n, 3) array of 3D positions
+            radii: Radius per point (or one for all)
+            color: RGBA color
+        """
         glColor4f(*color)
-        quad = gluNewQuadric()
-        gluCylinder(quad, radius, radius, length, 16, 4)
-        gluDeleteQuadric(quad)
-        
-        glPopMatrix()
+        for position, radius in zip(points.tolist(), np.broadcast_to(radii, len(points)).tolist()):
+            glPushMatrix()
+            glTranslatef(*position)
+            gluSphere(self.quadric, radius, 16, 16)
+            glPopMatrix()
     
     def draw_hand(self, hand_landmarks, is_left=True):
-        """Draw a hand with all finger joints"""
-        if not hand_landmarks:
+        """
+        Draw a hand with all finger joints
+        
+        Args:
+            hand_landmarks: (21, 4) array [x, y, z, visibility], or None
+            is_left: Which side of the body to place it on
+        """
+        if hand_landmarks is None or not len(hand_landmarks):
             return
         
-        # Hand connections (MediaPipe hand landmark indices)
-        connections = [
-            # Thumb
-            (0, 1), (1, 2), (2, 3), (3, 4),
-            # Index
-            (0, 5), (5, 6), (6, 7), (7, 8),
-            # Middle
-            (0, 9), (9, 10), (10, 11), (11, 12),
-            # Ring
-            (0, 13), (13, 14), (14, 15), (15, 16),
-            # Pinky
-            (0, 17), (17, 18), (18, 19), (19, 20)
-        ]
-        
-        # Convert normalized coordinates to 3D
-        points_3d = []
-        for lm in hand_landmarks:
-            # Scale and center hand
-            x = (lm['x'] - 0.5) * 0.4
-            y = -(lm['y'] - 0.5) * 0.4
-            z = lm['z'] * 0.2
-            
-            # Offset left/right hand
-            if is_left:
-                x -= 0.3
-            else:
-                x += 0.3
-            
-            points_3d.append((x, y, z))
-        
-        # Draw connections (bones)
-        for start_idx, end_idx in connections:
-            if start_idx < len(points_3d) and end_idx < len(points_3d):
-                self.draw_cylinder(
-                    points_3d[start_idx],
-                    points_3d[end_idx],
-                    0.008,
-                    self.colors['primary']
-                )
-        
-        # Draw joints (spheres)
-        for point in points_3d:
-            self.draw_sphere(point, 0.015, self.colors['secondary'])
+        # Scale and center hand, offset to its side
+        points = (np.asarray(hand_landmarks, dtype=np.float32)[:, :3] - (0.5, 0.5, 0.0)) * (0.4, -0.4, 0.2)
+        points[:, 0] += -0.3 if is_left else 0.3
+        
+        self.draw_bones(points, HAND_CONNECTIONS, 0.008, self.colors['primary'])
+        self.draw_joints(points, 0.015, self.colors['secondary'])
     
     def draw_pose(self, pose_landmarks):
-        """Draw body pose"""
-        if not pose_landmarks:
+        """
+        Draw body pose
+        
+        Args:
+            pose_landmarks: (33, 4) array [x, y, z, visibility], or None
+        """
+        if pose_landmarks is None or not len(pose_landmarks):
             return
         
-        # Key body connections
-        connections = [
-            # Torso
-            (11, 12),  # Shoulders
-            (11, 23), (12, 24),  # Shoulders to hips
-            (23, 24),  # Hips
-            # Arms
-            (11, 13), (13, 15),  # Left arm
-            (12, 14), (14, 16),  # Right arm
-            # Legs
-            (23, 25), (25, 27),  # Left leg
-            (24, 26), (26, 28),  # Right leg
-        ]
-        
-        # Convert landmarks to 3D
-        points_3d = []
-        for lm in pose_landmarks:
-            x = (lm['x'] - 0.5) * 1.0
-            y = -(lm['y'] - 0.5) * 1.0
-            z = lm['z'] * 0.3
-            points_3d.append((x, y, z))
-        
-        # Draw connections
-        for start_idx, end_idx in connections:
-            if start_idx < len(points_3d) and end_idx < len(points_3d):
-                # Make torso/shoulders thicker
-                radius = 0.025 if start_idx in [11, 12, 23, 24] else 0.015
-                self.draw_cylinder(
-                    points_3d[start_idx],
-                    points_3d[end_idx],
-                    radius,
-                    self.colors['primary']
-                )
-        
-        # Draw joints
-        for i, point in enumerate(points_3d):
-            # Make key joints bigger
-            radius = 0.03 if i in [11, 12, 23, 24] else 0.02
-            self.draw_sphere(point, radius, self.colors['joints'])
+        points = (np.asarray(pose_landmarks, dtype=np.float32)[:, :3] - (0.5, 0.5, 0.0)) * (1.0, -1.0, 0.3)
+        
+        # Make torso/shoulders thicker, and key joints bigger
+        bone_radii = np.where(np.isin(POSE_CONNECTIONS[:, 0], TORSO_JOINTS), 0.025, 0.015)
+        joint_radii = np.where(np.isin(np.arange(len(points)), TORSO_JOINTS), 0.03, 0.02)
+        
+        self.draw_bones(points, POSE_CONNECTIONS, bone_radii, self.colors['primary'])
+        self.draw_joints(points, joint_radii, self.colors['joints'])
     
     def render_frame(self, pose_data):
         """
         Render a single frame of avatar animation
         
         Args:
-            pose_data: Dict with 'pose', 'left_hand', 'right_hand', 'face'
+            pose_data: One PoseSequence frame - dict of part -> (landmarks, 4)
+                       array, or None where the part was not detected
         """
         # Clear screen
         glClearColor(*self.colors['background'])
@@ -222,36 +278,52 @@ class FuturisticAvatar:
         glRotatef(self.camera_rotation[1], 0, 1, 0)
         
         # Draw avatar components
-        if pose_data.get('pose'):
-            self.draw_pose(pose_data['pose'])
-        
-        if pose_data.get('left_hand'):
-            self.draw_hand(pose_data['left_hand'], is_left=True)
-        
-        if pose_data.get('right_hand'):
-            self.draw_hand(pose_data['right_hand'], is_left=False)
+        self.draw_pose(pose_data.get('pose'))
+        self.draw_hand(pose_data.get('left_hand'), is_left=True)
+        self.draw_hand(pose_data.get('right_hand'), is_left=False)
         
         # Update display
         pygame.display.flip()
     
-    def animate_from_pose_file(self, pose_json_path, loop=False, fps=30):
+    def animate_from_pose_file(self, pose_path, loop=False, fps=30):
         """
         Animate avatar from extracted pose data
         
         Args:
-            pose_json_path: Path to JSON file with pose data
+            pose_path: Path to pose file (.npz, or legacy .json)
             loop: Whether to loop animation
             fps: Playback frame rate
         """
-        print(f"\n🎬 Loading animation: {os.path.basename(pose_json_path)}")
+        print(f"\n🎬 Loading animation: {os.path.basename(pose_path)}")
         
-        with open(pose_json_path, 'r') as f:
-            data = json.load(f)
+        frames = load_pose_sequence(pose_path)
         
-        frames = data['frames']
-        original_fps = data.get('fps', 30)
+        print(f"   Frames: {len(frames)} | FPS: {frames.fps:.1f}")
+        self.play_frames(frames, loop=loop, fps=fps)
+    
+    def animate_schedule(self, schedule, pose_dir="pose_data", fps=30, mode='stretch'):
+        """
+        Animate a timed sign schedule at the speaker's pace
         
-        print(f"   Frames: {len(frames)} | FPS: {original_fps:.1f}")
+        Args:
+            schedule: Entries from WLASLGenerator.schedule_signs()
+            pose_dir: Directory with <word>.npz / <word>.json pose files
+            fps: Playback frame rate
+            mode: 'stretch' or 'pad' (see schedule_frames)
+        """
+        frames = schedule_frames(schedule, pose_dir, fps, mode)
+        print(f"\n🎬 Timed animation: {len(schedule)} signs, {len(frames) / fps:.1f}s")
+        self.play_frames(frames, loop=False, fps=fps)
+    
+    def play_frames(self, frames, loop=False, fps=30):
+        """
+        Show pose frames in the window
+        
+        Args:
+            frames: PoseSequence (each frame is passed to render_frame)
+            loop: Whether to loop animation
+            fps: Playback frame rate
+        """
         print("   Controls: ESC=Exit, Space=Pause, R=Restart")
         
         clock = pygame.time.Clock()
@@ -303,12 +375,12 @@ class FuturisticAvatar:
         
         print("👋 Exiting...")
     
-    def export_animation_video(self, pose_json_path, output_path, fps=30):
+    def export_animation_video(self, pose_path, output_path, fps=30):
         """
         Export avatar animation as MP4 video
         
         Args:
-            pose_json_path: Path to pose data JSON
+            pose_path: Path to pose file (.npz, or legacy .json), or a PoseSequence
             output_path: Output video file path
             fps: Frame rate for output
         """
@@ -317,18 +389,15 @@ class FuturisticAvatar:
         
         import cv2
         
-        with open(pose_json_path, 'r') as f:
-            data = json.load(f)
-        
-        frames = data['frames']
+        frames = pose_path if isinstance(pose_path, PoseSequence) else load_pose_sequence(pose_path)
         
         # Setup video writer
         fourcc = cv2.VideoWriter_fourcc(*'mp4v')
         writer = cv2.VideoWriter(output_path, fourcc, fps, self.screen_size)
         
-        for i, frame_data in enumerate(frames):
+        for i in range(len(frames)):
             # Render frame
-            self.render_frame(frame_data)
+            self.render_frame(frames[i])
             
             # Read pixels from OpenGL
             glPixelStorei(GL_PACK_ALIGNMENT, 1)
@@ -364,12 +433,12 @@ if __name__ == "__main__":
     
     # Check if pose data exists
     if len(sys.argv) < 2:
-        print("\n💡 Usage: python avatar_animator.py <pose_data.json>")
+        print("\n💡 Usage: python avatar_animator.py <pose_data.npz|.json>")
         print("\n🔍 Looking for existing pose data...")
         
         pose_dir = "pose_data"
         if os.path.exists(pose_dir):
-            files = [f for f in os.listdir(pose_dir) if f.endswith('.json')]
+            files = sorted(f for f in os.listdir(pose_dir) if f.endswith((POSE_EXTENSION, '.json')))
             if files:
                 print(f"\n📁 Found {len(files)} pose files:")
                 for f in files[:5]:
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Batch Transcription - Offline faster-whisper transcription of audio files
+Decodes recordings in windows, transcribes them with batched inference across
+a worker pool and writes transcripts, subtitles and sign videos
+Usage: python batch_transcribe.py [--model base] [--workers N] [--batch-size 8]
+                                  [--output DIR] [--video timed|text|none] <file or dir> ...
+"""
+import os
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+import sys
+import time
+import threading
+import subprocess
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from video_tools import get_ffmpeg_exe, write_caption_file
+from whisper_registry import get_model
+
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.mp3')
+SAMPLE_RATE = 16000
+OUTPUT_DIR = "transcripts"
+
+# Audio decoded and transcribed at a time per file (10 minutes = ~38 MB)
+WINDOW_SECONDS = 600.0
+
+# Windows are cut at the quietest moment of their last few seconds
+CUT_SEARCH_SECONDS = 5.0
+
+# CTranslate2 threads per transcription worker (more scale poorly on CPU)
+THREADS_PER_WORKER = 4
+
+VIDEO_MODES = ('timed', 'text', 'none')
+
+
+def find_audio_files(inputs):
+    """
+    Expand files and directories into a sorted list of audio files
+    
+    Args:
+        inputs: File and directory paths (directories are searched recursively)
+    
+    Returns:
+        List of paths with a supported extension
+    """
+    files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.lower().endswith(AUDIO_EXTENSIONS))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            print(f"⚠️  Not found: {path}")
+    return sorted(dict.fromkeys(files))
+
+
+def quiet_cut(samples, sample_rate=SAMPLE_RATE, search=CUT_SEARCH_SECONDS, frame=0.02):
+    """
+    Sample index of the quietest frame in the last `search` seconds
+    
+    Cutting there keeps words from being split between two windows. The
+    search never reaches into the first half of the samples, so a cut
+    always keeps at least half of them.
+    """
+    size = int(frame * sample_rate)
+    start = len(samples) - min(int(search * sample_rate), len(samples) // 2)
+    count = (len(samples) - start) // size
+    if count < 2:
+        return len(samples)
+    frames = samples[start:start + count * size].reshape(count, size)
+    quietest = int(np.argmin((frames * frames).mean(axis=1)))
+    return start + quietest * size + size // 2
+
+
+def iter_audio_windows(path, window=WINDOW_SECONDS, sample_rate=SAMPLE_RATE):
+    """
+    Decode an audio file piece by piece through ffmpeg
+    
+    Only one window is held in memory at a time, so hour-long recordings
+    cost the same memory as short ones.
+    
+    Args:
+        path: Any file ffmpeg can read (WAV, FLAC, MP3, ...)
+        window: Seconds of audio per window
+        sample_rate: Output sample rate (mono)
+    
+    Yields:
+        (offset_seconds, float32 samples)
+    """
+    ffmpeg = get_ffmpeg_exe()
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found (install moviepy or add ffmpeg to PATH)")
+    
+    proc = subprocess.Popen(
+        [ffmpeg, "-hide_banner", "-loglevel", "error", "-i", path, "-vn",
+         "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    
+    window_samples = int(window * sample_rate)
+    buffer = np.zeros(0, dtype=np.float32)
+    offset = 0
+    try:
+        while True:
+            wanted = (window_samples - len(buffer)) * 2
+            data = proc.stdout.read(wanted)
+            samples = np.frombuffer(data[:len(data) // 2 * 2], dtype='<i2').astype(np.float32) / 32768.0
+            buffer = np.concatenate((buffer, samples))
+            
+            if len(data) < wanted:
+                break
+            
+            cut = quiet_cut(buffer, sample_rate, search=min(CUT_SEARCH_SECONDS, window / 2))
+            yield offset / sample_rate, buffer[:cut]
+            offset += cut
+            buffer = buffer[cut:]
+        
+        stderr = proc.stderr.read().decode(errors='replace').strip()
+        if proc.wait() != 0 and offset == 0 and not len(buffer):
+            reason = stderr.splitlines()[-1] if stderr else "ffmpeg failed"
+            raise RuntimeError(f"Could not decode {os.path.basename(path)}: {reason[:200]}")
+        if len(buffer):
+            yield offset / sample_rate, buffer
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.stderr.close()
+        proc.wait()
+
+
+class BatchTranscriber:
+    """Transcribe many recordings with one shared model and a worker pool"""
+    
+    def __init__(self, model_size="base", workers=None, batch_size=8, language="en"):
+        """
+        Args:
+            model_size: Whisper model (tiny/base/small/medium/large)
+            workers: Files transcribed in parallel (CPU cores / THREADS_PER_WORKER if None)
+            batch_size: Audio chunks decoded together by the batched pipeline
+            language: Spoken language (None = detect per file)
+        """
+        cores = os.cpu_count() or 1
+        self.workers = workers or max(1, cores // THREADS_PER_WORKER)
+        self.batch_size = batch_size
+        self.language = language
+        
+        print(f"🧵 {self.workers} workers × {max(1, cores // self.workers)} threads")
+        # One model serves every worker thread; num_workers lets them run concurrently
+        # (always local: the batched pipeline needs the model itself)
+        self.model = get_model(model_size, cpu_threads=max(1, cores // self.workers),
+                               num_workers=self.workers)
+        
+        # The batched pipeline keeps per-call state - one per worker thread
+        self._local = threading.local()
+    
+    def _pipeline(self):
+        from faster_whisper import BatchedInferencePipeline
+        
+        if not hasattr(self._local, 'pipeline'):
+            self._local.pipeline = BatchedInferencePipeline(self.model)
+        return self._local.pipeline
+    
+    def transcribe_file(self, path, word_timestamps=False):
+        """
+        Transcribe one recording
+        
+        Args:
+            path: Audio file
+            word_timestamps: Also time every word (needed for timed videos)
+        
+        Returns:
+            dict with path, segments (start, end, text), words, text,
+            audio_seconds, seconds and rtf
+        """
+        pipeline = self._pipeline()
+        start = time.perf_counter()
+        segments = []
+        words = []
+        audio_seconds = 0.0
+        
+        for offset, audio in iter_audio_windows(path):
+            audio_seconds = offset + len(audio) / SAMPLE_RATE
+            results, _ = pipeline.transcribe(
+                audio,
+                language=self.language,
+                batch_size=self.batch_size,
+                word_timestamps=word_timestamps,
+                vad_filter=True
+            )
+            for segment in results:
+                text = segment.text.strip()
+                if not text:
+                    continue
+                segments.append((offset + segment.start, offset + segment.end, text))
+                words.extend(
+                    {'word': word.word.strip(), 'start': offset + word.start, 'end': offset + word.end}
+                    for word in segment.words or [] if word.word.strip()
+                )
+        
+        seconds = time.perf_counter() - start
+        return {
+            'path': path,
+            'segments': segments,
+            'words': words,
+            'text': " ".join(text for _, _, text in segments),
+            'audio_seconds': audio_seconds,
+            'seconds': seconds,
+            'rtf': seconds / audio_seconds if audio_seconds else None,
+        }
+    
+    def run(self, inputs, output_dir=OUTPUT_DIR, video='timed', generator=None):
+        """
+        Transcribe files/directories and write the results
+        
+        For every recording <name>, output_dir gets <name>.txt (transcript),
+        <name>.srt (subtitles) and, unless video is 'none', <name>_asl.mp4.
+        Videos are rendered on this thread while the workers transcribe the
+        next files.
+        
+        Args:
+            inputs: Audio files and/or directories
+            output_dir: Where to write the results
+            video: 'timed' (signs paced like the speaker, with captions),
+                   'text' (plain sign video of the transcript) or 'none'
+            generator: WLASLGenerator for the videos (created if None)
+        
+        Returns:
+            List of result dicts (see transcribe_file) with txt, srt, video
+            and error added
+        """
+        if video not in VIDEO_MODES:
+            raise ValueError(f"Unknown video mode: {video} (use {', '.join(VIDEO_MODES)})")
+        
+        files = find_audio_files(inputs)
+        if not files:
+            raise ValueError("No audio files found")
+        
+        os.makedirs(output_dir, exist_ok=True)
+        # Output name per file (same-named files in different folders get a suffix)
+        names = {}
+        for path in files:
+            base = name = os.path.splitext(os.path.basename(path))[0]
+            number = 1
+            while name in names.values():
+                name = f"{base}_{number}"
+                number += 1
+            names[path] = name
+        
+        if video != 'none' and generator is None:
+            try:
+                from wlasl_generator import WLASLGenerator
+                generator = WLASLGenerator()
+            except Exception as e:
+                print(f"⚠️ Video generation disabled: {e}")
+                video = 'none'
+        
+        print(f"\n📦 Batch: {len(files)} files, {self.workers} workers, batch size {self.batch_size}")
+        batch_start = time.perf_counter()
+        results = []
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            jobs = {executor.submit(self.transcribe_file, path, video == 'timed'): path for path in files}
+            
+            for job in as_completed(jobs):
+                path = jobs[job]
+                try:
+                    result = job.result()
+                except Exception as e:
+                    print(f"❌ {os.path.basename(path)}: {e}")
+                    results.append({'path': path, 'audio_seconds': 0.0, 'seconds': None, 'rtf': None,
+                                    'txt': None, 'srt': None, 'video': None, 'error': str(e)})
+                    continue
+                
+                root = os.path.join(output_dir, names[path])
+                with open(root + ".txt", 'w', encoding='utf-8') as f:
+                    f.write(result['text'] + "\n")
+                result['txt'] = root + ".txt"
+                result['srt'] = write_caption_file(result['segments'], root + ".srt")
+                result['video'] = None
+                result['error'] = None
+                
+                print(f"✅ {os.path.basename(path)}: {result['audio_seconds']:.1f}s audio in "
+                      f"{result['seconds']:.1f}s (RTF {result['rtf'] or 0:.3f}), "
+                      f"{len(result['text'].split())} words")
+                
+                if result['text'] and video != 'none':
+                    try:
+                        if video == 'timed':
+                            schedule = generator.schedule_signs(result['words'])
+                            result['video'] = generator.generate_timed_video(
+                                schedule, output_path=root + "_asl.mp4", captions=('vtt',))
+                        else:
+                            result['video'] = generator.generate_video(result['text'],
+                                                                       output_path=root + "_asl.mp4")
+                    except Exception as e:
+                        print(f"❌ Video generation error for {os.path.basename(path)}: {e}")
+                
+                results.append(result)
+        
+        self._print_summary(results, time.perf_counter() - batch_start)
+        return results
+    
+    def _print_summary(self, results, wall_time):
+        """Per-file real-time factor and aggregate throughput"""
+        done = [r for r in results if not r['error']]
+        failed = [r for r in results if r['error']]
+        audio = sum(r['audio_seconds'] for r in done)
+        busy = sum(r['seconds'] for r in done)
+        
+        print(f"\n📊 Batch Summary:")
+        for r in sorted(results, key=lambda r: r['path']):
+            if r['error']:
+                print(f"   - {os.path.basename(r['path'])}: ❌ {r['error'][:60]}")
+            else:
+                print(f"   - {os.path.basename(r['path'])}: {r['audio_seconds']:.1f}s audio, "
+                      f"RTF {r['rtf'] or 0:.3f}" + (f" → {r['video']}" if r['video'] else ""))
+        
+        print(f"\n   - Files: {len(results)} ({len(done)} transcribed, {len(failed)} failed)")
+        print(f"   - Audio: {audio / 60:.1f} min in {wall_time:.1f}s wall time")
+        if audio:
+            print(f"   - Mean RTF per worker: {busy / audio:.3f}")
+            print(f"   - Throughput: {audio / wall_time:.1f}x real time")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--model': "base", '--workers': None, '--batch-size': "8",
+               '--output': OUTPUT_DIR, '--video': "timed"}
+    inputs = []
+    while args:
+        arg = args.pop(0)
+        if arg in options and args:
+            options[arg] = args.pop(0)
+        else:
+            inputs.append(arg)
+    
+    if not inputs:
+        print("💡 Usage: python batch_transcribe.py [--model base] [--workers N] [--batch-size 8]")
+        print("                                   [--output DIR] [--video timed|text|none] <file or dir> ...")
+        sys.exit(1)
+    
+    try:
+        transcriber = BatchTranscriber(
+            model_size=options['--model'],
+            workers=int(options['--workers']) if options['--workers'] else None,
+            batch_size=int(options['--batch-size'])
+        )
+        results = transcriber.run(inputs, output_dir=options['--output'], video=options['--video'])
+        sys.exit(1 if all(r['error'] for r in results) else 0)
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark the image strip/grid compositor against the original PIL paste loop,
+and the shared-palette GIF encoder against per-frame PIL quantization
+Usage: python benchmark_asl_images.py [--strip | --gif] [count ...]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import numpy as np
+from PIL import Image
+
+from asl_image_generator import text_to_asl_images, load_image_index, get_atlas, get_palette, composite_tiles
+from gif_encoder import encode_gif, save_animation
+
+DEFAULT_COUNTS = (10, 100, 1000)
+
+
+def legacy_image_sequence(image_paths, grid):
+    """The original implementation: pad each image, then paste again into the result"""
+    loaded_images = [Image.open(path) for path in image_paths]
+    
+    size = max(max(img.width for img in loaded_images), max(img.height for img in loaded_images))
+    resized = []
+    for img in loaded_images:
+        new_img = Image.new('RGB', (size, size), 'white')
+        offset = ((size - img.width) // 2, (size - img.height) // 2)
+        new_img.paste(img, offset)
+        resized.append(new_img)
+    
+    if grid:
+        cols = min(10, len(resized))
+        rows = (len(resized) + cols - 1) // cols
+        result = Image.new('RGB', (size * cols, size * rows), 'white')
+        for idx, img in enumerate(resized):
+            result.paste(img, ((idx % cols) * size, (idx // cols) * size))
+    else:
+        result = Image.new('RGB', (size * len(resized), size), 'white')
+        for idx, img in enumerate(resized):
+            result.paste(img, (idx * size, 0))
+    return result
+
+
+def numpy_image_sequence(image_paths, grid, atlas=None):
+    """The compositor, decoding images or slicing them from the atlas"""
+    tiles = []
+    for path in image_paths:
+        tile = atlas.frame(path) if atlas else None
+        if tile is None:
+            with Image.open(path) as img:
+                tile = np.asarray(img.convert('RGB'))
+        tiles.append(tile)
+    cols = min(10, len(tiles)) if grid else len(tiles)
+    return composite_tiles(tiles, cols)
+
+
+def timed(func, *args, **kwargs):
+    """Run once and return (seconds, result)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def run_benchmark(counts=DEFAULT_COUNTS, grid=True):
+    """
+    Compose the same letters with each implementation
+    
+    Args:
+        counts: Input lengths (characters) to test
+        grid: Grid layout (True) or horizontal strip (False)
+    
+    Returns:
+        List of result dicts (count, legacy, numpy, atlas seconds)
+    """
+    chars = sorted(load_image_index())
+    if not chars:
+        raise ValueError("No letter images found - download the Kaggle dataset first")
+    
+    atlas = get_atlas(400)
+    if atlas is None:
+        print("⚠️  Atlas not built - run: python asl_image_generator.py --build-atlas")
+    
+    layout = "grid" if grid else "strip"
+    print(f"📊 Compositing {layout}s of {', '.join(map(str, counts))} characters")
+    print()
+    print(f"{'chars':>6} {'legacy':>10} {'numpy':>10} {'atlas':>10} {'speedup':>8}")
+    
+    rng = random.Random(0)
+    results = []
+    for count in counts:
+        text = "".join(rng.choice(chars) for _ in range(count))
+        paths = [path for _, path in text_to_asl_images(text) if path]
+        
+        legacy_time, legacy = timed(legacy_image_sequence, paths, grid)
+        numpy_time, composed = timed(numpy_image_sequence, paths, grid)
+        assert composed.size == legacy.size
+        del legacy, composed
+        
+        atlas_time = None
+        if atlas is not None:
+            atlas_time, composed = timed(numpy_image_sequence, paths, grid, atlas)
+            del composed
+        
+        best = atlas_time if atlas_time is not None else numpy_time
+        atlas_text = f"{atlas_time:>9.3f}s" if atlas_time is not None else f"{'-':>10}"
+        print(f"{count:>6} {legacy_time:>9.3f}s {numpy_time:>9.3f}s {atlas_text} {legacy_time / best:>7.1f}x")
+        
+        results.append({
+            'count': count,
+            'legacy': legacy_time,
+            'numpy': numpy_time,
+            'atlas': atlas_time,
+        })
+    
+    return results
+
+
+def legacy_gif(frames, output_path, duration=800):
+    """The original GIF path: PIL quantizes every frame separately"""
+    images = [Image.fromarray(frame) for frame in frames]
+    images[0].save(output_path, save_all=True, append_images=images[1:], duration=duration, loop=0)
+
+
+def run_gif_benchmark(counts=(10, 100)):
+    """
+    Encode the same letter animation with each encoder
+    
+    Args:
+        counts: Input lengths (characters) to test
+    
+    Returns:
+        List of result dicts (count, encoder, seconds, bytes)
+    """
+    chars = sorted(load_image_index())
+    atlas = get_atlas(400)
+    if not chars or atlas is None:
+        raise ValueError("Build the atlas first: python asl_image_generator.py --build-atlas")
+    
+    palette, lut = get_palette()
+    encoders = [
+        ("PIL per-frame GIF", "gif", legacy_gif),
+        ("shared palette GIF", "gif", lambda frames, path: encode_gif(frames, palette, lut, path)),
+        ("animated WebP", "webp", save_animation),
+        ("APNG", "png", save_animation),
+    ]
+    
+    print(f"📊 Encoding animations of {', '.join(map(str, counts))} letters")
+    print()
+    print(f"{'chars':>6} {'encoder':<20} {'time':>9} {'size':>10}")
+    
+    rng = random.Random(0)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in counts:
+            text = "".join(rng.choice(chars) for _ in range(count))
+            frames = [atlas.frame(path) for _, path in text_to_asl_images(text) if path]
+            
+            for name, ext, encode in encoders:
+                path = os.path.join(tmp, f"bench.{ext}")
+                seconds, _ = timed(encode, frames, path)
+                size = os.path.getsize(path)
+                print(f"{count:>6} {name:<20} {seconds:>8.3f}s {size / 1024:>8.0f}KB")
+                results.append({'count': count, 'encoder': name, 'seconds': seconds, 'bytes': size})
+    
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    counts = [int(arg) for arg in args if not arg.startswith("--")]
+    if "--gif" in args:
+        run_gif_benchmark(counts or (10, 100))
+    else:
+        run_benchmark(counts or DEFAULT_COUNTS, grid="--strip" not in args)
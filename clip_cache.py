@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Clip Cache - In-memory LRU cache of decoded sign clips
+Hot signs are served from RAM instead of spawning an ffmpeg reader per word
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from video_tools import decode_frames, STORE_SIZE, STORE_FPS
+
+# Default memory budget for decoded frames
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class ClipCache:
+    """Decoded clips (I420 uint8 frame arrays) bounded by a memory budget"""
+    
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, size=STORE_SIZE, fps=STORE_FPS):
+        """
+        Args:
+            max_bytes: Memory budget for all cached frames
+            size: (width, height) clips are normalized to when decoded
+            fps: Frame rate clips are normalized to when decoded
+        """
+        self.max_bytes = max_bytes
+        self.size = tuple(size)
+        self.fps = fps
+        
+        self._clips = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+    
+    def get(self, path):
+        """
+        Get the decoded frames of a clip, decoding on a miss
+        
+        Args:
+            path: Video file
+        
+        Returns:
+            uint8 array of shape (frames, height * 3 // 2, width) - read-only
+        """
+        key = (path, os.stat(path).st_mtime_ns)
+        
+        with self._lock:
+            frames = self._clips.get(key)
+            if frames is not None:
+                self._clips.move_to_end(key)
+                self.hits += 1
+                return frames
+            self.misses += 1
+        
+        # Decode outside the lock so other requests keep being served
+        frames = decode_frames(path, self.size, self.fps)
+        frames.flags.writeable = False
+        
+        with self._lock:
+            if key not in self._clips and frames.nbytes <= self.max_bytes:
+                self._clips[key] = frames
+                self._bytes += frames.nbytes
+                self._evict()
+        return frames
+    
+    def _evict(self):
+        """Drop least recently used clips until within budget (lock held)"""
+        while self._bytes > self.max_bytes and self._clips:
+            _, frames = self._clips.popitem(last=False)
+            self._bytes -= frames.nbytes
+            self.evictions += 1
+            self.evicted_bytes += frames.nbytes
+    
+    def clear(self):
+        """Release all cached frames"""
+        with self._lock:
+            self._clips.clear()
+            self._bytes = 0
+    
+    def stats(self):
+        """Usage and eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'clips': len(self._clips),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'evicted_bytes': self.evicted_bytes,
+            }
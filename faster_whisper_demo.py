@@ -6,10 +6,11 @@ All models auto-download on first run - no manual setup needed!
 import os
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 
-import sounddevice as sd
-import numpy as np
 import time
 import sys
+import re
+import queue
+import threading
 
 # Check and install dependencies on first run
 try:
@@ -24,13 +25,116 @@ except ImportError:
     print("✅ Installation complete!\n")
 
 try:
-    from wlasl_generator import WLASLGenerator
+    from wlasl_generator import WLASLGenerator, TimedSignRenderer
 except ImportError:
     print("⚠️ WLASL generator not found. Video generation disabled.")
     WLASLGenerator = None
 
+from audio_capture import AudioRecorder
+from whisper_registry import get_model, preload, connect
+from asr_benchmark import load_profile, DEFAULT_PROFILE
+
+
+class StageMetrics:
+    """Latency and queue depth of one pipeline stage"""
+    
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.max_busy = 0.0
+        self.waited = 0.0
+        self.max_waited = 0.0
+        self.depth_total = 0
+        self.max_depth = 0
+        self._lock = threading.Lock()
+    
+    def record(self, waited, busy, depth):
+        """
+        Args:
+            waited: Seconds the item sat in the stage's input queue
+            busy: Seconds the stage spent on it
+            depth: Items still queued behind it
+        """
+        with self._lock:
+            self.items += 1
+            self.busy += busy
+            self.max_busy = max(self.max_busy, busy)
+            self.waited += waited
+            self.max_waited = max(self.max_waited, waited)
+            self.depth_total += depth
+            self.max_depth = max(self.max_depth, depth)
+    
+    def summary(self):
+        """One report line"""
+        with self._lock:
+            if not self.items:
+                return f"{self.name:<8} no items"
+            return (f"{self.name:<8} {self.items:>3} items | work avg {self.busy / self.items:.2f}s "
+                    f"max {self.max_busy:.2f}s | queue wait avg {self.waited / self.items:.2f}s "
+                    f"max {self.max_waited:.2f}s | depth avg {self.depth_total / self.items:.1f} "
+                    f"max {self.max_depth}")
+
+
+def _run_stage(work, inbox, outbox, metrics):
+    """
+    Pipeline worker: process items from inbox and pass results to outbox
+    
+    work(item) returns the item for the next stage, or None to drop it.
+    A None item shuts the stage down and is passed on.
+    """
+    while True:
+        item = inbox.get()
+        if item is None:
+            if outbox is not None:
+                outbox.put(None)
+            return
+        
+        started = time.perf_counter()
+        try:
+            result = work(item)
+        except Exception as e:
+            print(f"❌ {metrics.name} error: {e}")
+            result = None
+        metrics.record(started - item['queued'], time.perf_counter() - started, inbox.qsize())
+        
+        if result is not None and outbox is not None:
+            result['queued'] = time.perf_counter()
+            outbox.put(result)
+
+
+def _normalize_word(word):
+    """Compare words without case or punctuation"""
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def agreed_prefix(previous, current):
+    """
+    Number of leading words two consecutive hypotheses agree on
+    
+    Words confirmed by two passes over growing audio are stable enough to
+    finalize (local agreement).
+    """
+    count = 0
+    for old, new in zip(previous, current):
+        if _normalize_word(old['word']) != _normalize_word(new['word']):
+            break
+        count += 1
+    return count
+
+
+def _segment(words, final):
+    """Partial/final segment dict from a list of timed words"""
+    return {
+        'text': " ".join(word['word'] for word in words).strip(),
+        'start': words[0]['start'] if words else None,
+        'end': words[-1]['end'] if words else None,
+        'final': final,
+        'words': words,
+    }
+
 class FasterWhisperVoiceConverter:
-    def __init__(self, model_size="base"):
+    def __init__(self, model_size="base", use_daemon=True, profile=None):
         """
         Initialize Faster-Whisper model (auto-downloads on first run)
         
@@ -40,28 +144,27 @@ class FasterWhisperVoiceConverter:
         - small: ~500MB - Better accuracy
         - medium: ~1.5GB - Very accurate
         - large: ~3GB - Best accuracy
+        
+        Args:
+            model_size: Model to load
+            use_daemon: Use the warm model of a running Whisper daemon
+                        (python whisper_registry.py --serve) if there is one
+            profile: Name of a settings profile written by asr_benchmark.py
+                     (model, compute type, threads, beam size, VAD);
+                     overrides model_size
         """
-        print(f"📥 Loading Faster-Whisper '{model_size}' model...")
+        self.asr = load_profile(profile) if profile else dict(DEFAULT_PROFILE, model_size=model_size)
+        model_size = self.asr['model_size']
+        model_config = {key: self.asr[key] for key in ('compute_type', 'cpu_threads', 'num_workers')}
+        if profile:
+            print(f"⚙️  Profile '{profile}': {model_size} / {self.asr['compute_type']} / "
+                  f"beam {self.asr['beam_size']} / VAD {'on' if self.asr['vad_filter'] else 'off'}")
         print("   (First run: auto-downloads ~150MB model, then cached)")
-        start = time.time()
         
-        try:
-            # Auto-downloads model on first run, caches for future use
-            self.model = WhisperModel(
-                model_size, 
-                device="cpu",  # Use "cuda" if you have NVIDIA GPU
-                compute_type="int8",  # Fast inference
-                download_root=None  # Auto-downloads to default cache
-            )
-            
-            load_time = time.time() - start
-            print(f"✅ Model loaded in {load_time:.1f}s!")
-            
-        except Exception as e:
-            print(f"❌ Error loading model: {e}")
-            print("   Trying to download model...")
-            # Force download
-            self.model = WhisperModel(model_size, device="cpu", compute_type="int8")
+        # Load in the background while the video generator initializes
+        # (not needed when a daemon keeps the model warm)
+        if not (use_daemon and connect(model_size, model_config['compute_type'], model_config['cpu_threads'])):
+            preload(model_size, **model_config)
         
         # Initialize video generator if available
         if WLASLGenerator:
@@ -75,48 +178,59 @@ class FasterWhisperVoiceConverter:
             self.generator = None
             print("⚠️ Video generation disabled (WLASL not found)")
         
+        try:
+            # Shared registry: waits for the preload, or uses the daemon's model
+            self.model = get_model(model_size, use_daemon=use_daemon, **model_config)
+        except Exception as e:
+            print(f"❌ Error loading model: {e}")
+            print("   Trying to download model...")
+            self.model = get_model(model_size, **model_config)
+        
         self.sample_rate = 16000
+        self.recorder = AudioRecorder(self.sample_rate)
+        self.last_stream_stats = None
+        self.last_words = []
     
-    def record_audio(self, silence_threshold=0.01, silence_duration=3):
-        """Record audio with auto-stop on silence"""
-        print(f"\n🎤 Recording... Speak now. Auto-stops after {silence_duration}s of silence (or Ctrl+C).")
+    def record_audio(self, hangover=None, timeout=None):
+        """
+        Record one utterance, auto-stopping when the speaker stops
         
-        audio_data = []
-        silence_frames = 0
-        silence_limit = int(silence_duration * self.sample_rate / 1024)
+        Args:
+            hangover: Seconds of silence that end the utterance (default: VAD setting)
+            timeout: Give up after this many seconds without speech
+        """
+        vad = self.recorder.vad
+        if hangover is not None:
+            vad.hangover = hangover
         
-        def callback(indata, frames, time_info, status):
-            nonlocal silence_frames
-            audio_data.append(indata.copy())
-            
-            # Detect silence
-            volume = np.abs(indata).mean()
-            if volume < silence_threshold:
-                silence_frames += 1
-            else:
-                silence_frames = 0
-                print("    🔊 Listening...", end='\r')
+        print(f"\n🎤 Recording... Speak now. Auto-stops {vad.hangover:.1f}s after you stop talking (or Ctrl+C).")
+        if not vad.calibrated:
+            print(f"   (Measuring background noise for {vad.calibration:.1f}s first)")
         
-        try:
-            with sd.InputStream(samplerate=self.sample_rate, channels=1, 
-                              dtype='float32', callback=callback, blocksize=1024):
-                while True:
-                    if silence_frames >= silence_limit:
-                        print("\n✋ Auto-stopped (silence detected)          ")
-                        break
-                    sd.sleep(100)
-        except KeyboardInterrupt:
+        audio = self.recorder.record_utterance(timeout=timeout)
+        if self.recorder.interrupted:
             print("\n✋ Stopped by user")
         
-        if not audio_data:
+        if audio is None:
+            print("⚠️ No speech detected")
             return None
         
-        # Convert to numpy array
-        audio_np = np.concatenate(audio_data, axis=0)
-        return audio_np
+        print(f"✋ Auto-stopped ({len(audio) / self.sample_rate:.1f}s recorded)")
+        return audio
     
-    def transcribe_audio(self, audio_data):
-        """Transcribe audio using Faster-Whisper"""
+    def transcribe_audio(self, audio_data, word_timestamps=False):
+        """
+        Transcribe audio using Faster-Whisper
+        
+        Args:
+            audio_data: float32 samples
+            word_timestamps: Also time every word; the {'word', 'start', 'end'}
+                dicts (seconds into audio_data) are left in self.last_words
+        
+        Returns:
+            Transcript text
+        """
+        self.last_words = []
         if audio_data is None:
             return ""
         
@@ -128,13 +242,20 @@ class FasterWhisperVoiceConverter:
             segments, info = self.model.transcribe(
                 audio_data.flatten(),
                 language="en",
-                beam_size=5,
-                vad_filter=True,  # Voice Activity Detection
-                vad_parameters=dict(min_silence_duration_ms=500)
+                beam_size=self.asr['beam_size'],
+                vad_filter=self.asr['vad_filter'],  # Voice Activity Detection
+                vad_parameters=self.asr['vad_parameters'],
+                word_timestamps=word_timestamps
             )
             
             # Combine all segments
+            segments = list(segments)
             text = " ".join([segment.text for segment in segments]).strip()
+            if word_timestamps:
+                self.last_words = [
+                    {'word': word.word.strip(), 'start': word.start, 'end': word.end}
+                    for segment in segments for word in segment.words or [] if word.word.strip()
+                ]
             
             transcribe_time = time.time() - start
             
@@ -150,8 +271,186 @@ class FasterWhisperVoiceConverter:
             print(f"❌ Transcription error: {e}")
             return ""
     
-    def generate_video(self, text):
-        """Generate ASL video from text"""
+    def _transcribe_words(self, audio, offset=0.0, prompt=None, beam_size=1):
+        """
+        Word-level hypothesis for one audio window
+        
+        Args:
+            audio: float32 samples
+            offset: Stream time of the first sample (added to word times)
+            prompt: Already finalized text, for context
+            beam_size: Decoder beam size
+        
+        Returns:
+            List of {'word', 'start', 'end'} dicts
+        """
+        segments, _ = self.model.transcribe(
+            audio,
+            language="en",
+            beam_size=beam_size,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            initial_prompt=prompt or None,
+            vad_filter=False
+        )
+        
+        words = []
+        for segment in segments:
+            for word in segment.words or []:
+                text = word.word.strip()
+                if text:
+                    words.append({'word': text, 'start': offset + word.start, 'end': offset + word.end})
+        return words
+    
+    def _stream_worker(self, stop, step, max_window, beam_size, publish, committed):
+        """Transcribe the unconfirmed tail of the recording every `step` seconds"""
+        sr = self.sample_rate
+        recorder = self.recorder
+        ring = recorder.ring
+        window_start = 0  # absolute sample position of the first unconfirmed sample
+        last_pass = 0
+        pending = []      # unconfirmed words from the previous pass
+        
+        def transcribe(end):
+            start = max(window_start, ring.oldest())
+            prompt = " ".join(word['word'] for word in committed[-30:])
+            try:
+                return self._transcribe_words(ring.read(start, end), start / sr, prompt, beam_size)
+            except Exception as e:
+                print(f"\n❌ Transcription error: {e}")
+                return None
+        
+        while not stop.wait(0.05):
+            # Nothing to decode until the VAD has heard speech
+            if recorder.speech_start is None or ring.written - last_pass < step * sr:
+                continue
+            window_start = max(window_start, recorder.speech_start)
+            last_pass = ring.written
+            if last_pass - window_start < sr // 2:
+                continue
+            
+            words = transcribe(last_pass)
+            if words is None:
+                continue
+            
+            agreed = agreed_prefix(pending, words)
+            if last_pass - window_start > max_window * sr:
+                # Window too long to keep re-decoding: confirm all but the last word
+                agreed = max(agreed, len(words) - 1)
+            
+            if agreed:
+                final = words[:agreed]
+                committed.extend(final)
+                publish(_segment(final, True))
+                window_start = max(window_start, int(final[-1]['end'] * sr))
+            
+            pending = words[agreed:]
+            publish(_segment(pending, False))
+        
+        # End of speech: whatever is left is final
+        if recorder.speech_start is None:
+            return
+        window_start = max(window_start, recorder.speech_start)
+        end = recorder.speech_end or ring.written
+        if end - window_start >= sr // 10:
+            words = transcribe(end)
+            if words:
+                committed.extend(words)
+                publish(_segment(words, True))
+    
+    @staticmethod
+    def _print_segment(segment):
+        """Show partials on one updating line and finals with timestamps"""
+        if segment['final']:
+            print(f"\r   [{segment['start']:6.2f}s → {segment['end']:6.2f}s] {segment['text']}" + " " * 20)
+        else:
+            print(f"\r   … {segment['text'][-70:]}" + " " * 10, end='', flush=True)
+    
+    def stream_transcribe(self, step=1.0, max_window=20.0, hangover=None, beam_size=1,
+                          on_segment=None, timeout=None):
+        """
+        Streaming mode: transcribe overlapping windows while still recording
+        
+        A worker thread re-transcribes the unconfirmed audio every `step`
+        seconds. Words that two consecutive passes agree on are finalized and
+        their audio dropped from the window; the rest is shown as a partial.
+        
+        Args:
+            step: Seconds of new audio between transcription passes
+            max_window: Longest unconfirmed window (seconds) before it is finalized anyway
+            hangover: Seconds of silence that end the utterance (default: VAD setting)
+            beam_size: Beam size per pass (1 = greedy, lowest latency)
+            on_segment: Callback for every segment dict (text, start, end, final, words);
+                prints them by default
+            timeout: Give up after this many seconds without speech
+        
+        Returns:
+            Full transcript text
+        """
+        recorder = self.recorder
+        if hangover is not None:
+            recorder.vad.hangover = hangover
+        print(f"\n🎤 Streaming... Speak now. Stops {recorder.vad.hangover:.1f}s after you stop talking (or Ctrl+C).")
+        
+        stats = {'speech_start': None, 'speech_end': None, 'first_word': None,
+                 'endpoint': None, 'final': None}
+        emit = on_segment or self._print_segment
+        
+        def publish(segment):
+            if segment['text'] and stats['first_word'] is None:
+                stats['first_word'] = time.perf_counter()
+            emit(segment)
+        
+        committed = []
+        stop = threading.Event()
+        worker = threading.Thread(
+            target=self._stream_worker,
+            args=(stop, step, max_window, beam_size, publish, committed),
+            daemon=True
+        )
+        
+        try:
+            with recorder:
+                worker.start()
+                recorder.wait_for_utterance(timeout=timeout)
+        except KeyboardInterrupt:
+            print("\n✋ Stopped by user")
+        
+        stats['endpoint'] = time.perf_counter()
+        stop.set()
+        if worker.is_alive():
+            worker.join()
+        stats['final'] = time.perf_counter()
+        
+        if recorder.speech_onset is not None:
+            stats['speech_start'] = recorder.wall_time(recorder.speech_onset)
+        if recorder.speech_end is not None:
+            stats['speech_end'] = recorder.wall_time(
+                recorder.speech_end - int(recorder.vad.hangover * self.sample_rate))
+        self.last_stream_stats = stats
+        
+        text = " ".join(word['word'] for word in committed).strip()
+        
+        print()
+        if stats['speech_start'] and stats['first_word']:
+            print(f"⏱️  First word shown {stats['first_word'] - stats['speech_start']:.2f}s after speech started")
+        if stats['speech_end'] and text:
+            print(f"⏱️  Final transcript {stats['final'] - stats['speech_end']:.2f}s after end of speech "
+                  f"({stats['final'] - stats['endpoint']:.2f}s after endpointing)")
+        if not text:
+            print("⚠️ No speech detected")
+        
+        return text
+    
+    def generate_video(self, text, words=None):
+        """
+        Generate ASL video from text
+        
+        Args:
+            text: Transcript
+            words: Timed words (see transcribe_audio); if given, each sign is
+                fitted to when its word was spoken and captions are written
+        """
         if not text:
             return None
         
@@ -161,7 +460,10 @@ class FasterWhisperVoiceConverter:
         
         print(f"\n🎬 Generating ASL video...")
         try:
-            output_path = self.generator.generate_video(text)
+            if words:
+                output_path = self.generator.generate_timed_video(self.generator.schedule_signs(words))
+            else:
+                output_path = self.generator.generate_video(text)
             
             if output_path:
                 print(f"✅ Video saved: {output_path}")
@@ -173,8 +475,130 @@ class FasterWhisperVoiceConverter:
             print(f"❌ Video generation error: {e}")
             return None
     
-    def run(self):
-        """Main pipeline: Record → Transcribe → Generate Video"""
+    def stream_timed_video(self, **kwargs):
+        """
+        Streaming mode that renders a timed sign video while you speak
+        
+        Every finalized segment is scheduled and retimed in the background
+        right away, so only the final join is left after you stop talking.
+        Word times are relative to the start of the utterance.
+        
+        Args:
+            **kwargs: Passed to stream_transcribe
+        
+        Returns:
+            (text, video_path)
+        """
+        if not self.generator:
+            print("⚠️ Video generation skipped (WLASL not available)")
+            return self.stream_transcribe(**kwargs), None
+        
+        renderer = TimedSignRenderer(self.generator)
+        emit = kwargs.pop('on_segment', None) or self._print_segment
+        
+        def on_segment(segment):
+            emit(segment)
+            if segment['final'] and segment['words']:
+                offset = (self.recorder.speech_start or 0) / self.sample_rate
+                renderer.add_words([dict(word, start=word['start'] - offset, end=word['end'] - offset)
+                                    for word in segment['words']])
+        
+        text = self.stream_transcribe(on_segment=on_segment, **kwargs)
+        if not text:
+            return text, None
+        
+        try:
+            return text, renderer.finish()
+        except Exception as e:
+            print(f"❌ Video generation error: {e}")
+            return text, None
+    
+    def run_pipeline(self, queue_size=2, timed=False):
+        """
+        Pipelined mode: Record → Transcribe → Generate Video as overlapping stages
+        
+        Capture runs on this thread and transcription and rendering on their
+        own, connected by bounded queues, so the next utterance is recorded
+        while earlier ones are transcribed and rendered. A full queue makes
+        the previous stage wait (backpressure). Stop with Ctrl+C.
+        
+        Args:
+            queue_size: Maximum utterances waiting between two stages
+            timed: Fit each sign to when its word was spoken (word timestamps)
+        """
+        print("\n" + "="*60)
+        print("🎙️ Faster-Whisper Voice to Sign Language Converter (pipelined)")
+        print("="*60)
+        print("💡 Keep talking - each utterance is processed in the background")
+        print("="*60 + "\n")
+        
+        audio_queue = queue.Queue(maxsize=queue_size)
+        text_queue = queue.Queue(maxsize=queue_size)
+        metrics = {name: StageMetrics(name) for name in ('capture', 'asr', 'render')}
+        
+        def transcribe(item):
+            item['text'] = self.transcribe_audio(item.pop('audio'), word_timestamps=timed)
+            item['words'] = self.last_words
+            return item if item['text'] else None
+        
+        def render(item):
+            item['video'] = self.generate_video(item['text'], item['words'])
+            latency = time.perf_counter() - item['captured']
+            print(f"📊 Utterance #{item['id']}: {latency:.1f}s from end of speech to video "
+                  f"(queued: audio {audio_queue.qsize()}, text {text_queue.qsize()})")
+            return item
+        
+        workers = [
+            threading.Thread(target=_run_stage, args=(transcribe, audio_queue, text_queue, metrics['asr']),
+                             daemon=True),
+            threading.Thread(target=_run_stage, args=(render, text_queue, None, metrics['render']),
+                             daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+        
+        count = 0
+        try:
+            while True:
+                started = time.perf_counter()
+                audio = self.record_audio()
+                
+                if audio is not None:
+                    count += 1
+                    captured = time.perf_counter()
+                    item = {'id': count, 'audio': audio, 'captured': captured, 'queued': captured}
+                    # Blocks while transcription is queue_size utterances behind
+                    audio_queue.put(item)
+                    metrics['capture'].record(time.perf_counter() - captured, captured - started,
+                                              audio_queue.qsize())
+                
+                if self.recorder.interrupted:
+                    break
+        except KeyboardInterrupt:
+            pass
+        
+        print("\n⏳ Finishing queued utterances... (Ctrl+C again to quit now)")
+        try:
+            audio_queue.put(None)
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            pass
+        
+        print("\n📊 Pipeline stages (capture wait = time blocked on a full queue):")
+        for stage in metrics.values():
+            print(f"   {stage.summary()}")
+        print("👋 Goodbye!")
+    
+    def run(self, stream=False, timed=False):
+        """
+        Main pipeline: Record → Transcribe → Generate Video
+        
+        Args:
+            stream: Transcribe while recording (see stream_transcribe)
+            timed: Fit each sign to when its word was spoken and write
+                captions (see WLASLGenerator.schedule_signs)
+        """
         print("\n" + "="*60)
         print("🎙️ Faster-Whisper Voice to Sign Language Converter")
         print("="*60)
@@ -183,15 +607,24 @@ class FasterWhisperVoiceConverter:
         
         while True:
             try:
-                # Record audio
-                audio = self.record_audio(silence_duration=3)
-                
-                # Transcribe
-                text = self.transcribe_audio(audio)
-                
-                # Generate video
-                if text:
-                    self.generate_video(text)
+                if stream and timed:
+                    # Record, transcribe and render together
+                    self.stream_timed_video()
+                elif stream:
+                    # Record and transcribe together
+                    text = self.stream_transcribe()
+                    if text:
+                        self.generate_video(text)
+                else:
+                    # Record audio
+                    audio = self.record_audio()
+                    
+                    # Transcribe
+                    text = self.transcribe_audio(audio, word_timestamps=timed)
+                    
+                    # Generate video
+                    if text:
+                        self.generate_video(text, self.last_words if timed else None)
                 
                 # Ask to continue
                 print("\n" + "-"*60)
@@ -212,8 +645,18 @@ if __name__ == "__main__":
     try:
         # Use "base" model - auto-downloads ~150MB on first run
         # Change to "tiny" for faster (75MB) or "small" for better accuracy (500MB)
-        converter = FasterWhisperVoiceConverter(model_size="base")
-        converter.run()
+        # Pass --stream to see words while still speaking,
+        # or --pipeline to keep talking while earlier utterances are processed;
+        # add --timed to pace the signs like the speaker (with captions)
+        # and --profile NAME to use settings picked by asr_benchmark.py
+        args = sys.argv[1:]
+        profile = args[args.index("--profile") + 1] if "--profile" in args[:-1] else None
+        converter = FasterWhisperVoiceConverter(model_size="base", profile=profile)
+        timed = "--timed" in sys.argv[1:]
+        if "--pipeline" in sys.argv[1:]:
+            converter.run_pipeline(timed=timed)
+        else:
+            converter.run(stream="--stream" in sys.argv[1:], timed=timed)
     except Exception as e:
         print(f"❌ Startup error: {e}")
         import traceback
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+GIF Encoder - Fast animated GIFs from a shared palette
+Frames are quantized with a lookup table and only changed regions are stored
+"""
+import numpy as np
+from PIL import Image, GifImagePlugin
+
+from asl_atlas import TRANSPARENT_INDEX
+
+
+def quantize(frame, lut):
+    """
+    Map an RGB frame to palette indices
+    
+    Args:
+        frame: (height, width, 3) uint8 array
+        lut: (32768,) uint8 table from asl_atlas.build_palette
+    
+    Returns:
+        (height, width) uint8 index array
+    """
+    rgb = np.asarray(frame) >> 3
+    bins = (rgb[..., 0].astype(np.uint16) << 10) | (rgb[..., 1].astype(np.uint16) << 5) | rgb[..., 2]
+    return lut[bins]
+
+
+def _palette_image(indices, palette_bytes):
+    """Wrap an index array as a P-mode image"""
+    im = Image.fromarray(np.ascontiguousarray(indices), 'P')
+    im.putpalette(palette_bytes)
+    return im
+
+
+class GifWriter:
+    """
+    Incremental GIF writer with one global palette and delta frames
+    
+    Frames are written as they arrive, so memory stays constant however long
+    the animation is. Each frame after the first stores only the bounding box
+    of pixels that changed, with unchanged pixels inside it left transparent.
+    Identical consecutive frames are merged into one longer frame.
+    """
+    
+    def __init__(self, output_path, palette, lut, loop=0):
+        """
+        Args:
+            output_path: Where to save the GIF
+            palette: (256, 3) uint8 palette
+            lut: Quantization table for the palette
+            loop: Loop count (0 = forever)
+        """
+        self.output_path = output_path
+        self.lut = lut
+        self.loop = loop
+        self.frames = 0
+        
+        self._palette_bytes = palette.astype(np.uint8).tobytes()
+        self._fp = open(output_path, 'wb')
+        self._shown = None
+        self._pending = None  # [image, offset, duration] held back to merge repeats
+    
+    def write(self, frame, duration=800):
+        """
+        Append one frame
+        
+        Args:
+            frame: (height, width, 3) uint8 array, same size as the first frame
+            duration: Milliseconds to show it
+        """
+        indices = quantize(frame, self.lut)
+        
+        if self._shown is None:
+            header, _ = GifImagePlugin.getheader(
+                _palette_image(indices, self._palette_bytes),
+                info={'loop': self.loop, 'duration': duration, 'optimize': False}
+            )
+            for chunk in header:
+                self._fp.write(chunk)
+            self._shown = indices.copy()
+            self._pending = [_palette_image(indices, self._palette_bytes), (0, 0), duration]
+            return
+        
+        changed = indices != self._shown
+        rows = np.flatnonzero(changed.any(axis=1))
+        if len(rows) == 0:
+            self._pending[2] += duration
+            return
+        cols = np.flatnonzero(changed.any(axis=0))
+        top, bottom = rows[0], rows[-1] + 1
+        left, right = cols[0], cols[-1] + 1
+        
+        region = indices[top:bottom, left:right].copy()
+        region[~changed[top:bottom, left:right]] = TRANSPARENT_INDEX
+        self._shown[changed] = indices[changed]
+        
+        self._flush()
+        self._pending = [_palette_image(region, self._palette_bytes), (int(left), int(top)), duration]
+    
+    def _flush(self):
+        """Write the held-back frame (disposal 1 keeps it under the next delta)"""
+        im, offset, duration = self._pending
+        for chunk in GifImagePlugin.getdata(im, offset=offset, duration=duration,
+                                            disposal=1, transparency=TRANSPARENT_INDEX):
+            self._fp.write(chunk)
+        self.frames += 1
+        self._pending = None
+    
+    def close(self):
+        """
+        Finish the file
+        
+        Returns:
+            Number of frames written
+        """
+        if self._fp.closed:
+            return self.frames
+        try:
+            if self._pending is None:
+                raise ValueError("No frames to encode")
+            self._flush()
+            self._fp.write(b";")
+        finally:
+            self._fp.close()
+        return self.frames
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._fp.close()
+
+
+def encode_gif(frames, palette, lut, output_path, duration=800, loop=0):
+    """
+    Write an animated GIF with one global palette and delta frames
+    
+    Args:
+        frames: Iterable of (height, width, 3) uint8 arrays, all the same size
+            (a generator keeps only one frame in memory)
+        palette: (256, 3) uint8 palette
+        lut: Quantization table for the palette
+        output_path: Where to save the GIF
+        duration: Milliseconds per frame
+        loop: Loop count (0 = forever)
+    
+    Returns:
+        Number of frames written
+    """
+    with GifWriter(output_path, palette, lut, loop=loop) as writer:
+        for frame in frames:
+            writer.write(frame, duration)
+    return writer.frames
+
+
+def save_animation(frames, output_path, duration=800, loop=0):
+    """
+    Save full-color frames as animated WebP (.webp) or APNG (.png)
+    
+    Args:
+        frames: List of (height, width, 3) uint8 arrays
+        output_path: Destination, format chosen by extension
+        duration: Milliseconds per frame
+        loop: Loop count (0 = forever)
+    
+    Returns:
+        Path to the saved file
+    """
+    images = [Image.fromarray(np.asarray(frame)) for frame in frames]
+    if not images:
+        raise ValueError("No frames to encode")
+    
+    params = {'save_all': True, 'append_images': images[1:], 'duration': duration, 'loop': loop}
+    if output_path.lower().endswith('.webp'):
+        params.update(quality=80, method=4)
+    images[0].save(output_path, **params)
+    return output_path
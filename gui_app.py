@@ -8,13 +8,14 @@ os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 
 import customtkinter as ctk
 import threading
+import sys
 import time
 from pathlib import Path
-import json
 
 # Import our modules
 try:
     from faster_whisper import WhisperModel
+    import whisper_registry
 except ImportError:
     WhisperModel = None
 
@@ -33,8 +34,9 @@ try:
 except ImportError:
     FuturisticAvatar = None
 
-import sounddevice as sd
-import numpy as np
+from audio_capture import AudioRecorder
+from pose_format import POSE_EXTENSION
+from pose_library import PoseLibrary
 
 # Set appearance
 ctk.set_appearance_mode("dark")
@@ -44,8 +46,15 @@ ctk.set_default_color_theme("blue")
 class VoiceToSignLanguageApp:
     """Main GUI application"""
     
-    def __init__(self):
-        """Initialize the application"""
+    def __init__(self, clip_cache_mb=0):
+        """
+        Initialize the application
+        
+        Args:
+            clip_cache_mb: Memory for decoded sign clips (0 = no clip cache);
+                           only sentences that are re-encoded use it
+        """
+        self.clip_cache_mb = clip_cache_mb
         self.root = ctk.CTk()
         self.root.title("Voice to Sign Language - Avatar Edition")
         self.root.geometry("1200x800")
@@ -53,14 +62,19 @@ class VoiceToSignLanguageApp:
         # State variables
         self.is_recording = False
         self.current_audio = None
+        self.recorder = AudioRecorder(16000)
         self.current_text = ""
         self.current_pose_file = None
+        self.current_pose = None  # PoseSequence behind current_pose_file
         self.processing_stage = "idle"
         
-        # Models (lazy loaded)
+        # Models (lazy loaded) - Whisper starts loading right away
         self.whisper_model = None
+        if WhisperModel and not whisper_registry.connect("base"):
+            whisper_registry.preload("base")
         self.wlasl_generator = None
         self.pose_extractor = None
+        self.pose_library = PoseLibrary()
         
         # Setup UI
         self.setup_ui()
@@ -210,17 +224,14 @@ class VoiceToSignLanguageApp:
             self.update_stage("Loading Faster-Whisper model...")
             
             if WhisperModel:
-                self.whisper_model = WhisperModel(
-                    "base",
-                    device="cpu",
-                    compute_type="int8"
-                )
+                # Shared with the rest of the process (a running daemon's model if there is one)
+                self.whisper_model = whisper_registry.get_model("base", use_daemon=True)
                 self.update_info("✅ Faster-Whisper loaded", "green")
             
             self.update_stage("Loading WLASL generator...")
             
             if WLASLGenerator:
-                self.wlasl_generator = WLASLGenerator()
+                self.wlasl_generator = WLASLGenerator(clip_cache_mb=self.clip_cache_mb)
                 self.update_info("✅ WLASL dataset ready", "green")
             
             self.update_stage("Loading pose extractor...")
@@ -229,6 +240,9 @@ class VoiceToSignLanguageApp:
                 self.pose_extractor = PoseExtractor()
                 self.update_info("✅ MediaPipe pose extractor ready", "green")
             
+            if len(self.pose_library):
+                self.update_info(f"✅ Pose library: {len(self.pose_library)} precomputed signs", "green")
+            
             self.update_stage("Ready!")
             self.update_info("✅ All systems ready! Click to record.", "cyan")
             self.progress_bar.set(0)
@@ -268,44 +282,20 @@ class VoiceToSignLanguageApp:
             self.update_stage("🎤 Recording... Speak now!")
             self.progress_bar.set(0.1)
             
-            sample_rate = 16000
-            audio_data = []
-            silence_frames = 0
-            silence_limit = int(3 * sample_rate / 1024)  # 3 seconds
-            
-            def callback(indata, frames, time_info, status):
-                nonlocal silence_frames
-                audio_data.append(indata.copy())
-                
-                volume = np.abs(indata).mean()
-                if volume < 0.01:
-                    silence_frames += 1
-                else:
-                    silence_frames = 0
-            
-            with sd.InputStream(
-                samplerate=sample_rate,
-                channels=1,
-                dtype='float32',
-                callback=callback,
-                blocksize=1024
-            ):
-                while self.is_recording:
-                    if silence_frames >= silence_limit:
-                        break
-                    time.sleep(0.1)
+            # Stops when the VAD hears the end of speech or the button is pressed
+            audio = self.recorder.record_utterance(should_stop=lambda: not self.is_recording)
             
             self.stop_recording()
             
-            if audio_data:
-                self.current_audio = np.concatenate(audio_data, axis=0)
+            if audio is not None:
+                self.current_audio = audio
                 self.update_stage("✅ Recording complete!")
                 self.progress_bar.set(0.25)
                 
                 # Process the audio
                 self.process_audio()
             else:
-                self.update_info("⚠️ No audio recorded", "orange")
+                self.update_info("⚠️ No speech detected", "orange")
                 
         except Exception as e:
             self.update_info(f"❌ Recording error: {e}", "red")
@@ -370,60 +360,31 @@ class VoiceToSignLanguageApp:
                 self.progress_bar.set(0)
                 return
             
-            # Step 3: Extract pose
-            self.update_stage(f"🔍 Extracting pose data...")
-            self.progress_bar.set(0.7)
-            
-            if not self.pose_extractor:
-                raise Exception("Pose extractor not loaded")
-            
-            # Extract pose to temp file
-            pose_dir = "pose_data"
-            os.makedirs(pose_dir, exist_ok=True)
-            
-            import cv2
-            cap = cv2.VideoCapture(video_path)
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            frames_data = []
-            
-            frame_idx = 0
-            while cap.isOpened() and frame_idx < 60:  # Limit to 2 seconds
-                success, frame = cap.read()
-                if not success:
-                    break
+            # Step 3: Extract pose (precomputed library first: a file read)
+            pose_file = self.pose_library.path(video_path)
+            if pose_file:
+                pose = self.pose_library.get(video_path)
+                self.update_stage(f"📚 Pose loaded from library! ({len(pose)} frames)")
+            else:
+                self.update_stage(f"🔍 Extracting pose data...")
+                self.progress_bar.set(0.7)
                 
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = self.pose_extractor.holistic.process(frame_rgb)
+                if not self.pose_extractor:
+                    raise Exception("Pose extractor not loaded")
                 
-                frame_data = {
-                    'frame_idx': frame_idx,
-                    'timestamp': frame_idx / fps if fps > 0 else 0,
-                    'pose': self.pose_extractor._landmarks_to_list(results.pose_landmarks),
-                    'left_hand': self.pose_extractor._landmarks_to_list(results.left_hand_landmarks),
-                    'right_hand': self.pose_extractor._landmarks_to_list(results.right_hand_landmarks),
-                    'face': self.pose_extractor._landmarks_to_list(results.face_landmarks)
-                }
+                # Extract pose to temp file (first 2 seconds)
+                pose_dir = "pose_data"
+                os.makedirs(pose_dir, exist_ok=True)
                 
-                frames_data.append(frame_data)
-                frame_idx += 1
-            
-            cap.release()
-            
-            pose_data = {
-                'frames': frames_data,
-                'fps': fps,
-                'duration': len(frames_data) / fps if fps > 0 else 0,
-                'frame_count': len(frames_data),
-                'word': target_word
-            }
-            
-            pose_file = os.path.join(pose_dir, f"{target_word}_temp.json")
-            with open(pose_file, 'w') as f:
-                json.dump(pose_data, f)
+                pose = self.pose_extractor.extract_from_video(video_path, max_frames=60)
+                pose.meta['word'] = target_word
+                
+                pose_file = pose.save(os.path.join(pose_dir, f"{target_word}_temp{POSE_EXTENSION}"))
+                self.update_stage(f"✅ Pose extracted! ({len(pose)} frames)")
             
             self.current_pose_file = pose_file
+            self.current_pose = pose
             
-            self.update_stage(f"✅ Pose extracted! ({len(frames_data)} frames)")
             self.progress_bar.set(0.9)
             
             # Step 4: Ready to animate
@@ -431,7 +392,7 @@ class VoiceToSignLanguageApp:
             self.progress_bar.set(1.0)
             
             self.avatar_info.configure(
-                text=f"Avatar ready for word: '{target_word}' ({len(frames_data)} frames)",
+                text=f"Avatar ready for word: '{target_word}' ({len(pose)} frames)",
                 text_color="cyan"
             )
             
@@ -466,7 +427,7 @@ class VoiceToSignLanguageApp:
                 return
             
             avatar = FuturisticAvatar(screen_size=(1024, 768))
-            avatar.animate_from_pose_file(self.current_pose_file, loop=True, fps=30)
+            avatar.play_frames(self.current_pose, loop=True, fps=30)
             
         except Exception as e:
             self.update_info(f"❌ Avatar error: {e}", "red")
@@ -496,7 +457,7 @@ class VoiceToSignLanguageApp:
             output_path = os.path.join(output_dir, f"avatar_{timestamp}.mp4")
             
             avatar = FuturisticAvatar(screen_size=(1024, 768))
-            avatar.export_animation_video(self.current_pose_file, output_path, fps=30)
+            avatar.export_animation_video(self.current_pose, output_path, fps=30)
             
             self.update_info(f"✅ Video exported: {output_path}", "green")
             
@@ -528,8 +489,13 @@ if __name__ == "__main__":
     print("\n🚀 Starting graphical interface...")
     print("💡 This may take a moment to load models...\n")
     
+    # Optional: --clip-cache-mb N keeps decoded sign clips in memory between sentences
+    clip_cache_mb = 0
+    if "--clip-cache-mb" in sys.argv[:-1]:
+        clip_cache_mb = int(sys.argv[sys.argv.index("--clip-cache-mb") + 1])
+    
     try:
-        app = VoiceToSignLanguageApp()
+        app = VoiceToSignLanguageApp(clip_cache_mb=clip_cache_mb)
         app.run()
     except Exception as e:
         print(f"\n❌ Error: {e}")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Output Cache - Content-addressed cache for generated ASL files
+Repeated requests for the same sign sequence return the existing file instantly
+"""
+import os
+import re
+import json
+import hashlib
+import threading
+
+OUTPUT_DIR = "asl_outputs"
+
+# Cached outputs are evicted (least recently used first) above this size
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+# Only files written by the cache are ever evicted
+_ENTRY_PATTERN = re.compile(r"^asl_[0-9a-f]{20}\.\w+$")
+
+
+class OutputCache:
+    """Size-bounded LRU cache of rendered outputs, keyed by content"""
+    
+    def __init__(self, cache_dir=OUTPUT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: Directory holding cached outputs
+            max_bytes: Total size budget for cached outputs
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def make_key(self, *parts):
+        """
+        Hash what determines the output (resolved signs, format, encoder settings)
+        
+        Args:
+            parts: JSON-serializable values
+        
+        Returns:
+            Hex key string
+        """
+        payload = json.dumps(parts, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:20]
+    
+    def path_for(self, key, ext):
+        """Final path of a cache entry"""
+        return os.path.join(self.cache_dir, f"asl_{key}.{ext}")
+    
+    def temp_path(self, key, ext):
+        """Path to render into before commit() (keeps the extension for encoders)"""
+        return os.path.join(self.cache_dir, f"asl_{key}.part.{ext}")
+    
+    def get(self, key, ext):
+        """
+        Look up a cached output
+        
+        Returns:
+            Path to the cached file, or None on a miss
+        """
+        path = self.path_for(key, ext)
+        with self._lock:
+            if os.path.exists(path):
+                # Refresh recency for LRU eviction
+                os.utime(path, None)
+                self.hits += 1
+                return path
+            self.misses += 1
+            return None
+    
+    def commit(self, key, ext):
+        """
+        Publish a file rendered at temp_path() and enforce the size budget
+        
+        Returns:
+            Final path of the entry
+        """
+        path = self.path_for(key, ext)
+        os.replace(self.temp_path(key, ext), path)
+        self.evict()
+        return path
+    
+    def discard(self, key, ext):
+        """Delete a render left at temp_path() (failed or not worth caching)"""
+        try:
+            os.remove(self.temp_path(key, ext))
+        except FileNotFoundError:
+            pass
+    
+    def evict(self):
+        """Delete least recently used entries until the cache fits the budget"""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not _ENTRY_PATTERN.match(name):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+    
+    def stats(self):
+        """Hit/miss counters for this process"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
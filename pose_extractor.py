@@ -5,11 +5,14 @@ Converts video movements into pose data that can be used to animate a 3D avatar
 """
 import os
 import cv2
-import json
 import mediapipe as mp
 import numpy as np
 from pathlib import Path
 
+from pose_format import POSE_EXTENSION
+from pose_sequence import PoseSequence
+from pose_library import PoseLibrary, LIBRARY_DIR
+
 class PoseExtractor:
     """Extract pose landmarks from ASL videos using MediaPipe Holistic"""
     
@@ -34,25 +37,26 @@ class PoseExtractor:
         
         print("✅ MediaPipe ready!")
     
-    def extract_from_video(self, video_path, max_frames=None):
+    def extract_from_video(self, video_path, max_frames=None, start_frame=0, end_frame=None,
+                           verbose=True):
         """
         Extract pose landmarks from a video file
         
         Args:
             video_path: Path to video file
             max_frames: Maximum frames to process (None = all)
+            start_frame: First frame to process (0-based)
+            end_frame: Stop before this frame (None = end of video)
+            verbose: Print progress
         
         Returns:
-            dict with pose data: {
-                'frames': list of frame data,
-                'fps': video fps,
-                'duration': video duration
-            }
+            PoseSequence at the video's frame rate
         """
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video not found: {video_path}")
         
-        print(f"📹 Processing: {os.path.basename(video_path)}")
+        if verbose:
+            print(f"📹 Processing: {os.path.basename(video_path)}")
         
         # Open video
         cap = cv2.VideoCapture(video_path)
@@ -60,69 +64,73 @@ class PoseExtractor:
         frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         duration = frame_count / fps if fps > 0 else 0
         
-        print(f"   FPS: {fps:.1f} | Frames: {frame_count} | Duration: {duration:.1f}s")
+        if verbose:
+            print(f"   FPS: {fps:.1f} | Frames: {frame_count} | Duration: {duration:.1f}s")
+        
+        if start_frame:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        max_frames = max_frames or None
+        if end_frame is not None:
+            limit = max(0, end_frame - start_frame)
+            max_frames = min(max_frames, limit) if max_frames else limit
         
         frames_data = []
         frame_idx = 0
         
         while cap.isOpened():
-            success, frame = cap.read()
-            if not success:
+            if max_frames is not None and frame_idx >= max_frames:
                 break
             
-            if max_frames and frame_idx >= max_frames:
+            success, frame = cap.read()
+            if not success:
                 break
             
             # Convert BGR to RGB
             frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             
-            # Process with MediaPipe
-            results = self.holistic.process(frame_rgb)
-            
-            # Extract landmarks
-            frame_data = {
-                'frame_idx': frame_idx,
-                'timestamp': frame_idx / fps if fps > 0 else 0,
-                'pose': self._landmarks_to_list(results.pose_landmarks),
-                'left_hand': self._landmarks_to_list(results.left_hand_landmarks),
-                'right_hand': self._landmarks_to_list(results.right_hand_landmarks),
-                'face': self._landmarks_to_list(results.face_landmarks)
-            }
-            
-            frames_data.append(frame_data)
+            frames_data.append(self.process_frame(frame_rgb))
             frame_idx += 1
             
             # Progress indicator
-            if frame_idx % 30 == 0:
+            if verbose and frame_idx % 30 == 0:
                 print(f"   Processed {frame_idx}/{frame_count} frames...", end='\r')
         
         cap.release()
         
-        print(f"\n✅ Extracted {len(frames_data)} frames of pose data")
+        if verbose:
+            print(f"\n✅ Extracted {len(frames_data)} frames of pose data")
+        
+        return PoseSequence.from_landmarks(frames_data, fps=fps if fps > 0 else 30.0)
+    
+    def process_frame(self, frame_rgb):
+        """
+        Landmarks for one RGB frame
         
+        Returns:
+            Dict of part -> (landmarks, 4) float32 array [x, y, z, visibility],
+            or None where MediaPipe found nothing
+        """
+        results = self.holistic.process(frame_rgb)
         return {
-            'frames': frames_data,
-            'fps': fps,
-            'duration': duration,
-            'frame_count': len(frames_data)
+            'pose': self._landmarks_to_array(results.pose_landmarks),
+            'left_hand': self._landmarks_to_array(results.left_hand_landmarks),
+            'right_hand': self._landmarks_to_array(results.right_hand_landmarks),
+            'face': self._landmarks_to_array(results.face_landmarks)
         }
     
-    def _landmarks_to_list(self, landmarks):
-        """Convert MediaPipe landmarks to list of coordinates"""
+    def _landmarks_to_array(self, landmarks):
+        """Convert MediaPipe landmarks to a (landmarks, 4) array"""
         if not landmarks:
             return None
         
-        return [
-            {
-                'x': landmark.x,
-                'y': landmark.y,
-                'z': landmark.z,
-                'visibility': landmark.visibility if hasattr(landmark, 'visibility') else 1.0
-            }
+        return np.array([
+            (landmark.x, landmark.y, landmark.z,
+             landmark.visibility if hasattr(landmark, 'visibility') else 1.0)
             for landmark in landmarks.landmark
-        ]
+        ], dtype=np.float32)
     
-    def extract_from_wlasl_word(self, word, wlasl_dir=None, output_dir="pose_data"):
+    def extract_from_wlasl_word(self, word, wlasl_dir=None, output_dir="pose_data", quantize=False,
+                                as_json=False, library_dir=LIBRARY_DIR):
         """
         Extract pose data from WLASL video for a specific word
         
@@ -130,9 +138,12 @@ class PoseExtractor:
             word: ASL word to extract
             wlasl_dir: WLASL dataset directory
             output_dir: Where to save extracted pose data
+            quantize: Store int16 landmarks (half the size of float32)
+            as_json: Write the legacy JSON format instead of compact .npz
+            library_dir: Precomputed pose library to check first (None = always extract)
         
         Returns:
-            Path to saved JSON file
+            Path to saved pose file
         """
         # Default WLASL path
         if wlasl_dir is None:
@@ -153,17 +164,19 @@ class PoseExtractor:
         print(f"\n🎯 Extracting pose for '{word}'")
         print(f"   Video: {os.path.basename(video_path)}")
         
-        # Extract pose data
-        pose_data = self.extract_from_video(video_path)
-        pose_data['word'] = word
-        pose_data['video_path'] = video_path
+        # Precomputed poses (pose_library.py) skip MediaPipe entirely
+        pose = PoseLibrary(library_dir).get(video_path) if library_dir else None
+        if pose is not None:
+            print("📚 Found in pose library")
+        else:
+            pose = self.extract_from_video(video_path)
+        pose.meta['word'] = word
+        pose.meta['video_path'] = video_path
         
-        # Save to JSON
+        # Save as compact columnar arrays (see pose_format.py) unless JSON was asked for
         os.makedirs(output_dir, exist_ok=True)
-        output_file = os.path.join(output_dir, f"{word.lower()}.json")
-        
-        with open(output_file, 'w') as f:
-            json.dump(pose_data, f, indent=2)
+        extension = ".json" if as_json else POSE_EXTENSION
+        output_file = pose.save(os.path.join(output_dir, f"{word.lower()}{extension}"), quantize=quantize)
         
         print(f"💾 Saved pose data: {output_file}")
         
@@ -250,33 +263,34 @@ if __name__ == "__main__":
     extractor = PoseExtractor()
     
     # Test with a WLASL word
-    test_word = sys.argv[1] if len(sys.argv) > 1 else "hello"
+    words = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    test_word = words[0] if words else "hello"
     
     try:
         print(f"\n🎯 Testing with word: '{test_word}'")
-        output_file = extractor.extract_from_wlasl_word(test_word)
+        output_file = extractor.extract_from_wlasl_word(test_word, quantize="--int16" in sys.argv,
+                                                        as_json="--json" in sys.argv)
         
         print(f"\n✅ Success! Pose data saved to: {output_file}")
         print("\n💡 You can now use this data to animate a 3D avatar!")
         
         # Load and show summary
-        with open(output_file, 'r') as f:
-            data = json.load(f)
+        pose = PoseSequence.load(output_file)
         
         print(f"\n📊 Pose Data Summary:")
-        print(f"   Word: {data['word']}")
-        print(f"   Frames: {data['frame_count']}")
-        print(f"   Duration: {data['duration']:.2f}s")
-        print(f"   FPS: {data['fps']:.1f}")
-        
-        # Check first frame
-        if data['frames']:
-            frame = data['frames'][0]
-            print(f"\n   First frame landmarks:")
-            print(f"     - Pose points: {len(frame['pose']) if frame['pose'] else 0}")
-            print(f"     - Left hand: {len(frame['left_hand']) if frame['left_hand'] else 0}")
-            print(f"     - Right hand: {len(frame['right_hand']) if frame['right_hand'] else 0}")
-            print(f"     - Face: {len(frame['face']) if frame['face'] else 0}")
+        print(f"   Size: {os.path.getsize(output_file) / 1024:.0f} KB")
+        print(f"   Word: {pose.meta['word']}")
+        print(f"   Frames: {len(pose)}")
+        print(f"   Duration: {pose.duration:.2f}s")
+        print(f"   FPS: {pose.fps:.1f}")
+        
+        # How often each part was detected
+        if len(pose):
+            print(f"\n   Frames with landmarks:")
+            print(f"     - Pose: {pose.masks['pose'].sum()}/{len(pose)}")
+            print(f"     - Left hand: {pose.masks['left_hand'].sum()}/{len(pose)}")
+            print(f"     - Right hand: {pose.masks['right_hand'].sum()}/{len(pose)}")
+            print(f"     - Face: {pose.masks['face'].sum()}/{len(pose)}")
         
     except Exception as e:
         print(f"\n❌ Error: {e}")
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Pose Format - Compact binary storage for extracted pose data
+One (frames, landmarks, 4) array per body part plus a presence mask, saved as
+.npz in float32 or int16-quantized form; reads the older JSON files too
+Usage: python pose_format.py convert <file.json|dir>... [--int16]
+       python pose_format.py compare <file.json>
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import numpy as np
+
+FORMAT_VERSION = 1
+POSE_EXTENSION = ".npz"
+
+# MediaPipe Holistic landmark counts (face includes the refined iris points)
+PARTS = (('pose', 33), ('left_hand', 21), ('right_hand', 21), ('face', 478))
+PART_NAMES = tuple(name for name, _ in PARTS)
+
+# Landmark channels, in array order
+CHANNELS = ('x', 'y', 'z', 'visibility')
+
+# int16 quantization: 1/8192 steps cover -4..4 (normalized image coordinates
+# plus off-screen margin) at well under a pixel even at 4K
+QUANT_SCALE = 8192
+
+
+def frames_to_arrays(frames):
+    """
+    Columnar arrays from per-frame landmark dicts
+    
+    Args:
+        frames: Frame dicts in the legacy JSON layout
+    
+    Returns:
+        (arrays, masks) - per part, a (frames, landmarks, 4) float32 array and
+        a (frames,) bool array that is False where the part was not detected
+    """
+    arrays, masks = {}, {}
+    for name, default_count in PARTS:
+        found = [len(frame[name]) for frame in frames if frame.get(name)]
+        count = max(found) if found else default_count
+        data = np.zeros((len(frames), count, len(CHANNELS)), dtype=np.float32)
+        mask = np.zeros(len(frames), dtype=bool)
+        for i, frame in enumerate(frames):
+            landmarks = frame.get(name)
+            if landmarks:
+                data[i, :len(landmarks)] = [[lm[c] for c in CHANNELS] for lm in landmarks]
+                mask[i] = True
+        arrays[name] = data
+        masks[name] = mask
+    return arrays, masks
+
+
+def arrays_to_frames(arrays, masks, timestamps=None, parts=PART_NAMES):
+    """
+    Per-frame landmark dicts (the JSON layout) from columnar arrays
+    
+    Args:
+        arrays: Per-part (frames, landmarks, 4) arrays
+        masks: Per-part presence masks
+        timestamps: Optional per-frame times in seconds
+        parts: Parts to include (others are None) - skipping the 478-point
+               face makes this several times faster
+    
+    Returns:
+        List of frame dicts
+    """
+    count = len(next(iter(masks.values()))) if masks else 0
+    frames = [{'frame_idx': i} for i in range(count)]
+    if timestamps is not None:
+        for frame, timestamp in zip(frames, np.asarray(timestamps).tolist()):
+            frame['timestamp'] = timestamp
+    
+    for name in PART_NAMES:
+        if name not in parts or name not in arrays:
+            for frame in frames:
+                frame[name] = None
+            continue
+        # tolist() once per part is far cheaper than per-element float()
+        values = arrays[name].tolist()
+        for frame, present, landmarks in zip(frames, masks[name].tolist(), values):
+            frame[name] = [dict(zip(CHANNELS, lm)) for lm in landmarks] if present else None
+    return frames
+
+
+def write_arrays(path, arrays, masks, meta=None, quantize=False, timestamps=None):
+    """
+    Save columnar pose arrays
+    
+    Args:
+        path: Destination .npz file
+        arrays: Per-part (frames, landmarks, 4) float arrays
+        masks: Per-part presence masks
+        meta: JSON-serializable extras (fps, duration, word, ...)
+        quantize: Store int16 (half the size, ~1e-4 precision) instead of float32
+        timestamps: Optional per-frame times in seconds
+    
+    Returns:
+        path
+    """
+    meta = dict(meta or {}, version=FORMAT_VERSION, scale=QUANT_SCALE if quantize else None)
+    contents = {'meta': np.array(json.dumps(meta))}
+    if timestamps is not None:
+        contents['timestamps'] = np.asarray(timestamps, dtype=np.float64)
+    for name in PART_NAMES:
+        if name not in arrays:
+            continue
+        data = np.asarray(arrays[name], dtype=np.float32)
+        if quantize:
+            data = np.clip(np.round(data * QUANT_SCALE), -32768, 32767).astype(np.int16)
+        contents[name] = data
+        contents[f"{name}_mask"] = np.asarray(masks[name], dtype=bool)
+    
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Uncompressed: members load with a single read, no inflate
+    with open(path, 'wb') as f:
+        np.savez(f, **contents)
+    return path
+
+
+def read_arrays(path, parts=PART_NAMES):
+    """
+    Load columnar pose arrays written by write_arrays
+    
+    Args:
+        path: .npz pose file
+        parts: Parts to load (the others are not read from disk)
+    
+    Returns:
+        (arrays, masks, meta) - arrays are float32 whatever the stored type;
+        meta['timestamps'] holds the frame times if they were saved
+    """
+    arrays, masks = {}, {}
+    with np.load(path) as data:
+        meta = json.loads(str(data['meta']))
+        if meta.get('version', FORMAT_VERSION) > FORMAT_VERSION:
+            raise ValueError(f"{path} uses pose format v{meta['version']} (this reader: v{FORMAT_VERSION})")
+        if 'timestamps' in data.files:
+            meta['timestamps'] = data['timestamps']
+        
+        scale = meta.get('scale')
+        for name in parts:
+            if name not in data.files:
+                continue
+            values = data[name]
+            arrays[name] = values.astype(np.float32) / scale if scale else values
+            masks[name] = data[f"{name}_mask"]
+    return arrays, masks, meta
+
+
+def save_pose(path, pose_data, quantize=False):
+    """
+    Save pose data in the compact format
+    
+    Args:
+        path: Destination .npz file
+        pose_data: Dict in the legacy JSON layout ('frames' plus fps, word,
+                   ...); 'frames' is stored as arrays
+        quantize: Store int16 instead of float32
+    
+    Returns:
+        path
+    """
+    frames = pose_data.get('frames', [])
+    arrays, masks = frames_to_arrays(frames)
+    meta = {key: value for key, value in pose_data.items() if key != 'frames'}
+    meta.setdefault('frame_count', len(frames))
+    timestamps = [frame.get('timestamp', i / (pose_data.get('fps') or 30)) for i, frame in enumerate(frames)]
+    return write_arrays(path, arrays, masks, meta, quantize, timestamps)
+
+
+def load_pose(path, parts=PART_NAMES):
+    """
+    Load a pose file in either format
+    
+    Args:
+        path: .npz (compact) or .json (legacy) pose file
+        parts: Parts to decode from .npz files (others come back as None)
+    
+    Returns:
+        Dict in the extractor's layout: 'frames' plus fps, duration, word, ...
+    """
+    if not path.lower().endswith(POSE_EXTENSION):
+        with open(path, 'r') as f:
+            return json.load(f)
+    
+    arrays, masks, meta = read_arrays(path, parts)
+    timestamps = meta.pop('timestamps', None)
+    meta.pop('version', None)
+    meta.pop('scale', None)
+    meta['frames'] = arrays_to_frames(arrays, masks, timestamps, parts)
+    return meta
+
+
+def find_pose_file(pose_dir, word):
+    """
+    Pose file for a word, preferring the compact format
+    
+    Returns:
+        Path, or None if the word has not been extracted
+    """
+    for extension in (POSE_EXTENSION, ".json"):
+        path = os.path.join(pose_dir, f"{word.lower()}{extension}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def convert(json_path, quantize=False, output_path=None):
+    """
+    Convert a legacy JSON pose file to the compact format
+    
+    Args:
+        json_path: Existing .json pose file
+        quantize: Store int16 instead of float32
+        output_path: Destination (default: same name with .npz)
+    
+    Returns:
+        Path to the new file
+    """
+    if output_path is None:
+        output_path = os.path.splitext(json_path)[0] + POSE_EXTENSION
+    with open(json_path, 'r') as f:
+        pose_data = json.load(f)
+    return save_pose(output_path, pose_data, quantize=quantize)
+
+
+def _timed(function, repeats=3):
+    """Best-of wall time for a call, and its result"""
+    best, result = None, None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def compare_formats(json_path):
+    """
+    Print file sizes and load times of a JSON pose file in each format
+    
+    Args:
+        json_path: Legacy .json pose file
+    
+    Returns:
+        List of dicts with format, bytes, load_seconds (full file) and
+        avatar_seconds (the parts the avatar draws, as a PoseSequence)
+    """
+    from pose_sequence import PoseSequence
+    
+    drawn = ('pose', 'left_hand', 'right_hand')
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        float_path = convert(json_path, output_path=os.path.join(tmp, "float32.npz"))
+        int16_path = convert(json_path, quantize=True, output_path=os.path.join(tmp, "int16.npz"))
+        
+        reference = PoseSequence.load(json_path)
+        for label, path in (('json', json_path), ('npz float32', float_path), ('npz int16', int16_path)):
+            load_seconds, sequence = _timed(lambda: PoseSequence.load(path))
+            avatar_seconds, _ = _timed(lambda: PoseSequence.load(path, parts=drawn))
+            error = max((float(np.abs(data - reference.arrays[name]).max())
+                         for name, data in sequence.arrays.items() if data.size), default=0.0)
+            results.append({'format': label, 'bytes': os.path.getsize(path), 'load_seconds': load_seconds,
+                            'avatar_seconds': avatar_seconds, 'max_error': error})
+    
+    print(f"\n📊 {os.path.basename(json_path)} ({len(reference)} frames)")
+    print(f"   {'Format':<12} {'Size':>10} {'Ratio':>7} {'Load':>9} {'Avatar*':>9} {'Max err':>9}")
+    for result in results:
+        ratio = results[0]['bytes'] / result['bytes']
+        print(f"   {result['format']:<12} {result['bytes'] / 1024:>8.0f}KB {ratio:>6.1f}x "
+              f"{result['load_seconds'] * 1000:>7.1f}ms {result['avatar_seconds'] * 1000:>7.1f}ms "
+              f"{result['max_error']:>9.1e}")
+    print("   * pose + hands only, as the avatar loads them")
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    command = args.pop(0) if args else None
+    quantize = "--int16" in args
+    paths = [arg for arg in args if not arg.startswith("--")]
+    
+    if command == "convert" and paths:
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                             if name.endswith(".json"))
+            else:
+                files.append(path)
+        
+        before = after = 0
+        for json_path in files:
+            output_path = convert(json_path, quantize=quantize)
+            before += os.path.getsize(json_path)
+            after += os.path.getsize(output_path)
+            print(f"✅ {json_path} → {output_path}")
+        if files:
+            print(f"\n💾 {len(files)} files: {before / 1e6:.1f} MB → {after / 1e6:.1f} MB "
+                  f"({before / max(after, 1):.1f}x smaller)")
+        else:
+            print("❌ No JSON pose files found")
+    elif command == "compare" and paths:
+        for json_path in paths:
+            compare_formats(json_path)
+    else:
+        print("💡 Usage: python pose_format.py convert <file.json|dir>... [--int16]")
+        print("          python pose_format.py compare <file.json>")
+        sys.exit(1)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Pose Library - Poses for the whole WLASL vocabulary, extracted ahead of time
+A process pool (one MediaPipe Holistic per worker) extracts every mapped sign
+once into compact .npz files with a manifest; runtime lookup is a file read
+Usage: python pose_library.py [--workers N] [--words a,b,...] [--int16] [--force]
+       python pose_library.py --status
+"""
+import os
+import sys
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pose_format import POSE_EXTENSION, PART_NAMES
+from pose_sequence import PoseSequence
+
+LIBRARY_DIR = "pose_library"
+
+# Bump when the manifest layout changes
+LIBRARY_VERSION = 1
+
+# Save the manifest every this many finished videos (resume point)
+CHECKPOINT_EVERY = 25
+
+# Extractor owned by each pool worker (see _init_worker)
+_extractor = None
+
+
+def _read_manifest(library_dir):
+    """Load a library manifest, or None if missing/unreadable"""
+    try:
+        with open(os.path.join(library_dir, "manifest.json"), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != LIBRARY_VERSION:
+        return None
+    return manifest
+
+
+def _write_manifest(library_dir, manifest):
+    """Write the manifest via a temp file so readers never see a partial file"""
+    path = os.path.join(library_dir, "manifest.json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+def _init_worker():
+    """Process-pool initializer: one Holistic instance per worker, reused for every video"""
+    global _extractor
+    from pose_extractor import PoseExtractor
+    _extractor = PoseExtractor()
+
+
+def _extract_job(src_path, output_path, start_frame, end_frame, quantize):
+    """Process-pool worker: extract one video into the library"""
+    start = time.time()
+    pose = _extractor.extract_from_video(src_path, start_frame=start_frame, end_frame=end_frame,
+                                         verbose=False)
+    if not len(pose):
+        raise RuntimeError("No frames decoded")
+    pose.meta['video_path'] = src_path
+    
+    # Write next to the target and rename, so an interrupted run never leaves a partial file
+    tmp_path = output_path + ".tmp"
+    pose.save(tmp_path, quantize=quantize)
+    os.replace(tmp_path, output_path)
+    return len(pose), pose.fps, time.time() - start
+
+
+def build_library(generator=None, library_dir=LIBRARY_DIR, workers=None, quantize=False, force=False,
+                  words=None):
+    """
+    Extract poses for every sign in the WLASL vocabulary
+    
+    Incremental and resumable: videos already in the library are skipped
+    unless the source changed, the precision changed, or force=True, and
+    the manifest is checkpointed while running so an interrupted build
+    continues where it stopped.
+    
+    Args:
+        generator: WLASLGenerator whose word_to_video is walked (default: a new one)
+        library_dir: Output directory
+        workers: Parallel extraction processes (half the CPU cores if None)
+        quantize: Store int16 landmarks instead of float32
+        force: Re-extract everything
+        words: Only these words (the whole vocabulary if None)
+    
+    Returns:
+        Path to the library directory
+    """
+    if generator is None:
+        from wlasl_generator import WLASLGenerator
+        generator = WLASLGenerator()
+    workers = workers or max(1, (os.cpu_count() or 2) // 2)
+    os.makedirs(library_dir, exist_ok=True)
+    
+    manifest = _read_manifest(library_dir)
+    if force or manifest is None:
+        manifest = {"version": LIBRARY_VERSION, "clips": {}, "words": {}}
+    
+    mapping = generator.word_to_video
+    if words is not None:
+        mapping = {word: path for word in words
+                   for path in [generator.find_sign(word.lower())] if path}
+    
+    # Several words can share one video - extract each file once
+    todo = []
+    sources = sorted(set(mapping.values()))
+    for src_path in sources:
+        name = os.path.basename(src_path)
+        entry = manifest["clips"].get(name)
+        mtime = os.stat(src_path).st_mtime_ns
+        if (entry and entry["source_mtime"] == mtime and entry["quantize"] == quantize
+                and os.path.exists(os.path.join(library_dir, entry["file"]))):
+            continue
+        todo.append((src_path, name, mtime))
+    
+    manifest["words"].update({word: os.path.basename(path) for word, path in mapping.items()})
+    
+    print(f"🧍 Extracting poses for {len(todo)} videos with {workers} workers "
+          f"({len(sources) - len(todo)} already up to date)")
+    
+    build_start = time.time()
+    failed = []
+    total_frames = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            jobs = {}
+            for src_path, name, mtime in todo:
+                # WLASL frame numbers are 1-based and inclusive, -1 = until the end
+                start, end = generator.clip_ranges.get(name, (1, -1))
+                output_file = os.path.splitext(name)[0] + POSE_EXTENSION
+                future = pool.submit(_extract_job, src_path, os.path.join(library_dir, output_file),
+                                     max(start - 1, 0), end if end > 0 else None, quantize)
+                jobs[future] = (src_path, name, mtime, output_file)
+            
+            try:
+                for done, future in enumerate(as_completed(jobs), 1):
+                    src_path, name, mtime, output_file = jobs[future]
+                    try:
+                        frames, fps, _ = future.result()
+                    except Exception as e:
+                        failed.append((name, str(e)))
+                    else:
+                        total_frames += frames
+                        manifest["clips"][name] = {"file": output_file, "source": src_path, "source_mtime": mtime,
+                                                   "quantize": quantize, "frames": frames, "fps": fps}
+                    
+                    # Checkpoint so an interrupted run resumes where it stopped
+                    if done % CHECKPOINT_EVERY == 0:
+                        _write_manifest(library_dir, manifest)
+                    print(f"   Extracted {done}/{len(jobs)} videos...", end='\r')
+            except KeyboardInterrupt:
+                print("\n⏹️  Interrupted - saving progress (run again to resume)")
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+    finally:
+        _write_manifest(library_dir, manifest)
+    
+    elapsed = time.time() - build_start
+    size_mb = sum(os.path.getsize(os.path.join(library_dir, entry["file"]))
+                  for entry in manifest["clips"].values()
+                  if os.path.exists(os.path.join(library_dir, entry["file"]))) / 1e6
+    print(f"\n✅ Pose library ready: {len(manifest['clips'])} videos, {len(manifest['words'])} words, "
+          f"{size_mb:.1f} MB in {library_dir}")
+    if todo:
+        print(f"   {len(todo) - len(failed)} extracted in {elapsed:.1f}s "
+              f"({total_frames / max(elapsed, 1e-9):.0f} frames/s)")
+    for name, error in failed[:10]:
+        print(f"   ⚠️  {name}: {error}")
+    if len(failed) > 10:
+        print(f"   ⚠️  ... and {len(failed) - 10} more failed")
+    
+    return library_dir
+
+
+class PoseLibrary:
+    """Runtime lookup of precomputed poses (see build_library)"""
+    
+    def __init__(self, library_dir=LIBRARY_DIR):
+        """
+        Args:
+            library_dir: Library directory (an empty or missing one finds nothing)
+        """
+        self.library_dir = library_dir
+        self._manifest = None
+        self._manifest_mtime = None
+        self.hits = 0
+        self.misses = 0
+    
+    def _current(self):
+        """Manifest, reloaded when a build updates it"""
+        path = os.path.join(self.library_dir, "manifest.json")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return {"clips": {}, "words": {}}
+        if mtime != self._manifest_mtime:
+            self._manifest = _read_manifest(self.library_dir) or {"clips": {}, "words": {}}
+            self._manifest_mtime = mtime
+        return self._manifest
+    
+    def __len__(self):
+        return len(self._current()["clips"])
+    
+    def path(self, video_path):
+        """
+        Library file for a dataset video
+        
+        Args:
+            video_path: Dataset video, or its normalized store copy (same name)
+        
+        Returns:
+            Path, or None if the video is not in the library (or changed since)
+        """
+        entry = self._current()["clips"].get(os.path.basename(video_path))
+        if entry is None:
+            return None
+        source = entry["source"]
+        if os.path.exists(source) and os.stat(source).st_mtime_ns != entry["source_mtime"]:
+            return None
+        path = os.path.join(self.library_dir, entry["file"])
+        return path if os.path.exists(path) else None
+    
+    def word_path(self, word):
+        """Library file for a vocabulary word, or None (also if its video changed since)"""
+        manifest = self._current()
+        entry = manifest["clips"].get(manifest["words"].get(word.lower()))
+        return self.path(entry["source"]) if entry else None
+    
+    def get(self, video_path, parts=PART_NAMES):
+        """
+        Precomputed pose for a dataset video
+        
+        Args:
+            video_path: Video from WLASLGenerator.find_sign()
+            parts: Body parts to load
+        
+        Returns:
+            PoseSequence, or None if it has not been extracted
+        """
+        path = self.path(video_path)
+        if path is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return PoseSequence.load(path, parts=parts)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--workers': None, '--words': None, '--library': LIBRARY_DIR}
+    flags = []
+    while args:
+        arg = args.pop(0)
+        if arg in options and args:
+            options[arg] = args.pop(0)
+        else:
+            flags.append(arg)
+    
+    if "--status" in flags:
+        manifest = _read_manifest(options['--library'])
+        if manifest is None:
+            print(f"💤 No pose library at {options['--library']}")
+            print("💡 Run: python pose_library.py")
+            sys.exit(1)
+        frames = sum(entry["frames"] for entry in manifest["clips"].values())
+        print(f"📚 {options['--library']}: {len(manifest['clips'])} videos, "
+              f"{len(manifest['words'])} words, {frames} frames")
+        sys.exit(0)
+    
+    words = options['--words'].split(",") if options['--words'] else None
+    build_library(library_dir=options['--library'],
+                  workers=int(options['--workers']) if options['--workers'] else None,
+                  quantize="--int16" in flags, force="--force" in flags, words=words)
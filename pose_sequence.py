@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Pose Sequence - Landmarks over time in contiguous NumPy arrays
+One (frames, landmarks, 4) float32 array per body part plus a per-frame
+validity mask; replaces the nested per-frame / per-landmark dicts
+"""
+import json
+import numpy as np
+
+from pose_format import (PARTS, PART_NAMES, POSE_EXTENSION, frames_to_arrays, arrays_to_frames,
+                         write_arrays, read_arrays)
+
+LANDMARK_COUNTS = dict(PARTS)
+
+
+class PoseSequence:
+    """
+    Pose landmarks for a run of frames
+    
+    seq[i] is one frame: a dict of part -> (landmarks, 4) array [x, y, z,
+    visibility], or None where the part was not detected. seq[a:b] (or an
+    index array) is a new PoseSequence.
+    """
+    
+    def __init__(self, arrays, masks, fps=30.0, timestamps=None, meta=None):
+        """
+        Args:
+            arrays: Per-part (frames, landmarks, 4) arrays
+            masks: Per-part (frames,) bool arrays, False where not detected
+            fps: Frame rate
+            timestamps: Per-frame times in seconds (default: frame / fps)
+            meta: Extras kept with the data (word, video_path, ...)
+        """
+        self.arrays = {name: np.ascontiguousarray(arrays[name], dtype=np.float32)
+                       for name in PART_NAMES if name in arrays}
+        self.masks = {name: np.asarray(masks[name], dtype=bool) for name in self.arrays}
+        self.fps = float(fps) if fps else 30.0
+        self._timestamps = None if timestamps is None else np.asarray(timestamps, dtype=np.float64)
+        self.meta = dict(meta or {})
+        
+        if len({len(mask) for mask in self.masks.values()}) > 1:
+            raise ValueError("Body parts have different frame counts")
+    
+    @classmethod
+    def empty(cls, count=0, fps=30.0, parts=PART_NAMES):
+        """Sequence of `count` frames with nothing detected"""
+        return cls({name: np.zeros((count, LANDMARK_COUNTS[name], 4), dtype=np.float32) for name in parts},
+                   {name: np.zeros(count, dtype=bool) for name in parts}, fps)
+    
+    @classmethod
+    def from_landmarks(cls, frames, fps=30.0, timestamps=None, meta=None):
+        """
+        Build from per-frame part arrays (as PoseExtractor.process_frame returns)
+        
+        Args:
+            frames: List of dicts of part -> (landmarks, 4) array or None
+        """
+        arrays, masks = {}, {}
+        for name, default_count in PARTS:
+            found = [frame[name] for frame in frames if frame.get(name) is not None]
+            count = max((len(landmarks) for landmarks in found), default=default_count)
+            data = np.zeros((len(frames), count, 4), dtype=np.float32)
+            mask = np.zeros(len(frames), dtype=bool)
+            for i, frame in enumerate(frames):
+                landmarks = frame.get(name)
+                if landmarks is not None:
+                    data[i, :len(landmarks)] = landmarks
+                    mask[i] = True
+            arrays[name] = data
+            masks[name] = mask
+        return cls(arrays, masks, fps, timestamps, meta)
+    
+    @classmethod
+    def from_frames(cls, frames, fps=30.0, meta=None):
+        """Build from the legacy JSON layout (per-frame lists of landmark dicts)"""
+        arrays, masks = frames_to_arrays(frames)
+        timestamps = None
+        if all('timestamp' in frame for frame in frames):
+            timestamps = [frame['timestamp'] for frame in frames]
+        return cls(arrays, masks, fps, timestamps, meta)
+    
+    @classmethod
+    def load(cls, path, parts=PART_NAMES):
+        """
+        Read a pose file
+        
+        Args:
+            path: .npz (see pose_format.py) or legacy .json pose file
+            parts: Body parts to load (skipping 'face' saves most of the work)
+        
+        Returns:
+            PoseSequence
+        """
+        if path.lower().endswith(POSE_EXTENSION):
+            arrays, masks, meta = read_arrays(path, parts)
+        else:
+            with open(path, 'r') as f:
+                meta = json.load(f)
+            sequence = cls.from_frames(meta.pop('frames'), meta.get('fps'))
+            arrays = {name: sequence.arrays[name] for name in parts}
+            masks = {name: sequence.masks[name] for name in parts}
+            meta['timestamps'] = sequence._timestamps
+        
+        for key in ('version', 'scale', 'duration', 'frame_count'):
+            meta.pop(key, None)
+        fps = meta.pop('fps', 30.0)
+        timestamps = meta.pop('timestamps', None)
+        return cls(arrays, masks, fps, timestamps, meta)
+    
+    def save(self, path, quantize=False):
+        """
+        Write a pose file
+        
+        Args:
+            path: .npz for the compact format, .json for the legacy layout
+            quantize: Store int16 landmarks (.npz only)
+        
+        Returns:
+            path
+        """
+        if path.lower().endswith(".json"):
+            with open(path, 'w') as f:
+                json.dump(self.to_dict(), f)
+            return path
+        
+        meta = dict(self.meta, fps=self.fps, duration=self.duration, frame_count=len(self))
+        return write_arrays(path, self.arrays, self.masks, meta, quantize, self._timestamps)
+    
+    def to_dict(self):
+        """Legacy JSON layout: {'frames': [...], 'fps', 'duration', 'frame_count', ...}"""
+        frames = arrays_to_frames(self.arrays, self.masks, self.timestamps, tuple(self.arrays))
+        return dict(self.meta, frames=frames, fps=self.fps, duration=self.duration, frame_count=len(self))
+    
+    @property
+    def parts(self):
+        """Body parts held"""
+        return tuple(self.arrays)
+    
+    @property
+    def duration(self):
+        """Length in seconds"""
+        return len(self) / self.fps
+    
+    @property
+    def timestamps(self):
+        """Per-frame times in seconds"""
+        if self._timestamps is not None:
+            return self._timestamps
+        return np.arange(len(self)) / self.fps
+    
+    def __len__(self):
+        return len(next(iter(self.masks.values()))) if self.masks else 0
+    
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self.frame(index)
+        return self.take(index)
+    
+    def __add__(self, other):
+        return PoseSequence.concatenate([self, other])
+    
+    def frame(self, index):
+        """
+        One frame
+        
+        Returns:
+            Dict of part -> (landmarks, 4) array view, or None if not detected
+        """
+        return {name: data[index] if self.masks[name][index] else None for name, data in self.arrays.items()}
+    
+    def take(self, index):
+        """
+        Frames by slice or index array
+        
+        Returns:
+            PoseSequence
+        """
+        timestamps = None if self._timestamps is None else self._timestamps[index]
+        return PoseSequence({name: data[index] for name, data in self.arrays.items()},
+                            {name: mask[index] for name, mask in self.masks.items()},
+                            self.fps, timestamps, self.meta)
+    
+    def hold(self, count, index=-1):
+        """
+        One frame repeated (a still pose)
+        
+        Args:
+            count: Frames to produce
+            index: Frame to repeat (an empty sequence gives empty frames)
+        """
+        if not len(self):
+            return PoseSequence.empty(count, self.fps, self.parts)
+        return self.take(np.full(count, index % len(self)))
+    
+    def resample(self, fps=None, speed=1.0, count=None):
+        """
+        Same motion at another frame rate and/or speed
+        
+        Landmarks are interpolated linearly between neighbouring frames where
+        both have the part; otherwise the earlier frame is used.
+        
+        Args:
+            fps: Output frame rate (default: unchanged)
+            speed: Playback speed (2.0 = twice as fast, half the frames)
+            count: Output frames (default: the resampled length)
+        
+        Returns:
+            PoseSequence
+        """
+        fps = float(fps or self.fps)
+        source_count = len(self)
+        if count is None:
+            count = max(1, round(source_count / self.fps / speed * fps)) if source_count else 0
+        if not source_count:
+            return PoseSequence.empty(count, fps, self.parts)
+        
+        positions = np.minimum(np.arange(count) * speed * self.fps / fps, source_count - 1)
+        lower = positions.astype(int)
+        upper = np.minimum(lower + 1, source_count - 1)
+        weight = (positions - lower).astype(np.float32)[:, None, None]
+        
+        arrays, masks = {}, {}
+        for name, data in self.arrays.items():
+            mask = self.masks[name]
+            both = (mask[lower] & mask[upper])[:, None, None]
+            blended = data[lower] * (1 - weight) + data[upper] * weight
+            arrays[name] = np.where(both, blended, data[lower])
+            masks[name] = mask[lower]
+        return PoseSequence(arrays, masks, fps, meta=self.meta)
+    
+    @classmethod
+    def concatenate(cls, sequences, fps=None):
+        """
+        Sequences one after another
+        
+        Args:
+            sequences: PoseSequences (resampled to `fps` where they differ)
+            fps: Output frame rate (default: the first sequence's)
+        
+        Returns:
+            PoseSequence with every part any input had (absent where missing)
+        """
+        sequences = list(sequences)
+        if not sequences:
+            return cls.empty(0, fps or 30.0)
+        fps = float(fps or sequences[0].fps)
+        sequences = [seq if seq.fps == fps else seq.resample(fps) for seq in sequences]
+        
+        arrays, masks = {}, {}
+        for name in PART_NAMES:
+            held = [seq.arrays[name] for seq in sequences if name in seq.arrays]
+            if not held:
+                continue
+            count = max(data.shape[1] for data in held)
+            chunks, chunk_masks = [], []
+            for seq in sequences:
+                data = seq.arrays.get(name)
+                if data is None:
+                    data = np.zeros((len(seq), count, 4), dtype=np.float32)
+                    mask = np.zeros(len(seq), dtype=bool)
+                else:
+                    data = np.pad(data, ((0, 0), (0, count - data.shape[1]), (0, 0)))
+                    mask = seq.masks[name]
+                chunks.append(data)
+                chunk_masks.append(mask)
+            arrays[name] = np.concatenate(chunks)
+            masks[name] = np.concatenate(chunk_masks)
+        return cls(arrays, masks, fps, meta=sequences[0].meta)
+    
+    def __repr__(self):
+        detected = ", ".join(f"{name} {int(mask.sum())}" for name, mask in self.masks.items())
+        return f"PoseSequence({len(self)} frames @ {self.fps:g} fps; {detected})"
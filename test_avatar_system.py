@@ -166,7 +166,7 @@ if modules_ok:
     print("\n🚀 You can now run:")
     print("   1. GUI App: .\\run_gui.bat")
     print("   2. Pose Extractor: python pose_extractor.py hello")
-    print("   3. Avatar Animator: python avatar_animator.py pose_data/hello.json")
+    print("   3. Avatar Animator: python avatar_animator.py pose_data/hello.npz")
     print("\n💡 Recommended: Start with the GUI for best experience!")
 else:
     print("\n⚠️ Some components need attention")
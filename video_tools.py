@@ -0,0 +1,584 @@
+#!/usr/bin/env python3
+"""
+Video Tools - Small ffmpeg helpers used by the ASL video generator
+Probes clip formats and joins compatible clips without re-encoding
+"""
+import os
+import re
+import json
+import shutil
+import subprocess
+import tempfile
+
+# Probe results per (path, mtime) - clips are probed once per process
+_probe_cache = {}
+
+
+def get_ffmpeg_exe():
+    """Locate ffmpeg (bundled with moviepy via imageio-ffmpeg, else on PATH)"""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return shutil.which("ffmpeg")
+
+
+def _probe_with_ffprobe(ffprobe, path):
+    """Read video stream format with ffprobe"""
+    result = subprocess.run(
+        [ffprobe, "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "stream=codec_name,width,height,r_frame_rate,pix_fmt:format=duration",
+         "-of", "json", path],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    
+    data = json.loads(result.stdout or "{}")
+    streams = data.get("streams") or []
+    if not streams:
+        return None
+    
+    stream = streams[0]
+    return {
+        'codec': stream.get("codec_name"),
+        'width': stream.get("width"),
+        'height': stream.get("height"),
+        'fps': stream.get("r_frame_rate"),
+        'pix_fmt': stream.get("pix_fmt"),
+        'duration': float(data.get("format", {}).get("duration") or 0),
+    }
+
+
+def _probe_with_ffmpeg(ffmpeg, path):
+    """Read video stream format from the 'ffmpeg -i' banner (no ffprobe available)"""
+    result = subprocess.run([ffmpeg, "-hide_banner", "-i", path],
+                            capture_output=True, text=True)
+    
+    stream = re.search(r"Video: (\w+).*?, (\w+)(?:\([^)]*\))?, (\d+)x(\d+).*?([\d.]+) (?:fps|tbr)",
+                       result.stderr)
+    if not stream:
+        return None
+    
+    duration = re.search(r"Duration: (\d+):(\d+):([\d.]+)", result.stderr)
+    seconds = 0.0
+    if duration:
+        h, m, s = duration.groups()
+        seconds = int(h) * 3600 + int(m) * 60 + float(s)
+    
+    codec, pix_fmt, width, height, fps = stream.groups()
+    return {
+        'codec': codec,
+        'width': int(width),
+        'height': int(height),
+        'fps': fps,
+        'pix_fmt': pix_fmt,
+        'duration': seconds,
+    }
+
+
+def probe_video(path):
+    """
+    Get the format of a video's first stream
+    
+    Args:
+        path: Video file path
+    
+    Returns:
+        dict with codec, width, height, fps, pix_fmt and duration, or None
+    """
+    try:
+        key = (path, os.stat(path).st_mtime_ns)
+    except OSError:
+        return None
+    
+    if key not in _probe_cache:
+        info = None
+        try:
+            ffprobe = shutil.which("ffprobe")
+            if ffprobe:
+                info = _probe_with_ffprobe(ffprobe, path)
+            else:
+                ffmpeg = get_ffmpeg_exe()
+                if ffmpeg:
+                    info = _probe_with_ffmpeg(ffmpeg, path)
+        except (OSError, ValueError):
+            info = None
+        _probe_cache[key] = info
+    
+    return _probe_cache[key]
+
+
+def can_stream_copy(paths):
+    """True if all clips share codec, resolution, fps and pixel format"""
+    formats = set()
+    for path in paths:
+        info = probe_video(path)
+        if info is None:
+            return False
+        formats.add((info['codec'], info['width'], info['height'], info['fps'], info['pix_fmt']))
+    return len(formats) == 1
+
+
+def concat_stream_copy(paths, output_path):
+    """
+    Join clips with ffmpeg's concat demuxer, copying packets (no re-encode)
+    
+    Args:
+        paths: Clip paths in playback order (must share format)
+        output_path: Output .mp4 path
+    
+    Returns:
+        True on success, False if ffmpeg is unavailable or the join failed
+    """
+    ffmpeg = get_ffmpeg_exe()
+    if not ffmpeg or not paths:
+        return False
+    
+    # Concat list file - quotes escaped per ffmpeg's concat syntax
+    fd, list_path = tempfile.mkstemp(suffix=".txt", prefix="asl_concat_")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for path in paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        
+        result = subprocess.run(
+            [ffmpeg, "-hide_banner", "-loglevel", "error", "-y",
+             "-f", "concat", "-safe", "0", "-i", list_path,
+             "-c", "copy", "-an", "-movflags", "+faststart", output_path],
+            capture_output=True, text=True
+        )
+    except OSError:
+        return False
+    finally:
+        os.remove(list_path)
+    
+    if result.returncode != 0:
+        print(f"⚠️  Stream copy failed: {result.stderr.strip()[:200]}")
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return False
+    
+    return True
+
+
+# Uniform format of the normalized clip store - every stored clip shares
+# these settings so sentences can always be joined with stream copy
+STORE_SIZE = (512, 512)
+STORE_FPS = 25
+
+
+def encode_args(fps, mp4=True):
+    """
+    x264 settings shared by every clip written into the normalized store
+    
+    One-second closed GOPs, no scene-cut keyframes and a fixed track
+    timescale keep the clips byte-compatible for the concat demuxer.
+    
+    Args:
+        fps: Frame rate
+        mp4: Include MP4 muxer options (off for MPEG-TS segments)
+    """
+    args = [
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "20",
+        "-profile:v", "high", "-pix_fmt", "yuv420p",
+        "-g", str(fps), "-keyint_min", str(fps), "-sc_threshold", "0",
+        "-an",
+    ]
+    if mp4:
+        args += ["-video_track_timescale", str(fps * 512), "-movflags", "+faststart"]
+    return args
+
+
+def scale_filter(size):
+    """Letterbox any input into a WIDTHxHEIGHT frame"""
+    width, height = size
+    return (f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1")
+
+
+def _trim_filter(start_frame, end_frame):
+    """ffmpeg trim by frame numbers (0-based, end exclusive; None = open)"""
+    if not start_frame and end_frame is None:
+        return ""
+    bounds = [f"start_frame={start_frame or 0}"]
+    if end_frame is not None:
+        bounds.append(f"end_frame={end_frame}")
+    return f"trim={':'.join(bounds)},setpts=PTS-STARTPTS,"
+
+
+def detect_active_range(path, fps, pre_filter="", pixel_threshold=15, min_changed=0.002,
+                        margin=3, min_frames=8):
+    """
+    Find the first and last frames with hand motion
+    
+    Decodes a tiny grayscale copy of the clip and counts the pixels that
+    change between consecutive frames.
+    
+    Args:
+        path: Video file
+        fps: Frame rate the range refers to
+        pre_filter: Filters applied before analysis (e.g. metadata trim)
+        pixel_threshold: Grey-level change (0-255) that counts as a changed pixel
+        min_changed: Fraction of changed pixels that counts as motion
+        margin: Idle frames kept on each side of the motion
+        min_frames: Shorter detected ranges are distrusted (no trim)
+    
+    Returns:
+        (start_frame, end_frame) with end exclusive, or None if undetermined
+    """
+    import numpy as np
+    
+    ffmpeg = get_ffmpeg_exe()
+    if not ffmpeg:
+        return None
+    
+    side = 64
+    result = subprocess.run(
+        [ffmpeg, "-hide_banner", "-loglevel", "error", "-i", path,
+         "-vf", f"{pre_filter}fps={fps},scale={side}:{side},format=gray",
+         "-f", "rawvideo", "-"],
+        capture_output=True
+    )
+    if result.returncode != 0 or not result.stdout:
+        return None
+    
+    frames = np.frombuffer(result.stdout, dtype=np.uint8)
+    frames = frames[:len(frames) - len(frames) % (side * side)].reshape(-1, side, side)
+    if len(frames) < 2:
+        return None
+    
+    changed = np.abs(np.diff(frames.astype(np.int16), axis=0)) > pixel_threshold
+    active = np.nonzero(changed.mean(axis=(1, 2)) > min_changed)[0]
+    if len(active) == 0 or active[-1] - active[0] + 2 < min_frames:
+        return None
+    
+    start = max(0, int(active[0]) - margin)
+    end = min(len(frames), int(active[-1]) + 2 + margin)
+    return start, end
+
+
+def normalize_clip(src_path, dst_path, size=STORE_SIZE, fps=STORE_FPS,
+                   start_frame=None, end_frame=None, trim_idle=True):
+    """
+    Transcode a sign clip into the uniform store format
+    
+    Args:
+        src_path: Source clip
+        dst_path: Output .mp4
+        size: (width, height) of the store
+        fps: Frame rate of the store
+        start_frame: First source frame of the sign (0-based, None = start)
+        end_frame: Source frame after the sign (None = end of clip)
+        trim_idle: Also cut motionless head/tail frames
+    
+    Returns:
+        True on success
+    """
+    ffmpeg = get_ffmpeg_exe()
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found (install moviepy or add ffmpeg to PATH)")
+    
+    # Metadata trim first, then resample to the store frame rate
+    filters = _trim_filter(start_frame, end_frame) + f"fps={fps},"
+    
+    if trim_idle:
+        active = detect_active_range(src_path, fps, pre_filter=_trim_filter(start_frame, end_frame))
+        if active:
+            filters += _trim_filter(*active)
+    
+    filters += scale_filter(size)
+    
+    os.makedirs(os.path.dirname(dst_path) or '.', exist_ok=True)
+    tmp_path = dst_path + ".part.mp4"
+    result = subprocess.run(
+        [ffmpeg, "-hide_banner", "-loglevel", "error", "-y", "-i", src_path,
+         "-vf", filters] + encode_args(fps) + [tmp_path],
+        capture_output=True, text=True
+    )
+    
+    if result.returncode != 0:
+        print(f"⚠️  Normalize failed for {os.path.basename(src_path)}: {result.stderr.strip()[:200]}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    
+    os.replace(tmp_path, dst_path)
+    return True
+
+
+def decode_frames(path, size=STORE_SIZE, fps=STORE_FPS):
+    """
+    Decode a clip into raw I420 (yuv420p) frames at a fixed size/fps
+    
+    I420 keeps frames at 1.5 bytes per pixel and can be fed straight back
+    into the encoder without colour conversion.
+    
+    Args:
+        path: Video file
+        size: (width, height) - must be even
+        fps: Output frame rate
+    
+    Returns:
+        uint8 array of shape (frames, height * 3 // 2, width)
+    """
+    import numpy as np
+    
+    ffmpeg = get_ffmpeg_exe()
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found (install moviepy or add ffmpeg to PATH)")
+    
+    width, height = size
+    result = subprocess.run(
+        [ffmpeg, "-hide_banner", "-loglevel", "error", "-i", path,
+         "-vf", f"fps={fps},{scale_filter(size)}",
+         "-f", "rawvideo", "-pix_fmt", "yuv420p", "-"],
+        capture_output=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Could not decode {os.path.basename(path)}: "
+                           f"{result.stderr.decode(errors='replace').strip()[:200]}")
+    
+    frame_bytes = width * height * 3 // 2
+    count = len(result.stdout) // frame_bytes
+    if count == 0:
+        raise RuntimeError(f"No frames decoded from {os.path.basename(path)}")
+    
+    return np.frombuffer(result.stdout, dtype=np.uint8, count=count * frame_bytes).reshape(
+        count, height * 3 // 2, width
+    )
+
+
+def encode_frames(clips, output_path, size=STORE_SIZE, fps=STORE_FPS):
+    """
+    Encode I420 frame arrays (see decode_frames) into one video
+    
+    Uses the store encoder settings, so the result can itself be joined
+    with stored clips by stream copy.
+    
+    Args:
+        clips: Iterable of frame arrays, written back to back
+        output_path: Output .mp4
+        size: (width, height) of the frames
+        fps: Frame rate
+    
+    Returns:
+        True on success
+    """
+    import numpy as np
+    
+    ffmpeg = get_ffmpeg_exe()
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found (install moviepy or add ffmpeg to PATH)")
+    
+    width, height = size
+    proc = subprocess.Popen(
+        [ffmpeg, "-hide_banner", "-loglevel", "error", "-y",
+         "-f", "rawvideo", "-pix_fmt", "yuv420p", "-s", f"{width}x{height}",
+         "-r", str(fps), "-i", "-"] + encode_args(fps) + [output_path],
+        stdin=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    
+    try:
+        for frames in clips:
+            proc.stdin.write(np.ascontiguousarray(frames).data)
+    except BrokenPipeError:
+        pass
+    
+    _, stderr = proc.communicate()
+    if proc.returncode != 0:
+        print(f"⚠️  Encode failed: {stderr.decode(errors='replace').strip()[:200]}")
+        return False
+    return True
+
+
+def write_ts_segment(src_path, dst_path, offset=0.0, size=None, fps=STORE_FPS):
+    """
+    Write one clip as an MPEG-TS segment for HLS streaming
+    
+    Args:
+        src_path: Source clip
+        dst_path: Output .ts
+        offset: Start time of the segment within the stream (seconds)
+        size: Transcode to (width, height) at fps; None = stream copy
+              (source must already be H.264 in the store format)
+        fps: Frame rate when transcoding
+    
+    Returns:
+        Segment duration in seconds, or None on failure
+    """
+    ffmpeg = get_ffmpeg_exe()
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found (install moviepy or add ffmpeg to PATH)")
+    
+    cmd = [ffmpeg, "-hide_banner", "-loglevel", "error", "-y", "-i", src_path]
+    if size is None:
+        cmd += ["-c", "copy", "-an", "-bsf:v", "h264_mp4toannexb"]
+    else:
+        cmd += ["-vf", f"fps={fps},{scale_filter(size)}"] + encode_args(fps, mp4=False)
+    cmd += ["-output_ts_offset", f"{offset:.3f}", "-f", "mpegts", dst_path]
+    
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"⚠️  Segment failed for {os.path.basename(src_path)}: {result.stderr.strip()[:200]}")
+        return None
+    
+    # Timing comes from the source clip - the segment keeps its duration
+    info = probe_video(src_path)
+    return info['duration'] if info else None
+
+
+def image_to_clip(image_path, dst_path, seconds, size=STORE_SIZE, fps=STORE_FPS):
+    """
+    Render a still image as a short clip in the store format
+    
+    Args:
+        image_path: Source image
+        dst_path: Output .mp4
+        seconds: Clip duration
+        size: (width, height) of the store
+        fps: Frame rate of the store
+    
+    Returns:
+        True on success
+    """
+    ffmpeg = get_ffmpeg_exe()
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found (install moviepy or add ffmpeg to PATH)")
+    
+    os.makedirs(os.path.dirname(dst_path) or '.', exist_ok=True)
+    tmp_path = dst_path + ".part.mp4"
+    result = subprocess.run(
+        [ffmpeg, "-hide_banner", "-loglevel", "error", "-y",
+         "-loop", "1", "-i", image_path, "-t", f"{seconds:.3f}",
+         "-vf", f"fps={fps},{scale_filter(size)}"] + encode_args(fps) + [tmp_path],
+        capture_output=True, text=True
+    )
+    
+    if result.returncode != 0:
+        print(f"⚠️  Could not render {os.path.basename(image_path)}: {result.stderr.strip()[:200]}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    
+    os.replace(tmp_path, dst_path)
+    return True
+
+
+# How far a sign may be slowed down / sped up to follow the speaker's pacing
+MIN_SIGN_SPEED = 0.5
+MAX_SIGN_SPEED = 2.0
+
+# Shortest time slot a sign is squeezed into
+MIN_SIGN_SECONDS = 0.3
+
+
+def fit_to_slot(seconds, start, end, clock=0.0, mode='stretch'):
+    """
+    Plan how a sign fills its time slot on a timeline
+    
+    The sign starts at `start`, or when the previous sign finished (`clock`)
+    if that is later. 'stretch' changes its speed (within MIN_SIGN_SPEED and
+    MAX_SIGN_SPEED) so it ends with the slot; 'pad' plays it at normal speed.
+    A sign that finishes early holds its last frame until the slot ends.
+    
+    Args:
+        seconds: Natural duration of the sign
+        start: Slot start on the timeline
+        end: Slot end on the timeline
+        clock: Timeline position where the previous sign ended
+        mode: 'stretch' or 'pad'
+    
+    Returns:
+        (lead, speed, tail) - seconds to hold the first frame, playback
+        speed factor, seconds to hold the last frame
+    """
+    shown = max(clock, start)
+    lead = shown - clock
+    target = max(MIN_SIGN_SECONDS, end - shown)
+    
+    speed = 1.0
+    if mode == 'stretch' and seconds > 0:
+        speed = min(MAX_SIGN_SPEED, max(MIN_SIGN_SPEED, seconds / target))
+    
+    tail = max(0.0, target - seconds / speed)
+    return lead, speed, tail
+
+
+def retime_clip(src_path, dst_path, speed=1.0, lead=0.0, tail=0.0, size=STORE_SIZE, fps=STORE_FPS):
+    """
+    Re-encode a clip at another speed, holding its first/last frame around it
+    
+    The output uses the store settings, so retimed clips join by stream copy.
+    
+    Args:
+        src_path: Source clip
+        dst_path: Output .mp4
+        speed: Playback speed factor (2.0 = twice as fast)
+        lead: Seconds to hold the first frame before the clip
+        tail: Seconds to hold the last frame after the clip
+        size: (width, height) of the output
+        fps: Frame rate of the output
+    
+    Returns:
+        True on success
+    """
+    ffmpeg = get_ffmpeg_exe()
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found (install moviepy or add ffmpeg to PATH)")
+    
+    filters = f"setpts=(PTS-STARTPTS)/{speed:.4f},fps={fps},{scale_filter(size)}"
+    if lead > 0 or tail > 0:
+        filters += (f",tpad=start_mode=clone:start_duration={lead:.3f}"
+                    f":stop_mode=clone:stop_duration={tail:.3f}")
+    
+    os.makedirs(os.path.dirname(dst_path) or '.', exist_ok=True)
+    tmp_path = dst_path + ".part.mp4"
+    result = subprocess.run(
+        [ffmpeg, "-hide_banner", "-loglevel", "error", "-y", "-i", src_path,
+         "-vf", filters] + encode_args(fps) + [tmp_path],
+        capture_output=True, text=True
+    )
+    
+    if result.returncode != 0:
+        print(f"⚠️  Retime failed for {os.path.basename(src_path)}: {result.stderr.strip()[:200]}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    
+    os.replace(tmp_path, dst_path)
+    return True
+
+
+def _caption_time(seconds, separator):
+    """HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (WebVTT)"""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def write_caption_file(cues, path):
+    """
+    Write subtitles
+    
+    Args:
+        cues: List of (start, end, text) in seconds
+        path: .srt or .vtt file (format chosen by extension)
+    
+    Returns:
+        path
+    """
+    vtt = path.lower().endswith('.vtt')
+    separator = '.' if vtt else ','
+    lines = ["WEBVTT", ""] if vtt else []
+    for number, (start, end, text) in enumerate(cues, 1):
+        if not vtt:
+            lines.append(str(number))
+        lines += [f"{_caption_time(start, separator)} --> {_caption_time(end, separator)}", text, ""]
+    
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines))
+    return path
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Whisper Registry - Shared, warm faster-whisper models
+Each model configuration is loaded once per process; a small local daemon can
+keep models warm so short-lived CLI runs skip loading entirely
+Usage: python whisper_registry.py --serve [--model base] [--socket PATH]
+       python whisper_registry.py --status | --stop
+"""
+import os
+import sys
+import json
+import time
+import stat
+import socket
+import getpass
+import tempfile
+import threading
+import types
+import numpy as np
+from concurrent.futures import Future
+
+DEFAULT_MODEL = "base"
+DEFAULT_COMPUTE_TYPE = "int8"
+
+# The daemon needs Unix domain sockets and file ownership checks (POSIX only)
+DAEMON_SUPPORTED = hasattr(socket, 'AF_UNIX') and hasattr(os, 'getuid')
+
+# One socket per user, in a directory only that user can write: the session's
+# runtime directory, or a private 0700 directory under the temp directory
+SOCKET_DIR = os.environ.get('XDG_RUNTIME_DIR') or os.path.join(tempfile.gettempdir(),
+                                                               f"whisper_registry_{getpass.getuser()}")
+SOCKET_PATH = os.path.join(SOCKET_DIR, "whisper_registry.sock")
+
+# Loaded (or loading) models by configuration
+_models = {}
+_lock = threading.Lock()
+
+
+def model_key(size=DEFAULT_MODEL, device="cpu", compute_type=DEFAULT_COMPUTE_TYPE, cpu_threads=0,
+              num_workers=1):
+    """Registry key for one model configuration"""
+    return (size, device, compute_type, cpu_threads, num_workers)
+
+
+def _load(key, future):
+    """Construct a WhisperModel and resolve its future"""
+    from faster_whisper import WhisperModel
+    
+    size, device, compute_type, cpu_threads, num_workers = key
+    try:
+        start = time.time()
+        print(f"📥 Loading Faster-Whisper '{size}' model ({compute_type})...")
+        model = WhisperModel(size, device=device, compute_type=compute_type,
+                             cpu_threads=cpu_threads, num_workers=num_workers)
+        print(f"✅ Model '{size}' loaded in {time.time() - start:.1f}s!")
+        future.set_result(model)
+    except Exception as e:
+        with _lock:
+            _models.pop(key, None)  # let a later call retry
+        future.set_exception(e)
+
+
+def _future(key, background):
+    """Future for a configuration, starting the load if nobody has yet"""
+    with _lock:
+        future = _models.get(key)
+        if future is not None:
+            return future
+        future = _models[key] = Future()
+    
+    if background:
+        threading.Thread(target=_load, args=(key, future), daemon=True).start()
+    else:
+        _load(key, future)
+    return future
+
+
+def get_model(size=DEFAULT_MODEL, device="cpu", compute_type=DEFAULT_COMPUTE_TYPE, cpu_threads=0,
+              num_workers=1, use_daemon=False):
+    """
+    Shared model instance for a configuration, loaded on first use
+    
+    Concurrent callers asking for the same configuration wait for one load.
+    
+    Args:
+        size: Whisper model (tiny/base/small/medium/large)
+        device: "cpu" or "cuda"
+        compute_type: CTranslate2 compute type (int8 for fast CPU inference)
+        cpu_threads: CTranslate2 threads (0 = library default)
+        num_workers: Threads that may call transcribe() concurrently
+        use_daemon: Use a model kept warm by a running daemon (see serve()) if
+                    there is one; falls back to loading in this process
+    
+    Returns:
+        WhisperModel, or a RemoteWhisperModel with the same transcribe()
+    """
+    if use_daemon:
+        remote = connect(size, compute_type, cpu_threads)
+        if remote is not None:
+            print(f"⚡ Using warm '{size}' model from the Whisper daemon")
+            return remote
+    
+    key = model_key(size, device, compute_type, cpu_threads, num_workers)
+    return _future(key, background=False).result()
+
+
+def preload(size=DEFAULT_MODEL, device="cpu", compute_type=DEFAULT_COMPUTE_TYPE, cpu_threads=0,
+            num_workers=1):
+    """
+    Start loading a model in a background thread
+    
+    A later get_model() with the same configuration waits for this load
+    instead of starting another one.
+    
+    Returns:
+        Future resolving to the model
+    """
+    key = model_key(size, device, compute_type, cpu_threads, num_workers)
+    return _future(key, background=True)
+
+
+def loaded_models():
+    """Configurations that finished loading"""
+    with _lock:
+        return [key for key, future in _models.items() if future.done() and not future.exception()]
+
+
+def _segment_dict(segment):
+    """JSON-friendly copy of a faster-whisper Segment"""
+    return {
+        'id': segment.id,
+        'start': segment.start,
+        'end': segment.end,
+        'text': segment.text,
+        'avg_logprob': segment.avg_logprob,
+        'no_speech_prob': segment.no_speech_prob,
+        'words': [
+            {'start': word.start, 'end': word.end, 'word': word.word, 'probability': word.probability}
+            for word in segment.words
+        ] if segment.words else None,
+    }
+
+
+def _segment_object(data):
+    """Attribute-style segment (like faster-whisper's) from _segment_dict output"""
+    words = data.pop('words')
+    segment = types.SimpleNamespace(**data)
+    segment.words = [types.SimpleNamespace(**word) for word in words] if words else None
+    return segment
+
+
+def _send(sock, header, payload=b""):
+    """One message: a JSON line, then `size` raw bytes"""
+    header = dict(header, size=len(payload))
+    sock.sendall(json.dumps(header).encode('utf-8') + b"\n" + payload)
+
+
+def _receive(stream):
+    """Read one message from a socket file"""
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("Connection closed")
+    header = json.loads(line)
+    payload = stream.read(header.get('size', 0))
+    return header, payload
+
+
+class RemoteWhisperModel:
+    """Client for a model kept warm by the registry daemon"""
+    
+    def __init__(self, size=DEFAULT_MODEL, compute_type=DEFAULT_COMPUTE_TYPE, cpu_threads=0,
+                 socket_path=SOCKET_PATH):
+        """
+        Args:
+            size: Model the daemon should use
+            compute_type: Compute type the daemon should use
+            cpu_threads: CTranslate2 threads for the daemon's model
+            socket_path: Daemon socket
+        """
+        self.config = {'size': size, 'compute_type': compute_type, 'cpu_threads': cpu_threads}
+        self.socket_path = socket_path
+    
+    def request(self, header, payload=b"", timeout=None):
+        """Send one request and return (header, payload) of the reply"""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(self.socket_path)
+            _send(sock, header, payload)
+            with sock.makefile('rb') as stream:
+                reply, data = _receive(stream)
+        if 'error' in reply:
+            raise RuntimeError(f"Whisper daemon: {reply['error']}")
+        return reply, data
+    
+    def transcribe(self, audio, **kwargs):
+        """
+        Same call as WhisperModel.transcribe, run by the daemon
+        
+        Args:
+            audio: float32 samples at 16 kHz (file paths are not sent)
+            **kwargs: JSON-serializable transcribe() options
+        
+        Returns:
+            (segments, info) - a list of segments with start/end/text/words
+            and a namespace with language, language_probability and duration
+        """
+        samples = np.ascontiguousarray(np.asarray(audio, dtype=np.float32).ravel())
+        reply, _ = self.request({'op': 'transcribe', 'model': self.config, 'options': kwargs},
+                                samples.tobytes())
+        segments = [_segment_object(segment) for segment in reply['segments']]
+        return segments, types.SimpleNamespace(**reply['info'])
+
+
+def _private_dir(path):
+    """True if only the current user can create or replace files in a directory"""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return False
+    return (stat.S_ISDIR(info.st_mode) and info.st_uid == os.getuid()
+            and not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+
+def _trusted_socket(socket_path):
+    """
+    True if a socket was created by the current user in a private directory
+    
+    Anyone else could have planted it to receive the audio and answer with
+    forged transcripts.
+    """
+    try:
+        info = os.stat(socket_path)
+    except OSError:
+        return False
+    return (stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+            and _private_dir(os.path.dirname(os.path.abspath(socket_path))))
+
+
+def connect(size=DEFAULT_MODEL, compute_type=DEFAULT_COMPUTE_TYPE, cpu_threads=0, socket_path=SOCKET_PATH):
+    """
+    Client for a running daemon
+    
+    Returns:
+        RemoteWhisperModel, or None if no daemon answers or the socket is not
+        the current user's own (see _trusted_socket)
+    """
+    if not DAEMON_SUPPORTED or not os.path.exists(socket_path):
+        return None
+    if not _trusted_socket(socket_path):
+        print(f"⚠️  Ignoring Whisper daemon socket not owned by you or in a shared directory: {socket_path}")
+        return None
+    
+    remote = RemoteWhisperModel(size, compute_type, cpu_threads, socket_path)
+    try:
+        remote.request({'op': 'ping'}, timeout=1.0)
+    except (OSError, ValueError, RuntimeError):
+        return None
+    return remote
+
+
+def _handle(conn):
+    """Serve one daemon request"""
+    with conn, conn.makefile('rb') as stream:
+        try:
+            header, payload = _receive(stream)
+            op = header.get('op')
+            
+            if op == 'ping':
+                _send(conn, {'models': [list(key) for key in loaded_models()]})
+            elif op == 'transcribe':
+                config = header.get('model', {})
+                model = get_model(config.get('size', DEFAULT_MODEL),
+                                  compute_type=config.get('compute_type', DEFAULT_COMPUTE_TYPE),
+                                  cpu_threads=config.get('cpu_threads', 0))
+                audio = np.frombuffer(payload, dtype=np.float32)
+                segments, info = model.transcribe(audio, **header.get('options', {}))
+                _send(conn, {
+                    'segments': [_segment_dict(segment) for segment in segments],
+                    'info': {'language': info.language,
+                             'language_probability': info.language_probability,
+                             'duration': info.duration},
+                })
+            elif op == 'stop':
+                _send(conn, {'stopping': True})
+                return True
+            else:
+                _send(conn, {'error': f"Unknown request: {op}"})
+        except Exception as e:
+            try:
+                _send(conn, {'error': str(e)})
+            except OSError:
+                pass
+    return False
+
+
+def serve(size=DEFAULT_MODEL, compute_type=DEFAULT_COMPUTE_TYPE, cpu_threads=0, socket_path=SOCKET_PATH):
+    """
+    Keep models warm and transcribe for other processes until stopped
+    
+    The model is loaded before the socket starts accepting; other sizes are
+    loaded on first request and then kept too. The socket is only accessible
+    to the current user.
+    
+    Args:
+        size: Model to load up front
+        compute_type: Its compute type
+        cpu_threads: Its CTranslate2 threads
+        socket_path: Where to listen
+    """
+    if not DAEMON_SUPPORTED:
+        raise RuntimeError("The Whisper daemon needs Unix domain sockets (not available here)")
+    
+    socket_dir = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+    if not _private_dir(socket_dir):
+        raise RuntimeError(f"{socket_dir} must be owned by you and not writable by others "
+                           f"(chmod 700 it or pick another --socket)")
+    
+    if connect(size, compute_type, cpu_threads, socket_path) is not None:
+        print(f"⚠️  A daemon is already running on {socket_path}")
+        return
+    if os.path.exists(socket_path):
+        os.remove(socket_path)  # stale socket from a daemon that died
+    
+    get_model(size, compute_type=compute_type, cpu_threads=cpu_threads)
+    
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(socket_path)
+    finally:
+        os.umask(old_umask)
+    server.listen()
+    
+    print(f"🔥 Whisper daemon ready on {socket_path} (Ctrl+C or --stop to quit)")
+    stopping = threading.Event()
+    
+    def handle(conn):
+        if _handle(conn):
+            stopping.set()
+            # Wake accept() so the loop sees the stop
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.connect(socket_path)
+            except OSError:
+                pass
+    
+    try:
+        while not stopping.is_set():
+            conn, _ = server.accept()
+            if stopping.is_set():
+                conn.close()
+                break
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+    print("👋 Whisper daemon stopped")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--model': DEFAULT_MODEL, '--socket': SOCKET_PATH}
+    flags = []
+    while args:
+        arg = args.pop(0)
+        if arg in options and args:
+            options[arg] = args.pop(0)
+        else:
+            flags.append(arg)
+    
+    if "--serve" in flags:
+        serve(options['--model'], socket_path=options['--socket'])
+    elif "--status" in flags or "--stop" in flags:
+        remote = connect(socket_path=options['--socket'])
+        if remote is None:
+            print("💤 No Whisper daemon running")
+            sys.exit(1)
+        if "--stop" in flags:
+            remote.request({'op': 'stop'})
+            print("✅ Daemon stopping")
+        else:
+            reply, _ = remote.request({'op': 'ping'})
+            for size, device, compute_type, cpu_threads, _ in reply['models']:
+                print(f"   - {size} ({device}, {compute_type}, {cpu_threads or 'default'} threads)")
+    else:
+        print("💡 Usage: python whisper_registry.py --serve [--model base] [--socket PATH]")
+        print("          python whisper_registry.py --status | --stop")
+        sys.exit(1)
@@ -6,9 +6,23 @@ Converts English text to ASL video sequences using the WLASL processed dataset
 import os
 import json
 import re
+import hashlib
+import time
+import math
+import shutil
+import string
+import tempfile
+import threading
+from collections import Counter
 from pathlib import Path
 from moviepy.video.io.VideoFileClip import VideoFileClip
 from moviepy.video.compositing.CompositeVideoClip import concatenate_videoclips
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from output_cache import OutputCache
+from clip_cache import ClipCache
+from video_tools import (can_stream_copy, concat_stream_copy, normalize_clip, encode_frames,
+                         write_ts_segment, image_to_clip, probe_video, fit_to_slot, retime_clip,
+                         write_caption_file, STORE_SIZE, STORE_FPS)
 
 # WLASL dataset path (from kagglehub)
 WLASL_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "kagglehub", 
@@ -16,13 +30,120 @@ WLASL_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "kagglehub",
 
 # Project paths
 OUTPUT_DIR = "asl_outputs"
+CACHE_DIR = "asl_cache"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Inflections stripped when matching words to glosses (in priority order)
+SIGN_SUFFIXES = ['s', 'ed', 'ing', 'ly']
+
+# Trie key marking the end of a gloss
+_TRIE_LEAF = "\0"
+
+# Duration of each fingerspelled letter (Kaggle letter image held still)
+LETTER_SECONDS = 0.4
+
+# HLS target segment duration (seconds) - WLASL signs are well below it
+HLS_TARGET_DURATION = 10
+
+# Bump when the on-disk index / store manifest layout changes
+INDEX_VERSION = 2
+STORE_VERSION = 1
+
+
+def default_store_dir(size=STORE_SIZE, fps=STORE_FPS):
+    """Location of the normalized clip store for an output format"""
+    return os.path.join(CACHE_DIR, f"store_{size[0]}x{size[1]}_{fps}fps")
+
+
+def _write_json_atomic(path, data):
+    """Write JSON via a temp file so readers never see a partial file"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def read_sentences(path):
+    """
+    Read sentences from a text file (one per line) or an .srt/.vtt subtitle file
+    
+    Returns:
+        List of non-empty sentences (subtitle numbers/timecodes skipped)
+    """
+    sentences = []
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line == "WEBVTT" or "-->" in line or line.isdigit():
+                continue
+            # Drop subtitle styling tags like <i>...</i>
+            sentences.append(re.sub(r'<[^>]+>', '', line))
+    return sentences
+
+
+def _render_sentence_job(clip_paths, output_path):
+    """Process-pool worker: stream-copy join one sentence"""
+    start = time.time()
+    ok = concat_stream_copy(clip_paths, output_path)
+    return ok, time.time() - start
+
+
+def _read_store_manifest(store_dir):
+    """Load a clip store manifest, or None if missing/unreadable"""
+    try:
+        with open(os.path.join(store_dir, "manifest.json"), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != STORE_VERSION:
+        return None
+    return manifest
+
+class _ProducerThread(threading.Thread):
+    """Worker thread whose join() re-raises any exception from its target"""
+    
+    def __init__(self, target):
+        super().__init__(daemon=True)
+        self._produce = target
+        self.error = None
+    
+    def run(self):
+        try:
+            self._produce()
+        except BaseException as e:
+            self.error = e
+    
+    def join(self, timeout=None):
+        super().join(timeout)
+        if self.error is not None and not self.is_alive():
+            raise self.error
+
 class WLASLGenerator:
     """Optimized WLASL video generator"""
     
-    def __init__(self, wlasl_dir=None):
-        """Initialize with WLASL dataset directory"""
+    def __init__(self, wlasl_dir=None, use_index=True, store_dir=None, cache_outputs=True,
+                 clip_cache_mb=0, fingerspell=True, refresh_index=False):
+        """
+        Initialize with WLASL dataset directory
+        
+        Args:
+            wlasl_dir: WLASL dataset directory (kagglehub cache if None)
+            use_index: Load the vocabulary from the prebuilt on-disk index
+                       (rebuilt automatically when the dataset changes)
+            store_dir: Serve clips from a normalized store built with
+                       normalize_store() (see default_store_dir())
+            cache_outputs: Reuse previously rendered videos for the same
+                           sign sequence (auto-named outputs only)
+            clip_cache_mb: Keep decoded clips in memory (LRU, this many MB)
+                           for sentences that cannot be stream-copied;
+                           0 disables the cache (see --clip-cache-mb)
+            fingerspell: Spell words without a sign using the Kaggle
+                         letter images instead of dropping them
+            refresh_index: Ignore the on-disk index, re-scan the dataset
+                           and rewrite it (one scan, unlike rebuild_index()
+                           on an already loaded generator)
+        """
         self.wlasl_dir = wlasl_dir or WLASL_CACHE_PATH
         
         if not os.path.exists(self.wlasl_dir):
@@ -38,12 +159,100 @@ class WLASLGenerator:
         
         # Build word-to-video mapping
         print("📚 Loading WLASL vocabulary...")
-        self.word_to_video = self._build_mapping()
+        self.index_path = self._index_path()
+        index = self._load_index() if use_index and not refresh_index else None
+        if index is None:
+            index = self._build_mapping()
+            if use_index or refresh_index:
+                self._save_index(*index)
+        self.word_to_video, self.clip_ranges = index
+        self._build_lookup()
         print(f"✅ Loaded {len(self.word_to_video)} ASL signs")
+        
+        # Normalized clip store (source file name -> stored clip path)
+        self.store_dir = None
+        self.store = {}
+        self.store_format = (STORE_SIZE, STORE_FPS)
+        self.fingerspell = fingerspell
+        self._letter_clips = {}
+        if store_dir:
+            self.load_store(store_dir)
+        
+        # Decoded clips shared across requests, normalized to the store format
+        self.clip_cache = None
+        if clip_cache_mb:
+            size, fps = self.store_format
+            self.clip_cache = ClipCache(clip_cache_mb * 1024 * 1024, size, fps)
+        
+        # Content-addressed cache of rendered sentences in OUTPUT_DIR
+        self.output_cache = OutputCache(OUTPUT_DIR) if cache_outputs else None
+    
+    def _index_path(self):
+        """Index file for this dataset (one per dataset location)"""
+        key = hashlib.sha1(os.path.abspath(self.wlasl_dir).encode('utf-8')).hexdigest()[:12]
+        return os.path.join(CACHE_DIR, f"wlasl_index_{key}.json")
+    
+    def _dataset_signature(self):
+        """Modification stamps that invalidate the index when the dataset changes"""
+        signature = {}
+        for path in (self.class_list, self.nslt_json, self.videos_dir):
+            try:
+                stat = os.stat(path)
+                signature[os.path.basename(path)] = [stat.st_mtime_ns, stat.st_size]
+            except OSError:
+                signature[os.path.basename(path)] = None
+        return signature
+    
+    def _load_index(self):
+        """Load (word-to-video, clip ranges) from the index, or None if missing/stale"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if (index.get("version") != INDEX_VERSION
+                or index.get("wlasl_dir") != os.path.abspath(self.wlasl_dir)
+                or index.get("signature") != self._dataset_signature()):
+            return None
+        
+        mapping = {
+            word: os.path.join(self.videos_dir, filename)
+            for word, filename in index["words"].items()
+        }
+        ranges = {filename: tuple(bounds) for filename, bounds in index["ranges"].items()}
+        return mapping, ranges
+    
+    def _save_index(self, mapping, ranges):
+        """Persist word-to-video mapping (video file names only) and clip ranges"""
+        index = {
+            "version": INDEX_VERSION,
+            "wlasl_dir": os.path.abspath(self.wlasl_dir),
+            "signature": self._dataset_signature(),
+            "words": {word: os.path.basename(path) for word, path in mapping.items()},
+            "ranges": ranges,
+        }
+        try:
+            _write_json_atomic(self.index_path, index)
+        except OSError as e:
+            print(f"⚠️  Could not write vocabulary index: {e}")
+    
+    def rebuild_index(self):
+        """Re-scan the dataset and rewrite the vocabulary index"""
+        self.word_to_video, self.clip_ranges = self._build_mapping()
+        self._save_index(self.word_to_video, self.clip_ranges)
+        self._build_lookup()
+        return self.index_path
     
     def _build_mapping(self):
-        """Build optimized word to video file mapping"""
+        """
+        Build optimized word to video file mapping
+        
+        Returns:
+            (word -> video path, video file name -> [start, end] sign frames)
+        """
         mapping = {}
+        ranges = {}
         
         # Load class list (word -> class_id)
         word_to_class = {}
@@ -59,8 +268,9 @@ class WLASLGenerator:
         with open(self.nslt_json, 'r', encoding='utf-8') as f:
             video_meta = json.load(f)
         
-        # Map class_id to video files
+        # Map class_id to video files (action = [class_id, start_frame, end_frame])
         class_to_videos = {}
+        video_bounds = {}
         for video_id, meta in video_meta.items():
             action = meta.get("action")
             if isinstance(action, list) and action:
@@ -68,17 +278,27 @@ class WLASLGenerator:
                 if class_id not in class_to_videos:
                     class_to_videos[class_id] = []
                 class_to_videos[class_id].append(video_id)
+                if len(action) >= 3:
+                    video_bounds[video_id] = [int(action[1]), int(action[2])]
+        
+        # One directory listing instead of a stat call per candidate video
+        try:
+            available = set(os.listdir(self.videos_dir))
+        except OSError:
+            available = set()
         
         # Build final word -> video path mapping (use first available video)
         for word, class_id in word_to_class.items():
             if class_id in class_to_videos:
                 for video_id in class_to_videos[class_id]:
-                    video_path = os.path.join(self.videos_dir, f"{int(video_id):05d}.mp4")
-                    if os.path.exists(video_path):
-                        mapping[word] = video_path
+                    filename = f"{int(video_id):05d}.mp4"
+                    if filename in available:
+                        mapping[word] = os.path.join(self.videos_dir, filename)
+                        if video_id in video_bounds:
+                            ranges[filename] = video_bounds[video_id]
                         break
         
-        return mapping
+        return mapping, ranges
     
     def text_to_words(self, text):
         """Convert text to list of words, handling common ASL patterns"""
@@ -93,43 +313,328 @@ class WLASLGenerator:
         
         return words
     
+    def _build_lookup(self):
+        """
+        Precompute every surface form that resolves to a sign
+        
+        Direct glosses win over suffixed forms ("books" -> "book"), which win
+        over punctuation-free spellings ("dont" -> "don't"). The forms are
+        also loaded into a word-level trie so multi-word glosses can be
+        matched while segmenting a sentence.
+        """
+        lookup = dict(self.word_to_video)
+        
+        for suffix in SIGN_SUFFIXES:
+            for gloss, path in self.word_to_video.items():
+                lookup.setdefault(gloss + suffix, path)
+        
+        # text_to_words strips punctuation, so index glosses the same way
+        for gloss, path in self.word_to_video.items():
+            lookup.setdefault(re.sub(r'[^\w\s]', '', gloss), path)
+        
+        trie = {}
+        for form, path in lookup.items():
+            tokens = form.split()
+            if not tokens:
+                continue
+            node = trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(_TRIE_LEAF, path)
+        
+        self.sign_lookup = lookup
+        self._trie = trie
+    
     def find_sign(self, word):
-        """Find video for a word, with fallback strategies"""
-        # Direct match
-        if word in self.word_to_video:
-            return self.word_to_video[word]
-        
-        # Try without common suffixes
-        for suffix in ['s', 'ed', 'ing', 'ly']:
-            if word.endswith(suffix):
-                base = word[:-len(suffix)]
-                if base in self.word_to_video:
-                    return self.word_to_video[base]
-        
-        # Try common variations
-        variations = [
-            word.replace('dont', "don't"),
-            word.replace('cant', "can't"),
-            word.replace('wont', "won't"),
-        ]
-        for var in variations:
-            if var in self.word_to_video:
-                return self.word_to_video[var]
+        """Find video for a word (or gloss), including suffix/contraction forms"""
+        return self.sign_lookup.get(word)
+    
+    def segment(self, text):
+        """
+        Split text into signs using greedy longest-match over the vocabulary
         
-        return None
+        Args:
+            text: English text
+        
+        Returns:
+            List of (phrase, video_path) tuples; video_path is None for
+            words without a sign
+        """
+        return self._segment_tokens(self.text_to_words(text))
+    
+    def _segment_tokens(self, tokens):
+        """Greedy longest-match over already normalized tokens (see segment)"""
+        segments = []
+        
+        i = 0
+        while i < len(tokens):
+            node = self._trie
+            match_end, match_path = None, None
+            
+            j = i
+            while j < len(tokens) and tokens[j] in node:
+                node = node[tokens[j]]
+                j += 1
+                if _TRIE_LEAF in node:
+                    match_end, match_path = j, node[_TRIE_LEAF]
+            
+            if match_end is None:
+                segments.append((tokens[i], None))
+                i += 1
+            else:
+                segments.append((" ".join(tokens[i:match_end]), match_path))
+                i = match_end
+        
+        return segments
+    
+    def load_store(self, store_dir):
+        """Serve sentence clips from a normalized store (see normalize_store)"""
+        manifest = _read_store_manifest(store_dir)
+        if manifest is None:
+            raise FileNotFoundError(
+                f"Normalized clip store not found at {store_dir}\n"
+                f"Run: python wlasl_generator.py --normalize"
+            )
+        
+        self.store_dir = store_dir
+        self.store_format = (tuple(manifest["size"]), manifest["fps"])
+        self._letter_clips = {}
+        self.store = {
+            name: os.path.join(store_dir, entry["file"])
+            for name, entry in manifest["clips"].items()
+        }
+        print(f"✅ Using normalized clip store ({len(self.store)} clips)")
+    
+    def normalize_store(self, store_dir=None, size=None, fps=None,
+                        trim_idle=True, workers=None, force=False, sources=None):
+        """
+        Transcode every mapped clip once into a uniform store
+        
+        All stored clips share resolution, fps, GOP layout and encoder
+        settings, so any sentence built from them is a stream-copy join.
+        Incremental: clips already in the store are skipped unless the
+        source changed or force=True.
+        
+        Args:
+            store_dir: Output directory (default_store_dir(size, fps) if None)
+            size: (width, height) of every stored clip (existing store's
+                  format, else STORE_SIZE, if None)
+            fps: Frame rate of every stored clip (likewise, else STORE_FPS)
+            trim_idle: Cut motionless head/tail frames
+            workers: Parallel ffmpeg processes (half the CPU cores if None)
+            force: Re-encode everything
+            sources: Only normalize these dataset clips (all mapped clips if None)
+        
+        Returns:
+            Path to the store directory
+        """
+        # Extending an existing store keeps its format
+        if store_dir and size is None and fps is None:
+            existing = _read_store_manifest(store_dir)
+            if existing:
+                size, fps = existing["size"], existing["fps"]
+        size = tuple(size or STORE_SIZE)
+        fps = fps or STORE_FPS
+        
+        store_dir = store_dir or default_store_dir(size, fps)
+        workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        
+        manifest = _read_store_manifest(store_dir)
+        if (force or manifest is None or manifest.get("size") != list(size)
+                or manifest.get("fps") != fps):
+            manifest = {"version": STORE_VERSION, "size": list(size), "fps": fps, "clips": {}}
+        
+        # Several words can share one video - normalize each file once
+        todo = []
+        sources = sorted(set(self.word_to_video.values() if sources is None else sources))
+        for src_path in sources:
+            name = os.path.basename(src_path)
+            entry = manifest["clips"].get(name)
+            mtime = os.stat(src_path).st_mtime_ns
+            if (entry and entry["source_mtime"] == mtime and entry["trim_idle"] == trim_idle
+                    and os.path.exists(os.path.join(store_dir, entry["file"]))):
+                continue
+            todo.append((src_path, name, mtime))
+        
+        print(f"🧰 Normalizing {len(todo)} clips to {size[0]}x{size[1]} @ {fps}fps "
+              f"({len(sources) - len(todo)} already up to date)")
+        
+        def normalize(item):
+            src_path, name, _ = item
+            # WLASL frame numbers are 1-based and inclusive, -1 = until the end
+            start, end = self.clip_ranges.get(name, (1, -1))
+            return normalize_clip(
+                src_path, os.path.join(store_dir, name), size, fps,
+                start_frame=max(start - 1, 0),
+                end_frame=end if end > 0 else None,
+                trim_idle=trim_idle
+            )
+        
+        failed = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for done, (item, ok) in enumerate(zip(todo, pool.map(normalize, todo)), 1):
+                _, name, mtime = item
+                if ok:
+                    manifest["clips"][name] = {"file": name, "source_mtime": mtime, "trim_idle": trim_idle}
+                else:
+                    failed += 1
+                
+                # Checkpoint so an interrupted run resumes where it stopped
+                if done % 50 == 0:
+                    _write_json_atomic(os.path.join(store_dir, "manifest.json"), manifest)
+                    print(f"   Normalized {done}/{len(todo)} clips...", end='\r')
+        
+        _write_json_atomic(os.path.join(store_dir, "manifest.json"), manifest)
+        print(f"\n✅ Store ready: {len(manifest['clips'])} clips in {store_dir}"
+              + (f" ({failed} failed)" if failed else ""))
+        
+        if self.store_dir == store_dir:
+            self.load_store(store_dir)
+        
+        return store_dir
+    
+    def _clip_path(self, video_path):
+        """Normalized store copy of a dataset clip, if available"""
+        return self.store.get(os.path.basename(video_path), video_path)
+    
+    def _letters_dir(self):
+        """Pre-rendered letter clips, in the same format as the clip store"""
+        size, fps = self.store_format
+        return os.path.join(CACHE_DIR, f"letters_{size[0]}x{size[1]}_{fps}fps")
+    
+    def _letter_clip(self, char):
+        """Clip for one letter/digit, rendered on first use and cached on disk"""
+        if char not in self._letter_clips:
+            size, fps = self.store_format
+            clip_path = os.path.join(self._letters_dir(), f"{char}.mp4")
+            
+            if not os.path.exists(clip_path):
+                from asl_image_generator import get_asl_image
+                image_path = get_asl_image(char, policy='best')
+                if not image_path or not image_to_clip(image_path, clip_path, LETTER_SECONDS, size, fps):
+                    clip_path = None
+            
+            self._letter_clips[char] = clip_path
+        
+        return self._letter_clips[char]
     
-    def generate_video(self, text, output_path=None):
+    def fingerspell_clips(self, word):
+        """
+        Letter clips spelling a word
+        
+        Returns:
+            List of clip paths (letters without an image are skipped)
+        """
+        return [clip for clip in (self._letter_clip(char) for char in word) if clip]
+    
+    def prerender_letters(self):
+        """Render every letter/digit clip up front so fingerspelling costs only a join"""
+        rendered = [char for char in string.ascii_lowercase + string.digits if self._letter_clip(char)]
+        print(f"✅ {len(rendered)} fingerspelling clips ready in {self._letters_dir()}")
+        return rendered
+    
+    def _is_uniform(self, path):
+        """True for clips known to be in the store format (store and letter clips)"""
+        return self.store_dir is not None and os.path.dirname(path) in (self.store_dir, self._letters_dir())
+    
+    def _output_key(self, clip_paths, stream_copy):
+        """Output cache key: resolved clips plus everything that affects encoding"""
+        cache_format = [self.clip_cache.size, self.clip_cache.fps] if self.clip_cache else None
+        # Modification time and size too: a re-normalized or replaced clip at the same path
+        # must not serve the old render
+        clips = []
+        for path in clip_paths:
+            stat = os.stat(path)
+            clips.append([os.path.abspath(path), stat.st_mtime_ns, stat.st_size])
+        return self.output_cache.make_key("wlasl", clips, "mp4", stream_copy, cache_format)
+    
+    def _concat_cached(self, signs, output_path):
+        """
+        Encode a sentence from decoded clips held in the clip cache
+        
+        Args:
+            signs: List of (word, video_path) tuples
+            output_path: Output video path
+        
+        Returns:
+            List of words whose clips failed to decode
+        """
+        clips = []
+        failed_words = []
+        
+        for word, video_path in signs:
+            try:
+                clips.append(self.clip_cache.get(video_path))
+            except Exception as e:
+                print(f"  ⚠️  '{word}' - Error decoding video: {e}")
+                failed_words.append(word)
+        
+        if not clips:
+            raise ValueError("None of the sign videos could be decoded")
+        
+        print(f"💾 Writing video to: {output_path}")
+        if not encode_frames(clips, output_path, self.clip_cache.size, self.clip_cache.fps):
+            raise RuntimeError("Video encoding failed")
+        
+        return failed_words
+    
+    def _concat_compose(self, signs, output_path):
+        """
+        Decode, compose and re-encode clips (handles mixed formats)
+        
+        Args:
+            signs: List of (word, video_path) tuples
+            output_path: Output video path
+        
+        Returns:
+            List of words whose clips failed to load
+        """
+        clips_to_concat = []
+        failed_words = []
+        
+        for word, video_path in signs:
+            try:
+                clips_to_concat.append(VideoFileClip(video_path))
+            except Exception as e:
+                print(f"  ⚠️  '{word}' - Error loading video: {e}")
+                failed_words.append(word)
+        
+        if not clips_to_concat:
+            raise ValueError("None of the sign videos could be loaded")
+        
+        final_clip = concatenate_videoclips(clips_to_concat, method="compose")
+        
+        # Write output
+        print(f"💾 Writing video to: {output_path}")
+        final_clip.write_videofile(
+            output_path,
+            codec='libx264',
+            audio=False  # ASL videos don't need audio
+        )
+        
+        # Clean up
+        for clip in clips_to_concat:
+            clip.close()
+        final_clip.close()
+        
+        return failed_words
+    
+    def generate_video(self, text, output_path=None, stream_copy=True):
         """
         Generate ASL video from text
         
         Args:
             text: English text to convert
-            output_path: Where to save video (auto-generated if None)
+            output_path: Where to save video (auto-generated and cached if None)
+            stream_copy: Join clips without re-encoding when they share
+                         codec/resolution/fps (falls back to compose otherwise)
         
         Returns:
             Path to generated video
         """
-        words = self.text_to_words(text)
+        # Longest-match segmentation (multi-word glosses count as one sign)
+        segments = self.segment(text)
+        words = [phrase for phrase, _ in segments]
         
         if not words:
             raise ValueError("No words to convert")
@@ -138,75 +643,650 @@ class WLASLGenerator:
         print(f"📝 Words: {words}")
         
         # Find videos for each word
-        clips_to_concat = []
-        found_words = []
+        signs = []
         missing_words = []
+        spelled_words = []
         
-        for word in words:
-            video_path = self.find_sign(word)
+        for word, video_path in segments:
             if video_path:
-                try:
-                    clip = VideoFileClip(video_path)
-                    clips_to_concat.append(clip)
-                    found_words.append(word)
-                    print(f"  ✅ '{word}' → {os.path.basename(video_path)}")
-                except Exception as e:
-                    print(f"  ⚠️  '{word}' - Error loading video: {e}")
-                    missing_words.append(word)
+                video_path = self._clip_path(video_path)
+                signs.append((word, video_path))
+                print(f"  ✅ '{word}' → {os.path.basename(video_path)}")
+                continue
+            
+            letters = self.fingerspell_clips(word) if self.fingerspell else []
+            if letters:
+                signs.extend((word, clip) for clip in letters)
+                spelled_words.append(word)
+                print(f"  🔤 '{word}' → fingerspelled ({len(letters)} letters)")
             else:
                 print(f"  ❌ '{word}' - No sign found")
                 missing_words.append(word)
         
-        if not clips_to_concat:
+        if not signs:
             raise ValueError(f"No videos found for any words in: {text}")
         
-        # Generate output path if not provided
+        clip_paths = [path for _, path in signs]
+        
+        # Same resolved clips + same encoder settings = same video
+        cache_key = None
+        if output_path is None and self.output_cache:
+            cache_key = self._output_key(clip_paths, stream_copy)
+            cached_path = self.output_cache.get(cache_key, "mp4")
+            if cached_path:
+                print(f"\n⚡ Reusing cached video: {cached_path}")
+                return cached_path
+            output_path = self.output_cache.temp_path(cache_key, "mp4")
+        
+        # Generate output path if not provided (also where a partial cached render goes)
+        safe_text = re.sub(r'[^\w\s]', '', text)[:30].replace(' ', '_')
+        timestamp = int(__import__('time').time())
+        named_path = os.path.join(OUTPUT_DIR, f"asl_{safe_text}_{timestamp}.mp4")
         if output_path is None:
-            safe_text = re.sub(r'[^\w\s]', '', text)[:30].replace(' ', '_')
-            timestamp = int(__import__('time').time())
-            output_path = os.path.join(OUTPUT_DIR, f"asl_{safe_text}_{timestamp}.mp4")
+            output_path = named_path
         
         # Concatenate videos
-        print(f"\n🎞️  Concatenating {len(clips_to_concat)} video clips...")
-        final_clip = concatenate_videoclips(clips_to_concat, method="compose")
+        print(f"\n🎞️  Concatenating {len(signs)} video clips...")
         
-        # Write output
-        print(f"💾 Writing video to: {output_path}")
-        final_clip.write_videofile(
-            output_path,
-            codec='libx264',
-            audio=False  # ASL videos don't need audio
-        )
+        # Store and letter clips share one format by construction - no probing needed
+        uniform = all(self._is_uniform(path) for path in clip_paths)
         
-        # Clean up
-        for clip in clips_to_concat:
-            clip.close()
-        final_clip.close()
+        # Fingerspelled words contribute several clips - count each word once
+        signed_words = list(dict.fromkeys(word for word, _ in signs))
+        
+        try:
+            failed_words = []
+            if (stream_copy and (uniform or can_stream_copy(clip_paths))
+                    and concat_stream_copy(clip_paths, output_path)):
+                print("⚡ Joined without re-encoding")
+            elif self.clip_cache:
+                failed_words = self._concat_cached(signs, output_path)
+            else:
+                failed_words = self._concat_compose(signs, output_path)
+            found_words = [word for word in signed_words if word not in failed_words]
+            missing_words.extend(word for word in dict.fromkeys(failed_words))
+            
+            if cache_key and not failed_words:
+                output_path = self.output_cache.commit(cache_key, "mp4")
+            elif cache_key:
+                # Some clips failed to decode - keep this render out of the cache so the
+                # sentence is rendered again next time
+                os.replace(output_path, named_path)
+                output_path = named_path
+        finally:
+            # Nothing is left at the temp path after commit/replace; on errors drop the partial file
+            if cache_key:
+                self.output_cache.discard(cache_key, "mp4")
         
         # Summary
         print(f"\n✅ Video generated successfully!")
         print(f"📊 Statistics:")
         print(f"   - Total words: {len(words)}")
         print(f"   - Found: {len(found_words)}")
+        if spelled_words:
+            print(f"   - Fingerspelled: {', '.join(spelled_words)}")
         print(f"   - Missing: {len(missing_words)}")
         if missing_words:
             print(f"   - Missing words: {', '.join(missing_words)}")
+        if self.clip_cache:
+            cache_stats = self.clip_cache.stats()
+            print(f"   - Clip cache: {cache_stats['clips']} clips, "
+                  f"{cache_stats['bytes'] / 1e6:.0f}/{cache_stats['max_bytes'] / 1e6:.0f} MB, "
+                  f"{cache_stats['hits']} hits / {cache_stats['misses']} misses, "
+                  f"{cache_stats['evictions']} evictions")
         print(f"\n📁 Output: {output_path}")
         
         return output_path
+    
+    def iter_stream_segments(self, text, output_dir):
+        """
+        Render a sentence as HLS, one MPEG-TS segment per sign
+        
+        Each sign is written and appended to a growing EVENT playlist
+        (output_dir/playlist.m3u8) as soon as it is resolved, so playback
+        can start on the first sign while later ones are still encoding.
+        Store clips are remuxed without re-encoding; other clips are
+        transcoded to the store format.
+        
+        Args:
+            text: English text to convert
+            output_dir: Directory for the playlist and segments
+        
+        Yields:
+            (phrase, segment_path) for each sign as it becomes playable
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        playlist_path = os.path.join(output_dir, "playlist.m3u8")
+        size, fps = self.store_format
+        
+        entries = []
+        offset = 0.0
+        
+        def write_playlist(finished):
+            target = max([HLS_TARGET_DURATION] + [math.ceil(d) for _, d in entries])
+            lines = [
+                "#EXTM3U",
+                "#EXT-X-VERSION:3",
+                f"#EXT-X-TARGETDURATION:{target}",
+                "#EXT-X-MEDIA-SEQUENCE:0",
+                "#EXT-X-PLAYLIST-TYPE:EVENT",
+            ]
+            for name, duration in entries:
+                lines += [f"#EXTINF:{duration:.3f},", name]
+            if finished:
+                lines.append("#EXT-X-ENDLIST")
+            tmp_path = playlist_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp_path, playlist_path)
+        
+        write_playlist(finished=False)
+        
+        for phrase, video_path in self.segment(text):
+            if video_path:
+                clip_paths = [self._clip_path(video_path)]
+            else:
+                clip_paths = self.fingerspell_clips(phrase) if self.fingerspell else []
+                if not clip_paths:
+                    print(f"  ❌ '{phrase}' - No sign found")
+                    continue
+            
+            for clip_path in clip_paths:
+                name = f"seg_{len(entries):04d}.ts"
+                segment_path = os.path.join(output_dir, name)
+                duration = write_ts_segment(clip_path, segment_path, offset,
+                                            size=None if self._is_uniform(clip_path) else size, fps=fps)
+                if not duration:
+                    continue
+                
+                entries.append((name, duration))
+                offset += duration
+                write_playlist(finished=False)
+                print(f"  📡 '{phrase}' → {name} ({duration:.2f}s)")
+                yield phrase, segment_path
+        
+        write_playlist(finished=True)
+    
+    def stream_video(self, text, output_dir=None):
+        """
+        Start streaming a sentence as HLS in the background
+        
+        Returns as soon as the first sign is playable; remaining signs are
+        appended to the playlist by a worker thread.
+        
+        Args:
+            text: English text to convert
+            output_dir: Directory for the playlist (auto-generated if None)
+        
+        Returns:
+            (playlist_path, thread) - join the thread to wait for the end;
+            join() re-raises an error from the remaining signs
+        
+        Raises:
+            The producer's exception if it fails before anything is playable
+        """
+        if output_dir is None:
+            safe_text = re.sub(r'[^\w\s]', '', text)[:30].replace(' ', '_')
+            output_dir = os.path.join(OUTPUT_DIR, f"stream_{safe_text}_{int(time.time())}")
+        
+        print(f"\n📡 Streaming: '{text}'")
+        first_ready = threading.Event()
+        
+        segments = []
+        
+        def produce():
+            try:
+                for segment in self.iter_stream_segments(text, output_dir):
+                    segments.append(segment)
+                    first_ready.set()
+            finally:
+                first_ready.set()
+        
+        thread = _ProducerThread(produce)
+        thread.start()
+        first_ready.wait()
+        
+        # Nothing was streamed - surface the failure instead of an empty playlist
+        if not segments:
+            thread.join()
+        
+        return os.path.join(output_dir, "playlist.m3u8"), thread
+    
+    def schedule_signs(self, timed_words):
+        """
+        Timed sign schedule from word timestamps
+        
+        Words are segmented like generate_video() - a multi-word gloss becomes
+        one sign spanning its words - and a fingerspelled word shares its
+        time evenly between its letters.
+        
+        Args:
+            timed_words: List of {'word', 'start', 'end'} dicts (seconds), e.g.
+                         from FasterWhisperVoiceConverter.transcribe_audio(
+                         word_timestamps=True)
+        
+        Returns:
+            List of {'word', 'start', 'end', 'clip'} dicts in playback
+            order; 'clip' is None for words without a sign
+        """
+        tokens = [(token, item['start'], item['end'])
+                  for item in timed_words for token in self.text_to_words(item['word'])]
+        
+        schedule = []
+        position = 0
+        for phrase, video_path in self._segment_tokens([token for token, _, _ in tokens]):
+            span = tokens[position:position + len(phrase.split())]
+            position += len(span)
+            start, end = span[0][1], span[-1][2]
+            
+            if video_path:
+                schedule.append({'word': phrase, 'start': start, 'end': end,
+                                 'clip': self._clip_path(video_path)})
+                continue
+            
+            letters = self.fingerspell_clips(phrase) if self.fingerspell else []
+            if not letters:
+                schedule.append({'word': phrase, 'start': start, 'end': end, 'clip': None})
+                continue
+            
+            step = (end - start) / len(letters)
+            for i, clip in enumerate(letters):
+                schedule.append({'word': phrase, 'start': start + i * step,
+                                 'end': start + (i + 1) * step, 'clip': clip})
+        
+        return schedule
+    
+    def iter_timed_clips(self, schedule, work_dir, mode='stretch', clock=0.0):
+        """
+        Retime each scheduled sign into its own clip in the store format
+        
+        A sign owns the time until the next sign starts: 'stretch' changes
+        its speed to fill that slot, 'pad' holds its last frame instead (see
+        video_tools.fit_to_slot). The last sign keeps at least its natural
+        length.
+        
+        Args:
+            schedule: Entries from schedule_signs()
+            work_dir: Directory for the retimed clips
+            mode: 'stretch' or 'pad'
+            clock: Output time at which the first clip starts
+        
+        Yields:
+            (entry, clip_path) per sign; entry adds 'shown' and 'until' -
+            when the sign is on screen in the output
+        """
+        size, fps = self.store_format
+        playable = [entry for entry in schedule if entry['clip']]
+        
+        for i, entry in enumerate(playable):
+            info = probe_video(entry['clip'])
+            if not info or not info['duration']:
+                print(f"  ❌ '{entry['word']}' - Could not read {os.path.basename(entry['clip'])}")
+                continue
+            
+            seconds = info['duration']
+            if i + 1 < len(playable):
+                end = playable[i + 1]['start']
+            else:
+                end = max(entry['end'], max(clock, entry['start']) + seconds)
+            
+            lead, speed, tail = fit_to_slot(seconds, entry['start'], end, clock, mode)
+            clip_path = os.path.join(work_dir, f"sign_{clock * 1000:010.0f}.mp4")
+            if not retime_clip(entry['clip'], clip_path, speed, lead, tail, size, fps):
+                continue
+            
+            retimed = probe_video(clip_path)
+            duration = retimed['duration'] if retimed else lead + seconds / speed + tail
+            timed = dict(entry, shown=clock + lead, until=clock + duration)
+            clock += duration
+            print(f"  ⏱️  '{entry['word']}' at {timed['shown']:.2f}s ({speed:.2f}x)")
+            yield timed, clip_path
+    
+    def generate_timed_video(self, schedule, output_path=None, mode='stretch', captions=('srt', 'vtt')):
+        """
+        Render a schedule as a video that follows the speaker's timing
+        
+        Args:
+            schedule: Entries from schedule_signs()
+            output_path: Where to save video (auto-generated if None)
+            mode: 'stretch' (change sign speed) or 'pad' (hold frames)
+            captions: Caption sidecar formats written next to the video
+        
+        Returns:
+            Path to generated video
+        """
+        renderer = TimedSignRenderer(self, output_path, mode)
+        renderer.add_schedule(schedule)
+        return renderer.finish(captions)
+    
+    def generate_batch(self, texts, workers=None, output_dir=OUTPUT_DIR):
+        """
+        Generate ASL videos for many sentences at once
+        
+        All sentences are resolved up front, every unique clip is decoded
+        exactly once (normalized into the clip store if it is not there
+        yet), and the sentences are then joined in parallel with stream
+        copy across a process pool.
+        
+        Args:
+            texts: List of sentences
+            workers: Parallel render processes (CPU count if None)
+            output_dir: Where uncached outputs go (cache_outputs=False)
+        
+        Returns:
+            List of dicts per sentence: text, output, signs, spelled,
+            missing, seconds, cached, deduped (shares another sentence's
+            render), error
+        """
+        workers = workers or os.cpu_count() or 1
+        batch_start = time.time()
+        
+        # Resolve every sentence before touching any video
+        resolved = [(text, self.segment(text)) for text in texts]
+        unique_sources = sorted({path for _, segments in resolved for _, path in segments if path})
+        print(f"\n📦 Batch: {len(texts)} sentences, {len(unique_sources)} unique signs")
+        
+        # Decode each unique clip once into the uniform store
+        store_dir = self.store_dir or default_store_dir()
+        missing_from_store = [path for path in unique_sources
+                              if os.path.basename(path) not in self.store]
+        # Letter clips only count as uniform with a store loaded, so fingerspelling needs one too
+        if missing_from_store or (self.fingerspell and _read_store_manifest(store_dir) is None):
+            self.normalize_store(store_dir, workers=workers, sources=missing_from_store)
+        if unique_sources or self.fingerspell:
+            self.load_store(store_dir)
+        
+        results = []
+        jobs = {}
+        pending = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for index, (text, segments) in enumerate(resolved):
+                result = {
+                    'text': text,
+                    'output': None,
+                    'signs': [phrase for phrase, path in segments if path],
+                    'spelled': [],
+                    'missing': [],
+                    'seconds': 0.0,
+                    'cached': False,
+                    'deduped': False,
+                    'error': None,
+                }
+                results.append(result)
+                
+                clip_paths = []
+                for phrase, path in segments:
+                    if path:
+                        clip_paths.append(self._clip_path(path))
+                        continue
+                    letters = self.fingerspell_clips(phrase) if self.fingerspell else []
+                    if letters:
+                        clip_paths.extend(letters)
+                        result['spelled'].append(phrase)
+                    else:
+                        result['missing'].append(phrase)
+                
+                if not clip_paths:
+                    result['error'] = "No signs found"
+                    continue
+                if not all(self._is_uniform(path) for path in clip_paths):
+                    result['error'] = "Clip normalization failed"
+                    continue
+                
+                # Same key as generate_video, so batch and single renders share files
+                cache_key = None
+                if self.output_cache:
+                    cache_key = self._output_key(clip_paths, True)
+                    cached_path = self.output_cache.get(cache_key, "mp4")
+                    if cached_path:
+                        result['output'] = cached_path
+                        result['cached'] = True
+                        continue
+                    # Repeated sentences in one batch are rendered once
+                    if cache_key in pending:
+                        result['deduped'] = True
+                        jobs[pending[cache_key]][0].append(result)
+                        continue
+                    output_path = self.output_cache.temp_path(cache_key, "mp4")
+                else:
+                    os.makedirs(output_dir, exist_ok=True)
+                    output_path = os.path.join(output_dir, f"asl_batch_{index:04d}.mp4")
+                
+                future = pool.submit(_render_sentence_job, clip_paths, output_path)
+                jobs[future] = ([result], cache_key, output_path)
+                pending[cache_key] = future
+            
+            for done, future in enumerate(as_completed(jobs), 1):
+                sentence_results, cache_key, output_path = jobs[future]
+                error = None
+                try:
+                    ok, seconds = future.result()
+                except Exception as e:
+                    ok, seconds, error = False, 0.0, str(e)
+                if ok and cache_key:
+                    output_path = self.output_cache.commit(cache_key, "mp4")
+                elif cache_key:
+                    self.output_cache.discard(cache_key, "mp4")
+                for result in sentence_results:
+                    result['seconds'] = seconds
+                    if ok:
+                        result['output'] = output_path
+                    else:
+                        result['error'] = error or "Join failed"
+                print(f"   Rendered {done}/{len(jobs)} sentences...", end='\r')
+        
+        self._print_batch_summary(results, time.time() - batch_start)
+        return results
+    
+    def _print_batch_summary(self, results, wall_time):
+        """Per-sentence timing and missing-word statistics for a batch"""
+        rendered = [r for r in results if r['output'] and not r['cached'] and not r['deduped']]
+        cached = [r for r in results if r['cached']]
+        deduped = [r for r in results if r['deduped'] and r['output']]
+        failed = [r for r in results if r['error']]
+        missing = Counter(word for r in results for word in r['missing'])
+        spelled = sum(len(r['spelled']) for r in results)
+        
+        print(f"\n\n📊 Batch Summary:")
+        for r in results:
+            if r['cached']:
+                status = "⚡ cached"
+            elif r['error']:
+                status = "❌ " + r['error']
+            else:
+                status = "♻️ duplicate" if r['deduped'] else f"{r['seconds']:.2f}s"
+            print(f"   - {r['text'][:50]!r}: {status}"
+                  + (f" (missing: {', '.join(r['missing'])})" if r['missing'] else ""))
+        
+        print(f"\n   - Sentences: {len(results)} "
+              f"({len(rendered)} rendered, {len(cached)} cached, {len(deduped)} duplicates, "
+              f"{len(failed)} failed)")
+        if rendered:
+            times = [r['seconds'] for r in rendered]
+            print(f"   - Render time: avg {sum(times) / len(times):.2f}s, max {max(times):.2f}s")
+        print(f"   - Wall time: {wall_time:.1f}s")
+        if spelled:
+            print(f"   - Fingerspelled words: {spelled}")
+        print(f"   - Missing words: {sum(missing.values())} ({len(missing)} unique)")
+        if missing:
+            top = ", ".join(f"{word} ×{count}" for word, count in missing.most_common(10))
+            print(f"   - Most frequent missing: {top}")
+
+
+def write_captions(timed_entries, path):
+    """
+    Write one caption per sign, timed to when it is on screen
+    
+    Args:
+        timed_entries: Entries from WLASLGenerator.iter_timed_clips()
+        path: .srt or .vtt file (format chosen by extension)
+    
+    Returns:
+        path
+    """
+    # Letters of a fingerspelled word share one caption
+    cues = []
+    for entry in timed_entries:
+        if cues and cues[-1][2] == entry['word'] and abs(cues[-1][1] - entry['shown']) < 0.05:
+            cues[-1][1] = entry['until']
+        else:
+            cues.append([entry['shown'], entry['until'], entry['word']])
+    
+    return write_caption_file(cues, path)
+
+
+class TimedSignRenderer:
+    """
+    Render a timed sign video while its schedule is still growing
+    
+    Every add_words()/add_schedule() call starts retiming those signs on a
+    background thread, so a live transcriber can hand over each segment as
+    soon as it is final and only the join is left when the speaker stops.
+    """
+    
+    def __init__(self, generator, output_path=None, mode='stretch'):
+        """
+        Args:
+            generator: WLASLGenerator providing the clips
+            output_path: Where to save video (auto-generated if None)
+            mode: 'stretch' or 'pad' (see WLASLGenerator.iter_timed_clips)
+        """
+        self.generator = generator
+        self.output_path = output_path
+        self.mode = mode
+        self.clock = 0.0
+        self.entries = []
+        self.clip_paths = []
+        
+        self._work_dir = None
+        # One worker: clips are retimed in order, each starting where the last ended
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._jobs = []
+    
+    def add_words(self, timed_words):
+        """
+        Schedule and start rendering more timed words
+        
+        Returns:
+            The schedule entries for these words
+        """
+        schedule = self.generator.schedule_signs(timed_words)
+        self.add_schedule(schedule)
+        return schedule
+    
+    def add_schedule(self, schedule):
+        """Start rendering more schedule entries (after everything added before)"""
+        self._jobs.append(self._executor.submit(self._render, schedule))
+    
+    def _render(self, schedule):
+        if self._work_dir is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            self._work_dir = tempfile.mkdtemp(prefix="timed_", dir=CACHE_DIR)
+        
+        for entry, clip_path in self.generator.iter_timed_clips(
+                schedule, self._work_dir, self.mode, self.clock):
+            self.entries.append(entry)
+            self.clip_paths.append(clip_path)
+            self.clock = entry['until']
+    
+    def finish(self, captions=('srt', 'vtt')):
+        """
+        Wait for the rendering, then join the clips and write captions
+        
+        Args:
+            captions: Caption sidecar formats written next to the video
+        
+        Returns:
+            Path to generated video
+        """
+        try:
+            self._executor.shutdown(wait=True)
+            for job in self._jobs:
+                job.result()
+            
+            if not self.clip_paths:
+                raise ValueError("No signs to render")
+            
+            output_path = self.output_path
+            if output_path is None:
+                words = list(dict.fromkeys(entry['word'] for entry in self.entries))
+                safe_text = re.sub(r'[^\w\s]', '', " ".join(words))[:30].replace(' ', '_')
+                output_path = os.path.join(OUTPUT_DIR, f"asl_timed_{safe_text}_{int(time.time())}.mp4")
+            
+            print(f"\n🎞️  Joining {len(self.clip_paths)} timed clips...")
+            if not concat_stream_copy(self.clip_paths, output_path):
+                raise RuntimeError("Could not join the timed clips")
+        finally:
+            if self._work_dir:
+                shutil.rmtree(self._work_dir, ignore_errors=True)
+        
+        root = os.path.splitext(output_path)[0]
+        caption_paths = [write_captions(self.entries, f"{root}.{ext}") for ext in captions]
+        
+        late = max(entry['shown'] - entry['start'] for entry in self.entries)
+        print(f"\n✅ Timed video generated: {len(self.entries)} signs over {self.clock:.1f}s "
+              f"(at most {late:.2f}s behind the speaker)")
+        print(f"📁 Output: {output_path}")
+        for caption_path in caption_paths:
+            print(f"📝 Captions: {caption_path}")
+        return output_path
 
 
 # Standalone usage
 if __name__ == "__main__":
     import sys
     
+    # Memory budget for decoded clips, for sentences that are re-encoded rather than stream-copied
+    clip_cache_mb = 0
+    if "--clip-cache-mb" in sys.argv[:-1]:
+        position = sys.argv.index("--clip-cache-mb")
+        clip_cache_mb = int(sys.argv[position + 1])
+        del sys.argv[position:position + 2]
+    
+    # Refresh the vocabulary index after updating the dataset
+    if len(sys.argv) > 1 and sys.argv[1] == "--rebuild-index":
+        generator = WLASLGenerator(refresh_index=True)
+        print(f"💾 Index written: {generator.index_path}")
+        sys.exit(0)
+    
+    # One-time transcode of every clip into the uniform store
+    if len(sys.argv) > 1 and sys.argv[1] == "--normalize":
+        generator = WLASLGenerator()
+        generator.load_store(generator.normalize_store(force="--force" in sys.argv))
+        generator.prerender_letters()
+        sys.exit(0)
+    
+    # Render every sentence of a text or subtitle file
+    if len(sys.argv) > 2 and sys.argv[1] == "--batch":
+        workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        generator = WLASLGenerator(clip_cache_mb=clip_cache_mb)
+        results = generator.generate_batch(read_sentences(sys.argv[2]), workers=workers)
+        sys.exit(1 if all(r['error'] for r in results) else 0)
+    
+    # Serve sentences from the normalized store / as an HLS stream
+    args = sys.argv[1:]
+    store_dir = None
+    stream = False
+    while args and args[0] in ("--store", "--stream"):
+        if args[0] == "--store":
+            store_dir = default_store_dir()
+        else:
+            stream = True
+        args = args[1:]
+    
     # Test text
-    test_text = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else "hello how are you"
+    test_text = " ".join(args) if args else "hello how are you"
     
     try:
-        generator = WLASLGenerator()
-        output = generator.generate_video(test_text)
-        print(f"\n🎉 Success! Video saved to: {output}")
+        generator = WLASLGenerator(store_dir=store_dir, clip_cache_mb=clip_cache_mb)
+        if stream:
+            playlist, thread = generator.stream_video(test_text)
+            print(f"\n▶️  Playable now: {playlist}")
+            thread.join()
+            print(f"\n🎉 Stream complete: {playlist}")
+        else:
+            output = generator.generate_video(test_text)
+            print(f"\n🎉 Success! Video saved to: {output}")
         
     except Exception as e:
         print(f"\n❌ Error: {e}")